@@ -0,0 +1,463 @@
+"""
+Load test of the processor and the API at several fleet sizes, against local stand-ins.
+
+Synthetic pitches are seeded into an in-process MongoDB stand-in (mongomock) or, with
+`--database mongo`, into the empty database of MONGO_URI. OpenWeather is replaced by a fake server
+with configurable latency and error rate, called through the production weather API stack. For
+each fleet size, it measures the processor cycle time and outbound weather calls of each engine, and
+the p50/p99 latency of the CRUD and maintenance endpoints, and writes them as JSON so runs of
+different versions can be compared.
+
+Usage:
+    python -m benchmarks.load_test --sizes 1000 10000 100000 --output results.json
+"""
+
+import os
+
+# The processor reads its settings on import: don't let the rate limiter of the OpenWeather plan
+# dominate the measured cycles, nor queue changes on the event bus with no consumer
+os.environ.setdefault("WEATHER_RATE_LIMIT_PER_SECOND", "10000")
+os.environ.setdefault("WEATHER_RATE_LIMIT_BURST", "10000")
+os.environ.setdefault("PROCESSOR_EVENTS", "none")
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+import httpx
+
+from pitch_health_monitor.database import async_db_methods, db_methods
+from pitch_health_monitor.main import app
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+from pitch_health_monitor.services.pitch_monitor.processor import (
+    PROCESS_WRITE_CHUNK_SIZE,
+    RECHECK_INTERVAL,
+    create_weather_api,
+    process_pitches,
+)
+from pitch_health_monitor.services.pitch_monitor.vectorized import (
+    process_due_pitches_vectorized,
+)
+
+SEED_CHUNK_SIZE = 10000
+
+
+class FakeWeatherServer:
+    """
+    Stand-in for the OpenWeather API, answering through an httpx mock transport after a fixed latency
+    and failing a share of the requests with a 503.
+    """
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.05,
+        error_rate: float = 0.0,
+        rain_rate: float = 0.3,
+        seed: int = 0,
+    ):
+        """
+        Initialize the FakeWeatherServer.
+
+        Args:
+            latency_seconds (float): Time taken to answer each request.
+            error_rate (float): Share of the requests failing with a 503.
+            rain_rate (float): Share of the answers reporting rain.
+            seed (int): Seed of the random number generator.
+        """
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self.rain_rate = rain_rate
+        self._rng = random.Random(seed)
+
+        self.calls = 0
+        self.errors = 0
+
+    def client(self) -> httpx.AsyncClient:
+        """
+        Create an HTTP client sending its requests to the fake server.
+
+        Returns:
+            httpx.AsyncClient: The client.
+        """
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """
+        Answer a current weather or forecast request.
+
+        Args:
+            request (httpx.Request): The request.
+
+        Returns:
+            httpx.Response: The response.
+        """
+
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            return httpx.Response(503)
+
+        if request.url.path.endswith("/forecast"):
+            first_step = int(time.time()) // 10800 * 10800 + 10800
+            steps = [
+                {"dt": first_step + 10800 * index, "weather": [self._weather()]}
+                for index in range(int(request.url.params.get("cnt", "9")))
+            ]
+            return httpx.Response(200, json={"list": steps})
+
+        return httpx.Response(200, json={"weather": [self._weather()]})
+
+    def _weather(self) -> Dict[str, int]:
+        """
+        Draw a weather condition, 500 being light rain and 800 clear sky.
+
+        Returns:
+            Dict[str, int]: The weather condition.
+        """
+        return {"id": 500 if self._rng.random() < self.rain_rate else 800}
+
+
+def use_in_process_database() -> None:
+    """
+    Point both the synchronous and the asynchronous database methods at a shared mongomock database.
+    """
+
+    import mongomock
+    import mongomock.collection
+    from mongomock_motor import AsyncMongoMockClient
+
+    # mongomock checks inserted documents with the default codec options, which reject native UUIDs
+    # even when the client uses the standard representation
+    mongomock.collection.BSON = None
+
+    client = mongomock.MongoClient(uuidRepresentation="standard")
+    async_client = AsyncMongoMockClient(mock_mongo_client=client)
+
+    for module, database_client in [
+        (db_methods, client),
+        (async_db_methods, async_client),
+    ]:
+        database = database_client.get_database("benchmark")
+        module.pitches_collection = database.pitches
+        module.leases_collection = database.leases
+        module.history_collection = database.condition_history
+        module.hourly_history_collection = database.condition_history_hourly
+        module.daily_history_collection = database.condition_history_daily
+
+
+def seed_pitches(count: int, city_count: int, rng: random.Random) -> List[UUID]:
+    """
+    Insert synthetic pitches, all due for processing and half of them with a due maintenance.
+
+    Args:
+        count (int): Number of pitches to insert.
+        city_count (int): Number of distinct cities the pitches are spread over.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        List[UUID]: The UUIDs of the pitches with a due maintenance.
+    """
+
+    now = datetime.utcnow().replace(microsecond=0)
+    maintenance_due_uuids = []
+
+    for start in range(0, count, SEED_CHUNK_SIZE):
+        pitches = []
+        for index in range(start, min(start + SEED_CHUNK_SIZE, count)):
+            pitch = Pitch(
+                uuid=uuid4(),
+                last_checked_at=now - RECHECK_INTERVAL,
+                name=f"Pitch {index}",
+                location=Location(city=f"City {index % city_count}", country="Germany"),
+                turf_type=rng.choice(list(TurfType)),
+                current_condition=rng.randint(3, 9),
+            )
+
+            if index % 2 == 0:
+                pitch.next_scheduled_maintenance = now - timedelta(hours=1)
+                maintenance_due_uuids.append(pitch.uuid)
+
+            pitches.append(pitch.model_dump())
+
+        db_methods.pitches_collection.insert_many(pitches)
+
+    return maintenance_due_uuids
+
+
+async def measure_cycles(
+    engine: str, cycles: int, server: FakeWeatherServer
+) -> Dict[str, Any]:
+    """
+    Run full processor cycles over the whole fleet, each one with a cold weather cache.
+
+    Args:
+        engine (str): Either "objects" or "vectorized".
+        cycles (int): Number of cycles to run.
+        server (FakeWeatherServer): The fake weather server.
+
+    Returns:
+        Dict[str, Any]: The cycle times and weather calls.
+    """
+
+    durations = []
+    calls = []
+    errors = []
+
+    for _ in range(cycles):
+        # Make every pitch due again
+        db_methods.pitches_collection.update_many(
+            {}, {"$set": {"last_checked_at": datetime.utcnow() - RECHECK_INTERVAL}}
+        )
+
+        calls_before, errors_before = server.calls, server.errors
+        started_at = time.perf_counter()
+
+        async with create_weather_api(client=server.client()) as weather_api:
+            if engine == "vectorized":
+                await process_due_pitches_vectorized(
+                    datetime.utcnow() - RECHECK_INTERVAL,
+                    weather_api,
+                    chunk_size=PROCESS_WRITE_CHUNK_SIZE,
+                )
+            else:
+                pitches = await async_db_methods.get_due_pitches_from_db(
+                    datetime.utcnow() - RECHECK_INTERVAL
+                )
+                await process_pitches(pitches, weather_api)
+
+        durations.append(time.perf_counter() - started_at)
+        calls.append(server.calls - calls_before)
+        errors.append(server.errors - errors_before)
+
+    return {
+        "seconds": durations,
+        "median_seconds": statistics.median(durations),
+        "weather_calls_per_cycle": statistics.mean(calls),
+        "weather_errors_per_cycle": statistics.mean(errors),
+    }
+
+
+async def measure_endpoints(
+    maintenance_due_uuids: List[UUID], requests: int, rng: random.Random
+) -> Dict[str, Dict[str, float]]:
+    """
+    Measure the latency of the CRUD and maintenance endpoints, called in-process through ASGI.
+
+    Args:
+        maintenance_due_uuids (List[UUID]): Seeded pitches with a due maintenance.
+        requests (int): Number of requests per endpoint.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        Dict[str, Dict[str, float]]: The latency percentiles in milliseconds, by endpoint.
+    """
+
+    uuids = rng.sample(maintenance_due_uuids, min(requests, len(maintenance_due_uuids)))
+    created_uuids: List[str] = []
+    results = {}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+    ) as client:
+
+        async def create(_: int) -> httpx.Response:
+            response = await client.post(
+                "/pitches/",
+                json={
+                    "name": "Benchmark pitch",
+                    "location": {"city": "City 0", "country": "Germany"},
+                    "turf_type": "natural",
+                    "current_condition": 8,
+                },
+            )
+            created_uuids.append(response.json())
+            return response
+
+        endpoints: Dict[str, Callable[[int], Awaitable[httpx.Response]]] = {
+            "create": create,
+            "get": lambda index: client.get(f"/pitches/{uuids[index % len(uuids)]}"),
+            "update": lambda index: client.put(
+                f"/pitches/{uuids[index % len(uuids)]}",
+                json={"name": f"Renamed pitch {index}"},
+            ),
+            "list_maintenance_required": lambda _: client.get(
+                "/pitches/maintenance-required", params={"limit": 100}
+            ),
+            "execute_maintenance": lambda index: client.post(
+                f"/pitches/{uuids[index]}/execute-maintenance"
+            ),
+            "delete": lambda index: client.delete(f"/pitches/{created_uuids[index]}"),
+        }
+
+        for name, call in endpoints.items():
+            # Each pitch has a single due maintenance
+            count = len(uuids) if name == "execute_maintenance" else requests
+            latencies = []
+
+            for index in range(count):
+                started_at = time.perf_counter()
+                response = await call(index)
+                latencies.append((time.perf_counter() - started_at) * 1000)
+                response.raise_for_status()
+
+            results[name] = _summarize_latencies(latencies)
+
+    return results
+
+
+def _summarize_latencies(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarize request latencies.
+
+    Args:
+        latencies (List[float]): The latencies in milliseconds.
+
+    Returns:
+        Dict[str, float]: The number of requests and the mean, p50 and p99 latencies.
+    """
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+
+    return {
+        "requests": len(latencies),
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": percentiles[49],
+        "p99_ms": percentiles[98],
+    }
+
+
+def _get_git_revision() -> Optional[str]:
+    """
+    Get the git revision of the benchmarked code.
+
+    Returns:
+        Optional[str]: The commit hash, or None if it cannot be determined.
+    """
+
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_size(size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Seed a fleet of the given size and measure it, leaving the database empty afterwards.
+
+    Args:
+        size (int): Number of pitches.
+        args (argparse.Namespace): The command line arguments.
+
+    Returns:
+        Dict[str, Any]: The measures.
+    """
+
+    rng = random.Random(args.seed)
+    server = FakeWeatherServer(
+        latency_seconds=args.weather_latency_ms / 1000,
+        error_rate=args.weather_error_rate,
+        seed=args.seed,
+    )
+
+    started_at = time.perf_counter()
+    maintenance_due_uuids = seed_pitches(size, min(args.cities, size), rng)
+    result: Dict[str, Any] = {
+        "pitches": size,
+        "seed_seconds": time.perf_counter() - started_at,
+    }
+
+    try:
+        # Measured first, while the maintenance of the seeded pitches is still due
+        result["endpoints"] = await measure_endpoints(
+            maintenance_due_uuids, args.requests, rng
+        )
+        result["cycles"] = {
+            engine: await measure_cycles(engine, args.cycles, server)
+            for engine in args.engines
+        }
+    finally:
+        db_methods.pitches_collection.delete_many({})
+
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument(
+        "--database",
+        choices=["in-process", "mongo"],
+        default="in-process",
+        help="mongo seeds the database of MONGO_URI, which must have no pitches",
+    )
+    parser.add_argument(
+        "--cities", type=int, default=500, help="Number of distinct pitch locations"
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=["objects", "vectorized"],
+        default=["objects", "vectorized"],
+    )
+    parser.add_argument("--cycles", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--weather-latency-ms", type=float, default=50)
+    parser.add_argument("--weather-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file to write the results to")
+    args = parser.parse_args()
+
+    if args.database == "in-process":
+        use_in_process_database()
+
+    elif db_methods.pitches_collection.estimated_document_count() > 0:
+        parser.error("The pitches collection of MONGO_URI must be empty")
+
+    else:
+        db_methods.ensure_indexes()
+
+    results = {
+        "git_revision": _get_git_revision(),
+        "python": platform.python_version(),
+        "started_at": datetime.utcnow().isoformat(),
+        "parameters": {
+            name: value for name, value in vars(args).items() if name != "output"
+        },
+        "results": [],
+    }
+
+    for size in args.sizes:
+        result = asyncio.run(run_size(size, args))
+        results["results"].append(result)
+
+        cycles = ", ".join(
+            f"{engine} {measure['median_seconds']:.2f}s"
+            f" ({measure['weather_calls_per_cycle']:.0f} weather calls)"
+            for engine, measure in result["cycles"].items()
+        )
+        endpoints = ", ".join(
+            f"{name} {measure['p50_ms']:.1f}/{measure['p99_ms']:.1f}ms"
+            for name, measure in result["endpoints"].items()
+        )
+        print(f"{size:>7} pitches: cycle {cycles}")
+        print(f"{'':>16} p50/p99: {endpoints}")
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Micro-benchmark of the per-document cost of rendering the list endpoints.
+
+It compares the original read path (Pitch validation, dump, PitchResponse validation and the
+response model validation and serialization done by FastAPI) with the single-validation and trusted
+rendering of raw documents.
+
+Usage:
+    python -m benchmarks.read_path --documents 10000 --repeat 5
+"""
+
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+from uuid import uuid4
+
+from pitch_health_monitor.models.responses import (
+    PitchResponse,
+    pitch_responses_adapter,
+    render_pitch_responses,
+)
+from pitch_health_monitor.models.schemas import Pitch, TurfType
+
+
+def generate_documents(count: int) -> List[Dict[str, Any]]:
+    """
+    Generate pitch documents shaped like the ones read from the database.
+
+    Args:
+        count (int): Number of documents to generate.
+
+    Returns:
+        List[Dict[str, Any]]: The generated documents.
+    """
+
+    now = datetime.utcnow().replace(microsecond=0)
+
+    return [
+        {
+            "uuid": uuid4(),
+            "created_at": now - timedelta(days=random.randint(1, 365)),
+            "last_checked_at": now - timedelta(minutes=random.randint(0, 90)),
+            "name": f"Pitch {index}",
+            "location": {"city": f"City {index % 50}", "country": "Germany"},
+            "turf_type": random.choice(list(TurfType)).value,
+            "current_condition": random.randint(1, 10),
+            "last_maintenance_date": None,
+            "next_scheduled_maintenance": now + timedelta(hours=12),
+            "replacement_date": None,
+        }
+        for index in range(count)
+    ]
+
+
+def render_original(documents: List[Dict[str, Any]]) -> bytes:
+    """
+    Render the documents the way the endpoints did before the fast read path.
+
+    Args:
+        documents (List[Dict[str, Any]]): The pitch documents.
+
+    Returns:
+        bytes: The JSON response body.
+    """
+
+    # get_all_pitches_from_db followed by the conversion done in the endpoint
+    pitches = [Pitch.model_validate(document) for document in documents]
+    responses = [PitchResponse.model_validate(pitch.model_dump()) for pitch in pitches]
+
+    # Validation and serialization of the returned value against the response model by FastAPI
+    content = [response.model_dump() for response in responses]
+    validated = pitch_responses_adapter.validate_python(content)
+    serialized = pitch_responses_adapter.dump_python(validated, mode="json")
+
+    return json.dumps(serialized).encode()
+
+
+def measure(
+    render: Callable[[List[Dict[str, Any]]], bytes],
+    documents: List[Dict[str, Any]],
+    repeat: int,
+) -> float:
+    """
+    Measure the best per-document rendering time, in microseconds.
+
+    Args:
+        render (Callable[[List[Dict[str, Any]]], bytes]): The rendering function.
+        documents (List[Dict[str, Any]]): The pitch documents.
+        repeat (int): Number of measurements, the fastest one is kept.
+
+    Returns:
+        float: The per-document time in microseconds.
+    """
+
+    best = min(timeit.repeat(lambda: render(documents), number=1, repeat=repeat))
+
+    return best / len(documents) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = generate_documents(args.documents)
+
+    results = {
+        "original": measure(render_original, documents, args.repeat),
+        "validated": measure(render_pitch_responses, documents, args.repeat),
+        "trusted": measure(
+            lambda docs: render_pitch_responses(docs, trusted=True),
+            documents,
+            args.repeat,
+        ),
+    }
+
+    for name, microseconds in results.items():
+        speedup = results["original"] / microseconds
+        print(f"{name:>10}: {microseconds:8.2f} us/document ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
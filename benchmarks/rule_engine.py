@@ -0,0 +1,135 @@
+"""
+Micro-benchmark of the per-pitch cost of applying the processing rules.
+
+It compares the per-object rule chain, applied to Pitch objects validated from the documents, with
+the vectorized rule engine, applied to NumPy columns built from the same documents.
+
+Usage:
+    python -m benchmarks.rule_engine --pitches 200000 --repeat 3
+"""
+
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from uuid import uuid4
+
+import numpy as np
+
+from pitch_health_monitor.models.schemas import Pitch, TurfType
+from pitch_health_monitor.services.pitch_monitor.rules import apply_rules
+from pitch_health_monitor.services.pitch_monitor.vectorized import (
+    PitchColumns,
+    apply_rules_vectorized,
+)
+
+CITY_COUNT = 1000
+
+
+def generate_documents(count: int) -> List[Dict[str, Any]]:
+    """
+    Generate due pitch documents shaped like the ones loaded by the processor.
+
+    Args:
+        count (int): Number of documents to generate.
+
+    Returns:
+        List[Dict[str, Any]]: The generated documents.
+    """
+
+    now = datetime.utcnow().replace(microsecond=0)
+
+    return [
+        {
+            "uuid": uuid4(),
+            "name": f"Pitch {index}",
+            "location": {"city": f"City {index % CITY_COUNT}", "country": "Germany"},
+            "turf_type": random.choice(list(TurfType)).value,
+            "current_condition": random.randint(1, 10),
+            "last_checked_at": now - timedelta(hours=2),
+            "next_scheduled_maintenance": random.choice(
+                [None, now + timedelta(hours=random.randint(-48, 48))]
+            ),
+            "current_consecutive_rain_hours": random.randint(0, 5),
+        }
+        for index in range(count)
+    ]
+
+
+def process_objects(documents: List[Dict[str, Any]], raining: np.ndarray) -> int:
+    """
+    Apply the rules to every pitch the way the "objects" engine does.
+
+    Args:
+        documents (List[Dict[str, Any]]): The pitch documents.
+        raining (np.ndarray): Whether it is raining, by city index.
+
+    Returns:
+        int: The number of pitches with material changes.
+    """
+
+    changed_count = 0
+
+    for index, document in enumerate(documents):
+        pitch = apply_rules(
+            Pitch.model_validate(document), bool(raining[index % CITY_COUNT])
+        )
+        changed_count += pitch.has_material_changes()
+
+    return changed_count
+
+
+def process_vectorized(documents: List[Dict[str, Any]], raining: np.ndarray) -> int:
+    """
+    Apply the rules to all pitches the way the "vectorized" engine does.
+
+    Args:
+        documents (List[Dict[str, Any]]): The pitch documents.
+        raining (np.ndarray): Whether it is raining, by city index.
+
+    Returns:
+        int: The number of pitches with material changes.
+    """
+
+    columns = PitchColumns.from_documents(documents)
+    raining_by_location = np.array(
+        [raining[int(location.city.split()[-1])] for location in columns.locations]
+    )
+
+    changes = apply_rules_vectorized(
+        columns, raining_by_location[columns.location_codes], datetime.utcnow()
+    )
+    changes.updates(datetime.utcnow())
+
+    return len(changes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pitches", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    documents = generate_documents(args.pitches)
+    raining = np.random.rand(CITY_COUNT) < 0.5
+
+    results = {}
+    for name, process in [
+        ("objects", process_objects),
+        ("vectorized", process_vectorized),
+    ]:
+        best = min(
+            timeit.repeat(
+                lambda: process(documents, raining), number=1, repeat=args.repeat
+            )
+        )
+        results[name] = best / len(documents) * 1_000_000
+
+    for name, microseconds in results.items():
+        speedup = results["objects"] / microseconds
+        print(f"{name:>10}: {microseconds:8.2f} us/pitch ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,757 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from uuid import UUID, uuid4
+from pydantic import BaseModel
+from pymongo import ASCENDING, GEOSPHERE, IndexModel, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from pymongo.results import BulkWriteResult, UpdateResult
+from pitch_health_monitor.models.responses import PitchResponse
+from pitch_health_monitor.models.schemas import Pitch
+from . import HISTORY_RAW_RETENTION_DAYS
+
+MAINTENANCE_REQUIRED_FILTER = {"current_condition": {"$gt": 2, "$lt": 10}}
+
+TURF_REPLACEMENT_REQUIRED_FILTER = {"current_condition": {"$lte": 2}}
+
+EARTH_RADIUS_KM = 6378.1
+
+# Fields read or written by the processing rules, everything else is left out when loading due pitches
+PROCESSING_PROJECTION = {
+    "_id": 0,
+    "uuid": 1,
+    "name": 1,
+    "location": 1,
+    "turf_type": 1,
+    "current_condition": 1,
+    "last_checked_at": 1,
+    "next_scheduled_maintenance": 1,
+    "current_consecutive_rain_hours": 1,
+}
+
+# Fields returned by the read endpoints, so documents can be rendered without going through a Pitch
+RESPONSE_PROJECTION = {"_id": 0, **{name: 1 for name in PitchResponse.model_fields}}
+
+CHECK_TIME_PROJECTION = {"_id": 0, "uuid": 1, "last_checked_at": 1}
+
+LOCATION_PROJECTION = {"_id": 0, "uuid": 1, "location": 1}
+
+# Fields loaded into the columns of the vectorized rule engine
+RULE_COLUMNS_PROJECTION = {
+    "_id": 0,
+    "uuid": 1,
+    "location": 1,
+    "turf_type": 1,
+    "current_condition": 1,
+    "next_scheduled_maintenance": 1,
+    "current_consecutive_rain_hours": 1,
+}
+
+# Changes that may require the maintenance of a pitch to be scheduled or cancelled: creations and
+# condition updates. Scheduling maintenance only sets the next maintenance date, so it is not matched
+PITCH_CHANGES_PIPELINE = [
+    {
+        "$match": {
+            "$or": [
+                {"operationType": {"$in": ["insert", "replace"]}},
+                {
+                    "operationType": "update",
+                    "updateDescription.updatedFields.current_condition": {
+                        "$exists": True
+                    },
+                },
+            ]
+        }
+    },
+    {"$project": {"fullDocument.uuid": 1}},
+]
+
+# Fields whose changes are pushed to the subscribers of the pitch events
+PITCH_EVENT_FIELDS = (
+    "current_condition",
+    "next_scheduled_maintenance",
+    "replacement_date",
+)
+
+# Fields describing the pitch of an event, loaded by the engines that do not work on Pitch objects
+PITCH_EVENT_PROJECTION = {"_id": 0, "uuid": 1, "name": 1, "location": 1, "turf_type": 1}
+
+PITCH_EVENTS_PIPELINE = [
+    {
+        "$match": {
+            "operationType": "update",
+            "$or": [
+                {f"updateDescription.updatedFields.{name}": {"$exists": True}}
+                for name in PITCH_EVENT_FIELDS
+            ],
+        }
+    },
+    {
+        "$project": {
+            "clusterTime": 1,
+            "updateDescription.updatedFields": 1,
+            "fullDocument.uuid": 1,
+            "fullDocument.name": 1,
+            "fullDocument.location": 1,
+            "fullDocument.turf_type": 1,
+        }
+    },
+]
+
+PITCH_INDEXES = [
+    # Single pitch lookups, updates and deletions
+    IndexModel([("uuid", ASCENDING)], unique=True),
+    # Maintenance-required and turf-replacement-required listings
+    IndexModel([("current_condition", ASCENDING)]),
+    # Selection of the pitches due for processing
+    IndexModel([("last_checked_at", ASCENDING)]),
+    # Lookups of upcoming and due maintenance
+    IndexModel([("next_scheduled_maintenance", ASCENDING)]),
+    # Lookups of nearby pitches, pitches without coordinates are left out of the index
+    IndexModel([("location.coordinates", GEOSPHERE)]),
+]
+
+
+# Unit of the buckets of each rollup resolution of the condition history, in $dateTrunc terms
+HISTORY_ROLLUP_UNITS = {"hourly": "hour", "daily": "day"}
+
+# Resolution each rollup resolution is built from, and the time field of its documents
+HISTORY_ROLLUP_SOURCES = {
+    "hourly": ("raw", "recorded_at"),
+    "daily": ("hourly", "start"),
+}
+
+# Field of the rollups storing each field of the metadata of the raw condition history points, which
+# the rollups are grouped by so the history can be filtered on them without looking the pitches up
+HISTORY_ROLLUP_META_FIELDS = {
+    "uuid": "pitch_uuid",
+    "city": "city",
+    "country": "country",
+    "turf_type": "turf_type",
+}
+
+# Fields identifying a rollup, matched by $merge when the rollups of a time range are rebuilt
+HISTORY_ROLLUP_KEY = [*HISTORY_ROLLUP_META_FIELDS.values(), "start"]
+
+# Fields of the raw condition history points returned by the history endpoints
+HISTORY_POINT_PROJECTION = {
+    "_id": 0,
+    "recorded_at": 1,
+    "kind": 1,
+    "condition": 1,
+    "consecutive_rain_hours": 1,
+    "raining": 1,
+}
+
+
+def build_history_rollup_indexes(retention_days: int) -> List[IndexModel]:
+    """
+    Build the indexes of a rollup collection of the condition history.
+
+    Args:
+        retention_days: Number of days the rollups are kept, 0 keeping them forever.
+
+    Returns:
+        List[IndexModel]: The indexes.
+    """
+
+    retention = {"expireAfterSeconds": retention_days * 86400} if retention_days else {}
+
+    return [
+        # Upserts of the rollups by $merge, and range queries of a single pitch
+        IndexModel(
+            [
+                ("pitch_uuid", ASCENDING),
+                ("start", ASCENDING),
+                ("city", ASCENDING),
+                ("country", ASCENDING),
+                ("turf_type", ASCENDING),
+            ],
+            unique=True,
+        ),
+        # Range queries of the aggregate of many pitches, and expiration of the old rollups
+        IndexModel([("start", ASCENDING)], **retention),
+    ]
+
+
+@dataclass
+class BulkUpdateResult:
+    """
+    Outcome of a bulk update of pitches.
+
+    Attributes:
+        matched_count: Number of pitches found in the database.
+        modified_count: Number of pitches actually modified.
+        failures: Error message of every pitch that could not be written, by pitch UUID.
+    """
+
+    matched_count: int = 0
+    modified_count: int = 0
+    failures: Dict[UUID, str] = field(default_factory=dict)
+
+
+@dataclass
+class BulkInsertResult:
+    """
+    Outcome of a bulk insert of documents that are not pitches, such as condition history points.
+
+    Attributes:
+        inserted_count: Number of documents inserted.
+        errors: Distinct error messages of the documents or chunks that could not be inserted.
+    """
+
+    inserted_count: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def build_nearby_filter(longitude: float, latitude: float, radius_km: float) -> Dict:
+    """
+    Build the filter selecting the pitches located within a radius of a point.
+
+    Args:
+        longitude: Longitude of the center of the area.
+        latitude: Latitude of the center of the area.
+        radius_km: Radius of the area, in kilometers.
+
+    Returns:
+        Dict: The filter.
+    """
+
+    return {
+        "location.coordinates": {
+            "$geoWithin": {
+                "$centerSphere": [[longitude, latitude], radius_km / EARTH_RADIUS_KM]
+            }
+        }
+    }
+
+
+def get_changed_pitch_uuid(change: Dict[str, Any]) -> Optional[UUID]:
+    """
+    Get the UUID of the pitch of a change read from the change stream.
+
+    Args:
+        change: The change event.
+
+    Returns:
+        Optional[UUID]: The UUID of the pitch, or None if it was deleted since the change.
+    """
+
+    document = change.get("fullDocument")
+
+    return document["uuid"] if document else None
+
+
+def build_page_query(filters: Optional[Dict], after: Optional[UUID]) -> Dict:
+    """
+    Build the query selecting the pitches matching the filters that come after the cursor.
+
+    Args:
+        filters: Optional dictionary of filter criteria.
+        after: UUID of the last pitch of the previous page, or None for the first page.
+
+    Returns:
+        Dict: The query.
+    """
+
+    query = dict(filters) if filters is not None else {}
+
+    if after is not None:
+        query["uuid"] = {"$gt": after}
+
+    return query
+
+
+def build_due_query(checked_before: datetime) -> Dict:
+    """
+    Build the query selecting the pitches due for processing.
+
+    Args:
+        checked_before: Pitches last checked at or before this date are due.
+
+    Returns:
+        Dict: The query.
+    """
+
+    return {"last_checked_at": {"$lte": checked_before}}
+
+
+def build_lease_query(name: str, owner: str, now: datetime) -> Dict:
+    """
+    Build the query matching a lease the owner is allowed to take.
+
+    Args:
+        name: The name of the lease.
+        owner: The identifier of the process acquiring the lease.
+        now: The current time.
+
+    Returns:
+        Dict: The query.
+    """
+
+    return {
+        "_id": name,
+        "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}],
+    }
+
+
+def chunk_dirty_pitches(pitches: List[Pitch], chunk_size: int) -> Iterator[List[Pitch]]:
+    """
+    Split the pitches that have changes to write into chunks, leaving out the unchanged ones since they
+    do not need a round trip.
+
+    Args:
+        pitches: The pitch objects to update in the database.
+        chunk_size: Maximum number of pitches in a chunk.
+
+    Returns:
+        Iterator[List[Pitch]]: The chunks of pitches.
+    """
+
+    dirty_pitches = [pitch for pitch in pitches if pitch.dirty_fields]
+
+    for start in range(0, len(dirty_pitches), chunk_size):
+        yield dirty_pitches[start : start + chunk_size]
+
+
+def build_update_operations(pitches: List[Pitch]) -> List[UpdateOne]:
+    """
+    Build the bulk write operations setting the modified fields of each pitch.
+
+    Args:
+        pitches: The pitch objects to update in the database.
+
+    Returns:
+        List[UpdateOne]: One update operation per pitch, in the same order.
+    """
+
+    return [
+        UpdateOne({"uuid": pitch.uuid}, {"$set": pitch.dirty_dump()})
+        for pitch in pitches
+    ]
+
+
+def get_changed_fields(pitch: Union[Pitch, BaseModel]) -> Dict[str, Any]:
+    """
+    Serialize the fields of a pitch, or of a partial update request, that need to be written.
+
+    Args:
+        pitch: The pitch object or the partial update request.
+
+    Returns:
+        Dict[str, Any]: The fields modified on the pitch, or the fields explicitly set on the request.
+    """
+
+    if isinstance(pitch, Pitch):
+        return pitch.dirty_dump()
+
+    return pitch.model_dump(exclude_unset=True)
+
+
+def get_history_collection_options() -> Dict[str, Any]:
+    """
+    Get the options of the time-series collection of the raw condition history.
+
+    Returns:
+        Dict[str, Any]: The options of `create_collection`.
+    """
+
+    options: Dict[str, Any] = {
+        "timeseries": {
+            "timeField": "recorded_at",
+            "metaField": "pitch",
+            "granularity": "hours",
+        }
+    }
+
+    if HISTORY_RAW_RETENTION_DAYS:
+        options["expireAfterSeconds"] = HISTORY_RAW_RETENTION_DAYS * 86400
+
+    return options
+
+
+def build_history_rollup_pipeline(
+    resolution: str, start: datetime, end: datetime, into: str
+) -> List[Dict[str, Any]]:
+    """
+    Build the pipeline grouping the condition history of a time range into one rollup per pitch and
+    bucket, and merging them into the rollups collection. The rollups are grouped by the whole
+    metadata of the points, so a pitch moved or re-turfed within a bucket gets one rollup per
+    metadata, each counted under the filters it matched when checked.
+
+    Args:
+        resolution: The resolution of the rollups, "hourly" or "daily".
+        start: The start of the first bucket.
+        end: The end of the last bucket, excluded.
+        into: The name of the rollups collection.
+
+    Returns:
+        List[Dict[str, Any]]: The pipeline, to run on the source collection of the resolution.
+
+    Raises:
+        ValueError: If the resolution is unknown.
+    """
+
+    if resolution not in HISTORY_ROLLUP_UNITS:
+        raise ValueError(f"Unknown history resolution: {resolution}")
+
+    # Hourly rollups count the raw points, daily rollups add the hourly rollups up
+    if resolution == "hourly":
+        time_field = "recorded_at"
+        meta = {
+            field: f"$pitch.{meta_field}"
+            for meta_field, field in HISTORY_ROLLUP_META_FIELDS.items()
+        }
+        accumulators = {
+            "point_count": {"$sum": 1},
+            "condition_sum": {"$sum": "$condition"},
+            "condition_min": {"$min": "$condition"},
+            "condition_max": {"$max": "$condition"},
+            "rain_count": {"$sum": {"$cond": ["$raining", 1, 0]}},
+            "maintenance_count": {
+                "$sum": {"$cond": [{"$eq": ["$kind", "maintenance"]}, 1, 0]}
+            },
+        }
+    else:
+        time_field = "start"
+        meta = {field: f"${field}" for field in HISTORY_ROLLUP_META_FIELDS.values()}
+        accumulators = {
+            "point_count": {"$sum": "$point_count"},
+            "condition_sum": {"$sum": "$condition_sum"},
+            "condition_min": {"$min": "$condition_min"},
+            "condition_max": {"$max": "$condition_max"},
+            "rain_count": {"$sum": "$rain_count"},
+            "maintenance_count": {"$sum": "$maintenance_count"},
+        }
+
+    return [
+        {"$match": {time_field: {"$gte": start, "$lt": end}}},
+        {
+            "$group": {
+                "_id": {
+                    **meta,
+                    "start": {
+                        "$dateTrunc": {
+                            "date": f"${time_field}",
+                            "unit": HISTORY_ROLLUP_UNITS[resolution],
+                        }
+                    },
+                },
+                **accumulators,
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                **{field: f"$_id.{field}" for field in HISTORY_ROLLUP_KEY},
+                **{name: 1 for name in accumulators},
+            }
+        },
+        {
+            "$merge": {
+                "into": into,
+                "on": HISTORY_ROLLUP_KEY,
+                "whenMatched": "replace",
+                "whenNotMatched": "insert",
+            }
+        },
+    ]
+
+
+def build_history_query_pipeline(
+    start: datetime,
+    end: datetime,
+    pitch_uuids: Optional[List[UUID]],
+    aggregate: bool,
+    filters: Optional[Dict] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Build the pipeline reading the rollups of a time range, optionally merged across pitches.
+
+    Args:
+        start: The start of the range.
+        end: The end of the range, excluded.
+        pitch_uuids: The UUIDs of the pitches, or None for every pitch.
+        aggregate: Whether to merge the rollups of all pitches into one bucket per time bucket.
+        filters: Filter criteria on the pitch fields stored in the rollups: city, country and
+            turf_type.
+
+    Returns:
+        List[Dict[str, Any]]: The pipeline, to run on a rollups collection.
+    """
+
+    query: Dict[str, Any] = {"start": {"$gte": start, "$lt": end}, **(filters or {})}
+    if pitch_uuids is not None:
+        query["pitch_uuid"] = {"$in": pitch_uuids}
+
+    pipeline: List[Dict[str, Any]] = [{"$match": query}]
+
+    if aggregate:
+        pipeline.append(
+            {
+                "$group": {
+                    "_id": "$start",
+                    "pitch_count": {"$sum": 1},
+                    "point_count": {"$sum": "$point_count"},
+                    "condition_sum": {"$sum": "$condition_sum"},
+                    "condition_min": {"$min": "$condition_min"},
+                    "condition_max": {"$max": "$condition_max"},
+                    "rain_count": {"$sum": "$rain_count"},
+                    "maintenance_count": {"$sum": "$maintenance_count"},
+                }
+            }
+        )
+        pipeline.append({"$set": {"start": "$_id"}})
+
+    pipeline += [
+        {"$sort": {"start": ASCENDING}},
+        {
+            "$project": {
+                "_id": 0,
+                "start": 1,
+                "pitch_count": {"$ifNull": ["$pitch_count", 1]},
+                "point_count": 1,
+                "condition_avg": {"$divide": ["$condition_sum", "$point_count"]},
+                "condition_min": 1,
+                "condition_max": 1,
+                "rain_count": 1,
+                "maintenance_count": 1,
+            }
+        },
+    ]
+
+    return pipeline
+
+
+def get_explained_queries(
+    pitches: str, leases: str, history: str, hourly_history: str
+) -> Dict[str, Dict[str, Any]]:
+    """
+    List the queries issued by the application, as examples to explain.
+
+    Args:
+        pitches: The name of the pitches collection.
+        leases: The name of the leases collection.
+        history: The name of the raw condition history collection.
+        hourly_history: The name of the hourly condition history collection.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The find or aggregate command, by query name.
+    """
+
+    now = datetime.utcnow()
+    pitch_uuids = [uuid4() for _ in range(10)]
+
+    return {
+        "get_pitch": _find_command(pitches, {"uuid": uuid4()}, RESPONSE_PROJECTION),
+        "get_all_pitches": _find_command(pitches, {}, RESPONSE_PROJECTION),
+        "maintenance_required": _find_command(
+            pitches, MAINTENANCE_REQUIRED_FILTER, RESPONSE_PROJECTION
+        ),
+        "turf_replacement_required": _find_command(
+            pitches, TURF_REPLACEMENT_REQUIRED_FILTER, RESPONSE_PROJECTION
+        ),
+        "nearby": _find_command(
+            pitches, build_nearby_filter(7.7765, 49.4344, 10), RESPONSE_PROJECTION
+        ),
+        "due_pitches": _find_command(
+            pitches, build_due_query(now), PROCESSING_PROJECTION
+        ),
+        "pitches_by_uuid": _find_command(
+            pitches, {"uuid": {"$in": pitch_uuids}}, PROCESSING_PROJECTION
+        ),
+        "pitch_check_times": _find_command(pitches, {}, CHECK_TIME_PROJECTION),
+        "processor_lease": _find_command(
+            leases, build_lease_query("pitch-processor", "owner", now), limit=1
+        ),
+        "pitch_history": _find_command(
+            history,
+            {
+                "pitch.uuid": pitch_uuids[0],
+                "recorded_at": {"$gte": now - timedelta(days=1), "$lt": now},
+            },
+            HISTORY_POINT_PROJECTION,
+            sort={"recorded_at": ASCENDING},
+        ),
+        "history_rollups": {
+            "aggregate": hourly_history,
+            "pipeline": build_history_query_pipeline(
+                now - timedelta(days=7),
+                now,
+                None,
+                aggregate=True,
+                filters={"city": {"$in": ["Kaiserslautern"]}},
+            ),
+            "cursor": {},
+        },
+    }
+
+
+def _find_command(
+    collection: str,
+    query: Dict,
+    projection: Optional[Dict] = None,
+    **options: Any,
+) -> Dict[str, Any]:
+    """
+    Build a find command, as passed to the explain command.
+
+    Args:
+        collection: The name of the collection.
+        query: The query.
+        projection: The fields to load, or None to load full documents.
+        **options: Other options of the command, e.g. the sort order or the limit.
+
+    Returns:
+        Dict[str, Any]: The command.
+    """
+
+    command = {"find": collection, "filter": query, **options}
+    if projection is not None:
+        command["projection"] = projection
+
+    return command
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the relevant parts of an explain output at the query planner verbosity, which plans the
+    query without running it.
+
+    Args:
+        explain: The output of the explain command.
+
+    Returns:
+        Dict[str, Any]: The winning plan stages, and whether the query scans the whole collection.
+    """
+
+    query_planner = explain.get("queryPlanner")
+    if query_planner is None:
+        # Aggregations report the plan of the cursor feeding their first stage
+        stages = explain.get("stages") or [{}]
+        query_planner = stages[0].get("$cursor", {}).get("queryPlanner", {})
+
+    winning_plan = query_planner.get("winningPlan", {})
+    # Plans executed by the slot-based engine nest the classic plan under "queryPlan"
+    plan = winning_plan.get("queryPlan", winning_plan)
+
+    stages = []
+    while plan:
+        stage = plan.get("stage", "UNKNOWN")
+        if "indexName" in plan:
+            stage = f"{stage}({plan['indexName']})"
+        stages.append(stage)
+
+        plan = plan.get("inputStage") or next(iter(plan.get("inputStages", [])), None)
+
+    return {
+        "stages": stages,
+        "uses_collection_scan": "COLLSCAN" in stages,
+        "namespace": query_planner.get("namespace"),
+    }
+
+
+@contextmanager
+def record_chunk_failures(
+    result: BulkUpdateResult, pitch_uuids: List[UUID]
+) -> Iterator[None]:
+    """
+    Record the failures of the chunk of pitches written in the block into the result instead of raising
+    them, so a failing document or chunk does not prevent the remaining chunks from being written.
+
+    Args:
+        result: The result of the whole bulk write.
+        pitch_uuids: The UUIDs of the pitches written, in the order of the operations.
+
+    Returns:
+        Iterator[None]: Nothing, for use in a `with` statement.
+    """
+
+    try:
+        yield
+
+    except BulkWriteError as e:
+        # Unordered writes keep going after an error, so only the reported documents failed
+        result.matched_count += e.details.get("nMatched", 0)
+        result.modified_count += e.details.get("nModified", 0)
+
+        for write_error in e.details.get("writeErrors", []):
+            result.failures[pitch_uuids[write_error["index"]]] = write_error.get(
+                "errmsg", ""
+            )
+
+    except PyMongoError as e:
+        for pitch_uuid in pitch_uuids:
+            result.failures[pitch_uuid] = str(e)
+
+
+def record_chunk_counts(
+    result: BulkUpdateResult, chunk_result: Union[BulkWriteResult, UpdateResult]
+) -> None:
+    """
+    Add the counts of a successful write of a chunk of pitches to the result.
+
+    Args:
+        result: The result of the whole bulk write.
+        chunk_result: The result of the bulk write or of the update of the chunk.
+    """
+
+    result.matched_count += chunk_result.matched_count
+    result.modified_count += chunk_result.modified_count
+
+
+def mark_written_pitches_clean(result: BulkUpdateResult, pitches: List[Pitch]) -> None:
+    """
+    Mark the pitches of a chunk as clean, except those that could not be written and keep their
+    changes for the next attempt.
+
+    Args:
+        result: The result of the whole bulk write.
+        pitches: The pitches of the chunk.
+    """
+
+    for pitch in pitches:
+        if pitch.uuid not in result.failures:
+            pitch.mark_clean()
+
+
+@contextmanager
+def record_insert_failures(result: BulkInsertResult) -> Iterator[None]:
+    """
+    Record the failures of the chunk of documents inserted in the block into the result instead of
+    raising them, so a failing document or chunk does not prevent the remaining chunks from being
+    inserted.
+
+    Args:
+        result: The result of the whole bulk insert.
+
+    Returns:
+        Iterator[None]: Nothing, for use in a `with` statement.
+    """
+
+    try:
+        yield
+
+    except BulkWriteError as e:
+        # Unordered inserts keep going after an error, so only the reported documents failed
+        result.inserted_count += e.details.get("nInserted", 0)
+
+        for write_error in e.details.get("writeErrors", []):
+            _add_error(result, write_error.get("errmsg", ""))
+
+    except PyMongoError as e:
+        _add_error(result, str(e))
+
+
+def _add_error(result: BulkInsertResult, message: str) -> None:
+    """
+    Add an error message to the result of a bulk insert, unless it was already reported.
+
+    Args:
+        result: The result of the whole bulk insert.
+        message: The error message.
+    """
+
+    if message not in result.errors:
+        result.errors.append(message)
@@ -1,31 +1,185 @@
-from ast import Dict
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 from uuid import UUID
-from pitch_health_monitor.models.schemas import Pitch
-from . import db_client
+from pydantic import BaseModel
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import CollectionInvalid, DuplicateKeyError
+from pymongo.change_stream import CollectionChangeStream
+from pymongo.collection import Collection
+from pitch_health_monitor.models.schemas import Location, Pitch
+from . import (
+    HISTORY_DAILY_RETENTION_DAYS,
+    HISTORY_HOURLY_RETENTION_DAYS,
+    db_client,
+)
+from .common import (
+    CHECK_TIME_PROJECTION,
+    HISTORY_POINT_PROJECTION,
+    HISTORY_ROLLUP_SOURCES,
+    LOCATION_PROJECTION,
+    PITCH_CHANGES_PIPELINE,
+    PITCH_INDEXES,
+    PROCESSING_PROJECTION,
+    RESPONSE_PROJECTION,
+    RULE_COLUMNS_PROJECTION,
+    BulkInsertResult,
+    BulkUpdateResult,
+    build_due_query,
+    build_history_query_pipeline,
+    build_history_rollup_indexes,
+    build_history_rollup_pipeline,
+    build_lease_query,
+    build_page_query,
+    build_update_operations,
+    chunk_dirty_pitches,
+    get_changed_fields,
+    get_explained_queries,
+    get_history_collection_options,
+    mark_written_pitches_clean,
+    record_chunk_counts,
+    record_chunk_failures,
+    record_insert_failures,
+    summarize_explain,
+)
 
 pitches_collection = db_client.get_database().get_collection("pitches")
+leases_collection = db_client.get_database().get_collection("leases")
+history_collection = db_client.get_database().get_collection("condition_history")
+hourly_history_collection = db_client.get_database().get_collection(
+    "condition_history_hourly"
+)
+daily_history_collection = db_client.get_database().get_collection(
+    "condition_history_daily"
+)
 
 
-def update_pitch_in_db(pitch_uuid: UUID, pitch: Pitch) -> bool:
+def update_pitch_in_db(pitch_uuid: UUID, pitch: Union[Pitch, BaseModel]) -> bool:
     """
-    Update a pitch object in the database.
+    Update a pitch object in the database, sending only the fields that changed.
 
     Args:
         pitch_uuid: The UUID of the pitch object to delete from the database.
-        pitch: The pitch object to update in the database.
+        pitch: The pitch object, or a partial update request, to update in the database.
 
     Returns:
         bool: True if the pitch was successfully updated, False otherwise.
     """
 
-    result = pitches_collection.update_one(
-        {"uuid": pitch_uuid}, {"$set": pitch.model_dump()}
-    )
+    changes = get_changed_fields(pitch)
+
+    # Nothing changed, so there is nothing to send to the database
+    if not changes:
+        return False
+
+    result = pitches_collection.update_one({"uuid": pitch_uuid}, {"$set": changes})
+
+    if isinstance(pitch, Pitch):
+        pitch.mark_clean()
 
     return result.modified_count > 0
 
 
+def bulk_update_pitches_in_db(
+    pitches: List[Pitch], chunk_size: int = 500
+) -> BulkUpdateResult:
+    """
+    Update many pitch objects in the database using unordered bulk writes.
+
+    Pitches are sent in chunks of at most `chunk_size` operations, each one only setting the fields that
+    changed. A failing document or chunk is reported in the result without preventing the remaining
+    pitches from being written.
+
+    Args:
+        pitches: The pitch objects to update in the database.
+        chunk_size: Maximum number of updates sent in a single bulk write.
+
+    Returns:
+        BulkUpdateResult: The counts of matched and modified pitches and the failures by pitch UUID.
+    """
+
+    result = BulkUpdateResult()
+
+    for chunk in chunk_dirty_pitches(pitches, chunk_size):
+        with record_chunk_failures(result, [pitch.uuid for pitch in chunk]):
+            record_chunk_counts(
+                result,
+                pitches_collection.bulk_write(
+                    build_update_operations(chunk), ordered=False
+                ),
+            )
+
+        mark_written_pitches_clean(result, chunk)
+
+    return result
+
+
+def bulk_set_pitch_fields_in_db(
+    updates: List[Tuple[UUID, Dict[str, Any]]], chunk_size: int = 500
+) -> BulkUpdateResult:
+    """
+    Set the given fields of many pitches using unordered bulk writes, without going through Pitch
+    objects.
+
+    Args:
+        updates: The UUID of each pitch and the fields to set on it.
+        chunk_size: Maximum number of updates sent in a single bulk write.
+
+    Returns:
+        BulkUpdateResult: The counts of matched and modified pitches and the failures by pitch UUID.
+    """
+
+    result = BulkUpdateResult()
+
+    for start in range(0, len(updates), chunk_size):
+        chunk = updates[start : start + chunk_size]
+
+        with record_chunk_failures(result, [pitch_uuid for pitch_uuid, _ in chunk]):
+            record_chunk_counts(
+                result,
+                pitches_collection.bulk_write(
+                    [
+                        UpdateOne({"uuid": pitch_uuid}, {"$set": fields})
+                        for pitch_uuid, fields in chunk
+                    ],
+                    ordered=False,
+                ),
+            )
+
+    return result
+
+
+def mark_pitches_checked_in_db(
+    pitch_uuids: List[UUID], checked_at: datetime, chunk_size: int = 10000
+) -> BulkUpdateResult:
+    """
+    Set the last checked date of many pitches, with one update per chunk of UUIDs.
+
+    Args:
+        pitch_uuids: The UUIDs of the pitches checked.
+        checked_at: The date at which the pitches were checked.
+        chunk_size: Maximum number of UUIDs matched by a single update.
+
+    Returns:
+        BulkUpdateResult: The counts of matched and modified pitches and the failures by pitch UUID.
+    """
+
+    result = BulkUpdateResult()
+
+    for start in range(0, len(pitch_uuids), chunk_size):
+        chunk_uuids = pitch_uuids[start : start + chunk_size]
+
+        with record_chunk_failures(result, chunk_uuids):
+            record_chunk_counts(
+                result,
+                pitches_collection.update_many(
+                    {"uuid": {"$in": chunk_uuids}},
+                    {"$set": {"last_checked_at": checked_at}},
+                ),
+            )
+
+    return result
+
+
 def create_pitch_in_db(pitch: Pitch) -> bool:
     """
     Create a new pitch object in the database.
@@ -42,6 +196,34 @@ def create_pitch_in_db(pitch: Pitch) -> bool:
     return result.acknowledged
 
 
+def create_pitches_in_db(
+    pitches: List[Pitch], chunk_size: int = 500
+) -> Dict[UUID, str]:
+    """
+    Create many pitch objects in the database using unordered bulk inserts. A failing pitch does not
+    prevent the remaining ones from being created.
+
+    Args:
+        pitches: The pitch objects to create in the database.
+        chunk_size: Maximum number of pitches sent in a single bulk insert.
+
+    Returns:
+        Dict[UUID, str]: The error message of every pitch that could not be created, by pitch UUID.
+    """
+
+    result = BulkUpdateResult()
+
+    for start in range(0, len(pitches), chunk_size):
+        chunk = pitches[start : start + chunk_size]
+
+        with record_chunk_failures(result, [pitch.uuid for pitch in chunk]):
+            pitches_collection.insert_many(
+                [pitch.model_dump() for pitch in chunk], ordered=False
+            )
+
+    return result.failures
+
+
 def delete_pitch_from_db(pitch_uuid: UUID) -> bool:
     """
     Delete a pitch object from the database.
@@ -80,6 +262,9 @@ def get_pitch_from_db(
 
     pitch = pitches_collection.find_one(query)
 
+    if pitch is None:
+        return None
+
     return Pitch.model_validate(pitch)
 
 
@@ -102,3 +287,478 @@ def get_all_pitches_from_db(filters: Optional[Dict] = None) -> List[Pitch]:
 
     # Convert each pitch document into a Pitch object
     return [Pitch.model_validate(pitch) for pitch in pitches]
+
+
+def get_pitch_document_from_db(
+    pitch_id: UUID, projection: Optional[Dict] = RESPONSE_PROJECTION
+) -> Optional[Dict[str, Any]]:
+    """
+    Retrieve the raw document of a pitch from the database by its ID, without validating it.
+
+    Args:
+        pitch_id: The ID of the pitch to retrieve.
+        projection: The fields to load, or None to load the full document.
+
+    Returns:
+        Optional[Dict[str, Any]]: The pitch document, or None if not found.
+    """
+
+    return pitches_collection.find_one({"uuid": pitch_id}, projection)
+
+
+def get_pitch_documents_from_db(
+    filters: Optional[Dict] = None,
+    limit: Optional[int] = None,
+    after: Optional[UUID] = None,
+    projection: Optional[Dict] = RESPONSE_PROJECTION,
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve the raw documents of the pitches matching the filters, without validating them.
+
+    When a limit is given, pitches are ordered by UUID and the UUID of the last pitch of the previous
+    page is used as the cursor, so each page is an index range scan regardless of how deep it is.
+
+    Args:
+        filters: Optional dictionary of filter criteria.
+        limit: Maximum number of pitches in the page, or None to retrieve all of them.
+        after: UUID of the last pitch of the previous page, or None for the first page.
+        projection: The fields to load, or None to load full documents.
+
+    Returns:
+        List[Dict[str, Any]]: The pitch documents that match the filter criteria.
+    """
+
+    pitches = pitches_collection.find(build_page_query(filters, after), projection)
+
+    if limit is not None:
+        pitches = pitches.sort("uuid", ASCENDING).limit(limit)
+
+    return list(pitches)
+
+
+def iter_pitch_documents_from_db(
+    filters: Optional[Dict] = None,
+    batch_size: int = 500,
+    projection: Optional[Dict] = RESPONSE_PROJECTION,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the raw documents of the pitches matching the filters, fetching them from the database
+    in batches, so only one batch is held in memory at a time.
+
+    Args:
+        filters: Optional dictionary of filter criteria.
+        batch_size: Number of documents fetched from the database per round trip.
+        projection: The fields to load, or None to load full documents.
+
+    Returns:
+        Iterator[Dict[str, Any]]: The pitch documents that match the filter criteria.
+    """
+
+    query_filters = filters if filters is not None else {}
+
+    yield from pitches_collection.find(query_filters, projection).batch_size(batch_size)
+
+
+def get_due_pitches_from_db(
+    checked_before: datetime, projection: Optional[Dict] = PROCESSING_PROJECTION
+) -> List[Pitch]:
+    """
+    Retrieve the pitches that were not checked since the given date, selecting them on the server.
+
+    Only the projected fields are loaded, the remaining ones take their default values. Since updates
+    only write the fields that changed, the fields left out are never overwritten.
+
+    Args:
+        checked_before: Pitches last checked at or before this date are due.
+        projection: The fields to load, or None to load full documents.
+
+    Returns:
+        List[Pitch]: A list of the pitch objects due for processing.
+    """
+
+    pitches = pitches_collection.find(build_due_query(checked_before), projection)
+
+    return [Pitch.model_validate(pitch) for pitch in pitches]
+
+
+def iter_due_pitch_documents_from_db(
+    checked_before: datetime,
+    batch_size: int = 500,
+    projection: Optional[Dict] = RULE_COLUMNS_PROJECTION,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over the raw documents of the pitches that were not checked since the given date, fetching
+    them from the database in batches.
+
+    Args:
+        checked_before: Pitches last checked at or before this date are due.
+        batch_size: Number of documents fetched from the database per round trip.
+        projection: The fields to load, or None to load full documents.
+
+    Returns:
+        Iterator[Dict[str, Any]]: The documents of the pitches due for processing.
+    """
+
+    return iter_pitch_documents_from_db(
+        build_due_query(checked_before), batch_size, projection
+    )
+
+
+def get_due_pitch_locations_from_db(
+    checked_before: datetime,
+) -> List[Tuple[UUID, Location]]:
+    """
+    Retrieve the location of the pitches that were not checked since the given date.
+
+    Args:
+        checked_before: Pitches last checked at or before this date are due.
+
+    Returns:
+        List[Tuple[UUID, Location]]: The UUID and location of every due pitch.
+    """
+
+    pitches = pitches_collection.find(
+        build_due_query(checked_before), LOCATION_PROJECTION
+    )
+
+    return [
+        (pitch["uuid"], Location.model_validate(pitch["location"])) for pitch in pitches
+    ]
+
+
+def get_pitches_by_uuid_from_db(
+    pitch_uuids: List[UUID], projection: Optional[Dict] = PROCESSING_PROJECTION
+) -> List[Pitch]:
+    """
+    Retrieve the pitches with the given UUIDs. Pitches that no longer exist are left out.
+
+    Args:
+        pitch_uuids: The UUIDs of the pitches to retrieve.
+        projection: The fields to load, or None to load full documents.
+
+    Returns:
+        List[Pitch]: A list of the pitch objects found.
+    """
+
+    pitches = pitches_collection.find({"uuid": {"$in": pitch_uuids}}, projection)
+
+    return [Pitch.model_validate(pitch) for pitch in pitches]
+
+
+def get_existing_pitch_uuids_from_db(pitch_uuids: List[UUID]) -> Set[UUID]:
+    """
+    Find which of the given pitches exist, loading nothing but their UUID.
+
+    Args:
+        pitch_uuids: The UUIDs of the pitches to look for.
+
+    Returns:
+        Set[UUID]: The UUIDs of the pitches found.
+    """
+
+    pitches = pitches_collection.find(
+        {"uuid": {"$in": pitch_uuids}}, {"_id": 0, "uuid": 1}
+    )
+
+    return {pitch["uuid"] for pitch in pitches}
+
+
+def get_pitch_check_times_from_db() -> List[Tuple[UUID, datetime]]:
+    """
+    Retrieve when every pitch was last checked, loading nothing else.
+
+    Returns:
+        List[Tuple[UUID, datetime]]: The UUID and last checked date of every pitch.
+    """
+
+    pitches = pitches_collection.find({}, CHECK_TIME_PROJECTION)
+
+    return [(pitch["uuid"], pitch["last_checked_at"]) for pitch in pitches]
+
+
+def open_pitch_change_stream(
+    resume_after: Optional[Dict] = None,
+    pipeline: List[Dict] = PITCH_CHANGES_PIPELINE,
+) -> CollectionChangeStream:
+    """
+    Open a change stream of the pitch changes that may affect their maintenance schedule, by default.
+    Change streams are only available on replica sets and sharded clusters.
+
+    Args:
+        resume_after: Resume token of the last change processed, to resume the stream after it.
+        pipeline: The aggregation pipeline selecting the changes.
+
+    Returns:
+        CollectionChangeStream: The change stream, whose changes of the default pipeline are read with
+            `get_changed_pitch_uuid`.
+    """
+
+    return pitches_collection.watch(
+        pipeline, full_document="updateLookup", resume_after=resume_after
+    )
+
+
+def acquire_lease_in_db(name: str, owner: str, ttl: timedelta) -> bool:
+    """
+    Acquire or renew a lease, succeeding only if it is free, expired or already held by the owner.
+
+    Args:
+        name: The name of the lease.
+        owner: The identifier of the process acquiring the lease.
+        ttl: How long the lease is held without being renewed.
+
+    Returns:
+        bool: True if the owner holds the lease, False otherwise.
+    """
+
+    now = datetime.utcnow()
+
+    try:
+        lease = leases_collection.find_one_and_update(
+            build_lease_query(name, owner, now),
+            {"$set": {"owner": owner, "expires_at": now + ttl}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # The lease exists and is held by someone else, so the upsert tried to create it again
+        return False
+
+    return lease is not None and lease["owner"] == owner
+
+
+def release_lease_in_db(name: str, owner: str) -> bool:
+    """
+    Release a lease, if it is held by the owner.
+
+    Args:
+        name: The name of the lease.
+        owner: The identifier of the process releasing the lease.
+
+    Returns:
+        bool: True if the lease was released, False otherwise.
+    """
+
+    result = leases_collection.delete_one({"_id": name, "owner": owner})
+
+    return result.deleted_count > 0
+
+
+def insert_history_points_in_db(
+    points: List[Dict[str, Any]], chunk_size: int = 500
+) -> BulkInsertResult:
+    """
+    Insert condition history points using unordered bulk inserts. A failing point or chunk does not
+    prevent the remaining points from being inserted.
+
+    Args:
+        points: The points to insert.
+        chunk_size: Maximum number of points sent in a single bulk insert.
+
+    Returns:
+        BulkInsertResult: The number of points inserted and the errors of the points lost.
+    """
+
+    result = BulkInsertResult()
+
+    for start in range(0, len(points), chunk_size):
+        chunk = points[start : start + chunk_size]
+
+        with record_insert_failures(result):
+            chunk_result = history_collection.insert_many(chunk, ordered=False)
+            result.inserted_count += len(chunk_result.inserted_ids)
+
+    return result
+
+
+def get_history_rollup_start_from_db(resolution: str) -> Optional[datetime]:
+    """
+    Find where the next rollup of the condition history should start: at the latest bucket already
+    rolled up, which may have received late points, or at the oldest source point if there is none.
+
+    Args:
+        resolution: The resolution of the rollups, "hourly" or "daily".
+
+    Returns:
+        Optional[datetime]: The date to roll up from, or None if there is nothing to roll up.
+    """
+
+    source_resolution, time_field = HISTORY_ROLLUP_SOURCES[resolution]
+
+    latest_rollup = _get_history_collection(resolution).find_one(
+        {}, {"_id": 0, "start": 1}, sort=[("start", -1)]
+    )
+    if latest_rollup is not None:
+        return latest_rollup["start"]
+
+    oldest_point = _get_history_collection(source_resolution).find_one(
+        {}, {"_id": 0, time_field: 1}, sort=[(time_field, 1)]
+    )
+
+    return oldest_point[time_field] if oldest_point is not None else None
+
+
+def rollup_history_in_db(resolution: str, start: datetime, end: datetime) -> None:
+    """
+    Downsample the condition history of a time range into rollups, replacing the rollups of the range
+    rolled up before. Hourly rollups are built from the raw points, daily rollups from the hourly ones.
+
+    Args:
+        resolution: The resolution of the rollups, "hourly" or "daily".
+        start: The start of the first bucket to roll up.
+        end: The end of the last bucket to roll up, excluded.
+    """
+
+    source_resolution, _ = HISTORY_ROLLUP_SOURCES[resolution]
+
+    _get_history_collection(source_resolution).aggregate(
+        build_history_rollup_pipeline(
+            resolution, start, end, _get_history_collection(resolution).name
+        )
+    )
+
+
+def get_pitch_history_from_db(
+    pitch_uuid: UUID, start: datetime, end: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve the raw condition history points of a pitch in a time range.
+
+    Args:
+        pitch_uuid: The UUID of the pitch.
+        start: The start of the range.
+        end: The end of the range, excluded.
+
+    Returns:
+        List[Dict[str, Any]]: The points, from the oldest to the most recent.
+    """
+
+    return list(
+        history_collection.find(
+            {"pitch.uuid": pitch_uuid, "recorded_at": {"$gte": start, "$lt": end}},
+            HISTORY_POINT_PROJECTION,
+        ).sort("recorded_at", ASCENDING)
+    )
+
+
+def get_history_rollups_from_db(
+    resolution: str,
+    start: datetime,
+    end: datetime,
+    pitch_uuids: Optional[List[UUID]] = None,
+    aggregate: bool = False,
+    filters: Optional[Dict] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve the rolled up condition history of a time range, for a single pitch or aggregated over
+    many pitches.
+
+    Args:
+        resolution: The resolution of the rollups, "hourly" or "daily".
+        start: The start of the range.
+        end: The end of the range, excluded.
+        pitch_uuids: The UUIDs of the pitches, or None for every pitch.
+        aggregate: Whether to merge the rollups of all pitches into one bucket per time bucket.
+        filters: Filter criteria on the pitch fields stored in the rollups: city, country and
+            turf_type.
+
+    Returns:
+        List[Dict[str, Any]]: The buckets, from the oldest to the most recent.
+    """
+
+    return list(
+        _get_history_collection(resolution).aggregate(
+            build_history_query_pipeline(start, end, pitch_uuids, aggregate, filters)
+        )
+    )
+
+
+def ensure_indexes() -> None:
+    """
+    Create the indexes used by the application queries, if they do not exist yet.
+    """
+
+    pitches_collection.create_indexes(PITCH_INDEXES)
+
+
+def ensure_history_collections() -> None:
+    """
+    Create the condition history collections and their indexes if they do not exist yet, and apply
+    the retention settings to them. Requires MongoDB 5.0 or later, for time-series collections.
+    """
+
+    database = history_collection.database
+    options = get_history_collection_options()
+
+    try:
+        database.create_collection(history_collection.name, **options)
+
+    except CollectionInvalid:
+        # The collection exists already, only its expiration can be changed
+        database.command(
+            "collMod",
+            history_collection.name,
+            expireAfterSeconds=options.get("expireAfterSeconds", "off"),
+        )
+
+    # Range queries of a single pitch, not served by the default index on the whole metadata
+    history_collection.create_index(
+        [("pitch.uuid", ASCENDING), ("recorded_at", ASCENDING)]
+    )
+
+    hourly_history_collection.create_indexes(
+        build_history_rollup_indexes(HISTORY_HOURLY_RETENTION_DAYS)
+    )
+    daily_history_collection.create_indexes(
+        build_history_rollup_indexes(HISTORY_DAILY_RETENTION_DAYS)
+    )
+
+
+def explain_queries() -> Dict[str, Dict[str, Any]]:
+    """
+    Explain the queries issued by the application, planning them without running them.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: A summary of the winning plan, by query name.
+    """
+
+    database = pitches_collection.database
+    queries = get_explained_queries(
+        pitches_collection.name,
+        leases_collection.name,
+        history_collection.name,
+        hourly_history_collection.name,
+    )
+
+    return {
+        name: summarize_explain(
+            database.command("explain", command, verbosity="queryPlanner")
+        )
+        for name, command in queries.items()
+    }
+
+
+def _get_history_collection(resolution: str) -> Collection:
+    """
+    Get the collection of a resolution of the condition history.
+
+    Args:
+        resolution: The resolution, "raw", "hourly" or "daily".
+
+    Returns:
+        Collection: The collection of the raw points or of the rollups.
+
+    Raises:
+        ValueError: If the resolution is unknown.
+    """
+
+    collections = {
+        "raw": history_collection,
+        "hourly": hourly_history_collection,
+        "daily": daily_history_collection,
+    }
+
+    if resolution not in collections:
+        raise ValueError(f"Unknown history resolution: {resolution}")
+
+    return collections[resolution]
@@ -0,0 +1,464 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+import hashlib
+import json
+import logging
+import os
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+)
+from uuid import UUID
+from pitch_health_monitor.services.metrics import READ_CACHE_LOOKUPS
+from pitch_health_monitor.services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Either "memory", caching the rendered reads in each process, "redis", sharing them between all
+# workers through Redis, or "none"
+READ_CACHE_BACKEND = os.getenv("READ_CACHE_BACKEND", "memory")
+READ_CACHE_REDIS_URL = os.getenv("READ_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Entries are invalidated by the writes of the process, the TTL bounds how long the writes of other
+# processes may go unnoticed when the cache is not shared
+READ_CACHE_TTL_SECONDS = float(os.getenv("READ_CACHE_TTL_SECONDS", "30"))
+READ_CACHE_MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", "1000"))
+
+# Tag of the cached lists, invalidated by every write that may add or remove pitches from a list
+LIST_MEMBERSHIP_TAG = "lists"
+
+# Fields the cached lists filter on
+LIST_MEMBERSHIP_FIELDS = frozenset({"current_condition"})
+
+
+@dataclass
+class CachedResponse:
+    """
+    Rendered body of a read endpoint, with its entity tag.
+
+    Attributes:
+        body: The JSON body.
+        headers: Additional response headers, e.g. the cursor of the next page.
+        etag: The entity tag of the body.
+    """
+
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: str = ""
+
+    def __post_init__(self):
+        if not self.etag:
+            self.etag = f'"{hashlib.blake2b(self.body, digest_size=16).hexdigest()}"'
+
+
+class ReadCache(ABC):
+    """
+    Abstract base class for the caches of the rendered read endpoints.
+
+    Every entry is stored with tags, and invalidating a tag drops all entries stored with it. Entries
+    are only stored if no invalidation happened since their load started, so a load racing with a
+    write never caches the state from before the write.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Retrieve a valid entry.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[CachedResponse]: The cached response, or None if there is no valid entry.
+        """
+        pass
+
+    @abstractmethod
+    async def get_sequence(self) -> int:
+        """
+        Get the number of invalidations so far, to pass to `set` once the entry is loaded.
+
+        Returns:
+            int: The invalidation sequence number.
+        """
+        pass
+
+    @abstractmethod
+    async def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        tags: Iterable[str],
+        sequence: int,
+    ) -> None:
+        """
+        Store an entry, unless an invalidation happened since the sequence number was read.
+
+        Args:
+            key (str): The key of the entry.
+            response (CachedResponse): The response to cache.
+            tags (Iterable[str]): The tags invalidating the entry.
+            sequence (int): The invalidation sequence number read before loading the entry.
+        """
+        pass
+
+    @abstractmethod
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        """
+        Drop all entries stored with any of the tags.
+
+        Args:
+            tags (Iterable[str]): The invalidated tags.
+        """
+        pass
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """
+        Drop all entries.
+        """
+        pass
+
+
+class NullReadCache(ReadCache):
+    """
+    Read cache that never stores anything.
+    """
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return None
+
+    async def get_sequence(self) -> int:
+        return 0
+
+    async def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        tags: Iterable[str],
+        sequence: int,
+    ) -> None:
+        pass
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        pass
+
+    async def clear(self) -> None:
+        pass
+
+
+class MemoryReadCache(ReadCache):
+    """
+    Read cache kept in the memory of the process, bounded in size and time.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        """
+        Initialize the MemoryReadCache.
+
+        Args:
+            ttl_seconds (float): Number of seconds an entry stays valid.
+            max_entries (int): Maximum number of entries kept before evicting the least recently used.
+        """
+        self.cache = TTLCache(ttl_seconds, max_entries, on_evict=self._forget)
+        self._sequence = 0
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._tags_by_key: Dict[str, FrozenSet[str]] = {}
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return self.cache.get(key)
+
+    async def get_sequence(self) -> int:
+        return self._sequence
+
+    async def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        tags: Iterable[str],
+        sequence: int,
+    ) -> None:
+
+        if sequence != self._sequence:
+            return
+
+        self._forget(key)
+
+        tags = frozenset(tags)
+        self._tags_by_key[key] = tags
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+
+        self.cache.set(key, response)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+
+        self._sequence += 1
+
+        for tag in tags:
+            for key in self._keys_by_tag.pop(tag, set()):
+                self.cache.delete(key)
+                self._forget(key)
+
+    async def clear(self) -> None:
+
+        self._sequence += 1
+        self.cache.clear()
+        self._keys_by_tag.clear()
+        self._tags_by_key.clear()
+
+    def _forget(self, key: str, response: Any = None) -> None:
+        """
+        Remove an entry from the tag index, once it is dropped from the cache.
+
+        Args:
+            key (str): The key of the entry.
+            response (Any): The dropped response, unused.
+        """
+
+        for tag in self._tags_by_key.pop(key, ()):
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+class RedisReadCache(ReadCache):
+    """
+    Read cache shared by all workers through Redis, so the writes of any worker invalidate the entries
+    of all of them.
+
+    Every entry is a hash expiring after the TTL, and every tag a set of the keys of its entries. Redis
+    errors are logged and treated as cache misses, so the endpoints keep working when Redis is down.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float, prefix: str = "pitch-read-cache"):
+        """
+        Initialize the RedisReadCache.
+
+        Args:
+            url (str): URL of the Redis server.
+            ttl_seconds (float): Number of seconds an entry stays valid.
+            prefix (str): Prefix of all keys written to Redis.
+
+        Raises:
+            ImportError: If the redis package is not installed.
+        """
+
+        try:
+            import redis.asyncio
+        except ImportError as e:
+            raise ImportError(
+                "The redis read cache backend requires the redis package: poetry install -E redis"
+            ) from e
+
+        self._redis = redis
+        self._client = redis.asyncio.from_url(url)
+        self.ttl_seconds = max(int(ttl_seconds), 1)
+        self.prefix = prefix
+        self._sequence_key = f"{prefix}:sequence"
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+
+        try:
+            entry = await self._client.hgetall(self._entry_key(key))
+        except self._redis.RedisError as e:
+            logger.error("Error reading the read cache: %s", e)
+            return None
+
+        if not entry:
+            return None
+
+        return CachedResponse(
+            body=entry[b"body"],
+            headers=json.loads(entry[b"headers"]),
+            etag=entry[b"etag"].decode(),
+        )
+
+    async def get_sequence(self) -> int:
+
+        try:
+            return int(await self._client.get(self._sequence_key) or 0)
+        except self._redis.RedisError as e:
+            logger.error("Error reading the read cache: %s", e)
+            return -1
+
+    async def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        tags: Iterable[str],
+        sequence: int,
+    ) -> None:
+
+        entry_key = self._entry_key(key)
+
+        try:
+            async with self._client.pipeline(transaction=True) as pipeline:
+                # Abort the transaction if an invalidation happens before it is executed
+                await pipeline.watch(self._sequence_key)
+                if int(await pipeline.get(self._sequence_key) or 0) != sequence:
+                    return
+
+                pipeline.multi()
+                pipeline.hset(
+                    entry_key,
+                    mapping={
+                        "body": response.body,
+                        "headers": json.dumps(response.headers),
+                        "etag": response.etag,
+                    },
+                )
+                pipeline.expire(entry_key, self.ttl_seconds)
+                for tag in tags:
+                    pipeline.sadd(self._tag_key(tag), entry_key)
+                    pipeline.expire(self._tag_key(tag), self.ttl_seconds)
+
+                await pipeline.execute()
+
+        except self._redis.WatchError:
+            pass
+
+        except self._redis.RedisError as e:
+            logger.error("Error writing the read cache: %s", e)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+
+        tag_keys = [self._tag_key(tag) for tag in tags]
+
+        try:
+            async with self._client.pipeline(transaction=False) as pipeline:
+                pipeline.incr(self._sequence_key)
+                for tag_key in tag_keys:
+                    pipeline.smembers(tag_key)
+                _, *members = await pipeline.execute()
+
+            entry_keys = set().union(*members)
+            await self._client.delete(*tag_keys, *entry_keys)
+
+        except self._redis.RedisError as e:
+            logger.error("Error invalidating the read cache: %s", e)
+
+    async def clear(self) -> None:
+
+        try:
+            await self._client.incr(self._sequence_key)
+            keys = [
+                key
+                async for key in self._client.scan_iter(match=f"{self.prefix}:*")
+                if key != self._sequence_key.encode()
+            ]
+            if keys:
+                await self._client.delete(*keys)
+
+        except self._redis.RedisError as e:
+            logger.error("Error clearing the read cache: %s", e)
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}:entry:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}:tag:{tag}"
+
+
+def create_read_cache() -> ReadCache:
+    """
+    Create the read cache selected by the READ_CACHE_BACKEND setting.
+
+    Returns:
+        ReadCache: The read cache.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+
+    if READ_CACHE_BACKEND == "memory":
+        return MemoryReadCache(READ_CACHE_TTL_SECONDS, READ_CACHE_MAX_ENTRIES)
+
+    if READ_CACHE_BACKEND == "redis":
+        return RedisReadCache(READ_CACHE_REDIS_URL, READ_CACHE_TTL_SECONDS)
+
+    if READ_CACHE_BACKEND == "none":
+        return NullReadCache()
+
+    raise ValueError(f"Unknown read cache backend: {READ_CACHE_BACKEND}")
+
+
+read_cache = create_read_cache()
+
+
+async def get_or_load(
+    key: str,
+    load: Callable[[], Awaitable[Optional[Tuple[CachedResponse, Iterable[str]]]]],
+) -> Optional[CachedResponse]:
+    """
+    Get a response from the read cache, loading and caching it on a miss.
+
+    Args:
+        key (str): The key of the entry.
+        load (Callable[[], Awaitable[Optional[Tuple[CachedResponse, Iterable[str]]]]]): Function loading
+            the response and the tags invalidating it, or None if there is nothing to cache.
+
+    Returns:
+        Optional[CachedResponse]: The response, or None if there is nothing to return.
+    """
+
+    response = await read_cache.get(key)
+    if response is not None:
+        READ_CACHE_LOOKUPS.inc(result="hit")
+        return response
+
+    READ_CACHE_LOOKUPS.inc(result="miss")
+
+    sequence = await read_cache.get_sequence()
+
+    loaded = await load()
+    if loaded is None:
+        return None
+
+    response, tags = loaded
+    await read_cache.set(key, response, tags, sequence)
+
+    return response
+
+
+def pitch_tag(pitch_uuid: UUID) -> str:
+    """
+    Get the tag of the cached responses rendering a pitch.
+
+    Args:
+        pitch_uuid (UUID): The UUID of the pitch.
+
+    Returns:
+        str: The tag.
+    """
+
+    return f"pitch:{pitch_uuid}"
+
+
+async def invalidate_pitches(
+    pitch_uuids: Iterable[UUID], membership_changed: bool
+) -> None:
+    """
+    Invalidate the cached responses rendering the given pitches, after they were written.
+
+    Args:
+        pitch_uuids (Iterable[UUID]): The UUIDs of the written pitches.
+        membership_changed (bool): Whether the write may add or remove pitches from the cached lists,
+            i.e. it created or deleted pitches or changed the fields the lists filter on.
+    """
+
+    tags = [pitch_tag(pitch_uuid) for pitch_uuid in pitch_uuids]
+    if membership_changed:
+        tags.append(LIST_MEMBERSHIP_TAG)
+
+    if tags:
+        await read_cache.invalidate(tags)
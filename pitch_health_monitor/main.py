@@ -1,72 +1,548 @@
 import asyncio
+import logging
+import os
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import List
-from fastapi import FastAPI, HTTPException, Path, Body
-from pitch_health_monitor.database.db_methods import (
-    get_all_pitches_from_db,
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+)
+from fastapi import (
+    Depends,
+    FastAPI,
+    HTTPException,
+    Path,
+    Body,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pitch_health_monitor.database.async_db_methods import (
+    bulk_set_pitch_fields_in_db,
+    bulk_update_pitches_in_db,
+    create_pitches_in_db,
+    ensure_history_collections,
+    get_existing_pitch_uuids_from_db,
+    get_history_rollups_from_db,
+    get_pitch_history_from_db,
+    get_pitches_by_uuid_from_db,
+    ensure_indexes,
+    explain_queries,
+    get_pitch_document_from_db,
+    get_pitch_documents_from_db,
     get_pitch_from_db,
+    iter_pitch_documents_from_db,
     create_pitch_in_db,
     update_pitch_in_db,
     delete_pitch_from_db,
 )
+from pitch_health_monitor.database.common import (
+    MAINTENANCE_REQUIRED_FILTER,
+    TURF_REPLACEMENT_REQUIRED_FILTER,
+    build_nearby_filter,
+)
+from pitch_health_monitor.database.read_cache import (
+    LIST_MEMBERSHIP_TAG,
+    CachedResponse,
+    get_or_load,
+    pitch_tag,
+)
 from pitch_health_monitor.services.pitch_monitor.maintenance_utils import (
     perform_maintenance,
 )
+from pitch_health_monitor.services.metrics import HTTP_REQUEST_SECONDS, REGISTRY
+from pitch_health_monitor.services.pitch_monitor.history import (
+    HISTORY_ENABLED,
+    get_maintenance_point,
+    record_history_points,
+)
+from pitch_health_monitor.services.pitch_monitor.notifications import (
+    PitchEventFilter,
+    PitchEventSubscription,
+    get_pitch_change_event,
+)
 from pitch_health_monitor.services.pitch_monitor.processor import (
-    process_all_pitches_periodically,
+    cycle_profiler,
+    notify_pitch_changed,
+    pitch_events,
+    publish_pitch_event,
+    run_processor,
 )
 from starlette.status import (
+    HTTP_200_OK,
+    HTTP_304_NOT_MODIFIED,
     HTTP_404_NOT_FOUND,
     HTTP_500_INTERNAL_SERVER_ERROR,
     HTTP_400_BAD_REQUEST,
 )
 from dotenv import load_dotenv
 from uuid import UUID, uuid4
-from pitch_health_monitor.models.bodies import CreatePitchRequest, UpdatePitchRequest
-from pitch_health_monitor.models.responses import PitchResponse
-from pitch_health_monitor.models.schemas import Pitch
+from pitch_health_monitor.models.bodies import (
+    BulkUpdatePitchRequest,
+    CreatePitchRequest,
+    TurfReplacementRequest,
+    UpdatePitchRequest,
+)
+from pitch_health_monitor.models.responses import (
+    BulkItemResult,
+    ConditionHistoryBucket,
+    ConditionHistoryPoint,
+    PitchResponse,
+    render_pitch_response,
+    render_pitch_responses,
+)
+from pitch_health_monitor.models.schemas import Pitch, TurfType
 
 load_dotenv()
 
+# Level of the messages logged by the service, e.g. "DEBUG" to also log every processed pitch
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+logging.basicConfig(level=LOG_LEVEL, format="%(levelname)s %(name)s: %(message)s")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await ensure_indexes()
+
+    if HISTORY_ENABLED:
+        await ensure_history_collections()
+
     # Start the routine that will process all pitches health status
-    asyncio.create_task(process_all_pitches_periodically())
+    processor_task = asyncio.create_task(run_processor())
 
     yield
 
+    # Stop the routine so its lease is released for the other workers
+    processor_task.cancel()
+    await asyncio.gather(processor_task, return_exceptions=True)
+
 
 app = FastAPI(lifespan=lifespan)
 
 
+@app.middleware("http")
+async def record_request_duration(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    started_at = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        # Label by route template rather than path, so every pitch shares the same series
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started_at,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=status,
+        )
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+MAX_BULK_SIZE = 1000
+
+# Comment sent to idle event subscribers, so proxies keep the connection open and closed connections
+# are noticed
+EVENTS_KEEPALIVE_SECONDS = 15
+
+# Render stored pitches without validating them, since every document was validated when written
+TRUSTED_READS = os.getenv("TRUSTED_READS", "false").lower() == "true"
+
+
+class ListingParams:
+    """
+    Query parameters shared by the endpoints listing pitches.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(
+            None,
+            ge=1,
+            le=MAX_PAGE_SIZE,
+            description=f"Maximum number of pitches per page. When set, the response is paginated and the cursor of the next page is returned in the {NEXT_CURSOR_HEADER} header",
+        ),
+        cursor: Optional[UUID] = Query(
+            None,
+            description=f"Cursor returned in the {NEXT_CURSOR_HEADER} header of the previous page",
+        ),
+        stream: bool = Query(
+            False,
+            description="Stream all matching pitches as newline-delimited JSON instead of a JSON array",
+        ),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.stream = stream
+
+
 @app.get(
     "/pitches/maintenance-required",
     response_model=List[PitchResponse],
     tags=["Maintenance"],
 )
-def get_pitches_needing_maintenance() -> List[PitchResponse]:
+async def get_pitches_needing_maintenance(
+    request: Request,
+    params: ListingParams = Depends(),
+) -> Response:
 
-    maintenance_required_filter = {"current_condition": {"$gt": 2, "$lt": 10}}
+    return await _list_pitches(
+        request, params, MAINTENANCE_REQUIRED_FILTER, cache_name="maintenance-required"
+    )
 
-    pitches = get_all_pitches_from_db(maintenance_required_filter)
 
-    return [PitchResponse.model_validate(pitch.model_dump()) for pitch in pitches]
+@app.get(
+    "/pitches/turf-replacement-required",
+    response_model=List[PitchResponse],
+    tags=["Maintenance"],
+)
+async def get_pitches_needing_turf_replacement(
+    request: Request,
+    params: ListingParams = Depends(),
+) -> Response:
+
+    return await _list_pitches(
+        request,
+        params,
+        TURF_REPLACEMENT_REQUIRED_FILTER,
+        cache_name="turf-replacement-required",
+    )
 
 
 @app.get(
-    "/pitches/turf-replacement-required",
+    "/pitches/nearby",
     response_model=List[PitchResponse],
+    description="Retrieve the pitches with coordinates located within a radius of a point",
+    tags=["Pitches"],
+)
+async def get_nearby_pitches(
+    request: Request,
+    longitude: float = Query(
+        ..., ge=-180, le=180, description="Longitude of the point"
+    ),
+    latitude: float = Query(..., ge=-90, le=90, description="Latitude of the point"),
+    radius_km: float = Query(
+        10, gt=0, le=1000, description="Radius around the point, in kilometers"
+    ),
+    params: ListingParams = Depends(),
+) -> Response:
+
+    return await _list_pitches(
+        request, params, build_nearby_filter(longitude, latitude, radius_km)
+    )
+
+
+@app.get(
+    "/pitches/events",
+    response_class=StreamingResponse,
+    description="Stream the changes of the condition and maintenance schedule of the pitches as Server-Sent Events. A `dropped` event ends the stream of a client reading too slowly, which should reconnect and reload the pitches",
+    tags=["Pitches"],
+)
+async def stream_pitch_events(
+    city: Optional[List[str]] = Query(
+        None, description="Only stream the pitches of these cities"
+    ),
+    country: Optional[List[str]] = Query(
+        None, description="Only stream the pitches of these countries"
+    ),
+    turf_type: Optional[List[TurfType]] = Query(
+        None, description="Only stream the pitches of these turf types"
+    ),
+) -> StreamingResponse:
+
+    subscription = pitch_events.subscribe(
+        PitchEventFilter(
+            cities=frozenset(city or ()),
+            countries=frozenset(country or ()),
+            turf_types=frozenset(turf.value for turf in turf_type or ()),
+        )
+    )
+
+    return StreamingResponse(
+        _stream_pitch_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get(
+    "/pitches/history",
+    response_model=List[ConditionHistoryBucket],
+    description="Get the condition history of the pitches aggregated by hour or by day, over all pitches or the ones matching the filters",
+    tags=["History"],
+)
+async def get_pitches_history(
+    start: datetime = Query(..., description="Start of the time range"),
+    end: Optional[datetime] = Query(
+        None, description="End of the time range, excluded. Defaults to now"
+    ),
+    resolution: Literal["hourly", "daily"] = Query(
+        "daily", description="Duration of the buckets"
+    ),
+    city: Optional[List[str]] = Query(
+        None, description="Only aggregate the pitches of these cities"
+    ),
+    country: Optional[List[str]] = Query(
+        None, description="Only aggregate the pitches of these countries"
+    ),
+    turf_type: Optional[List[TurfType]] = Query(
+        None, description="Only aggregate the pitches of these turf types"
+    ),
+) -> List[ConditionHistoryBucket]:
+
+    start, end = _get_history_range(start, end)
+
+    # The rollups store the city, country and turf type of their pitch, so no pitch is looked up
+    filters: Dict[str, Any] = {}
+    if city:
+        filters["city"] = {"$in": city}
+    if country:
+        filters["country"] = {"$in": country}
+    if turf_type:
+        filters["turf_type"] = {"$in": [turf.value for turf in turf_type]}
+
+    buckets = await get_history_rollups_from_db(
+        resolution, start, end, aggregate=True, filters=filters
+    )
+
+    return [ConditionHistoryBucket.model_validate(bucket) for bucket in buckets]
+
+
+@app.post(
+    "/pitches/bulk",
+    response_model=List[BulkItemResult],
+    description=f"Create up to {MAX_BULK_SIZE} pitches at once, returning the result of each one in the order of the request",
+    tags=["Pitches"],
+)
+async def bulk_create_pitches(
+    pitch_requests: List[CreatePitchRequest] = Body(
+        ..., min_length=1, max_length=MAX_BULK_SIZE
+    ),
+) -> List[BulkItemResult]:
+
+    now = datetime.utcnow()
+    new_pitches = [
+        Pitch(
+            uuid=uuid4(),
+            name=pitch_request.name,
+            location=pitch_request.location,
+            turf_type=pitch_request.turf_type,
+            current_condition=pitch_request.current_condition,
+            last_checked_at=now,
+        )
+        for pitch_request in pitch_requests
+    ]
+
+    failures = await create_pitches_in_db(new_pitches)
+
+    results = []
+    for new_pitch in new_pitches:
+        if new_pitch.uuid in failures:
+            results.append(
+                _failed_item(
+                    new_pitch.uuid,
+                    HTTP_500_INTERNAL_SERVER_ERROR,
+                    "Failed to create new pitch",
+                )
+            )
+            continue
+
+        notify_pitch_changed(new_pitch.uuid)
+        results.append(BulkItemResult(uuid=new_pitch.uuid, status_code=HTTP_200_OK))
+
+    return results
+
+
+@app.put(
+    "/pitches/bulk",
+    response_model=List[BulkItemResult],
+    description=f"Update up to {MAX_BULK_SIZE} pitches at once, returning the result of each one in the order of the request",
+    tags=["Pitches"],
+)
+async def bulk_update_pitches(
+    pitch_requests: List[BulkUpdatePitchRequest] = Body(
+        ..., min_length=1, max_length=MAX_BULK_SIZE
+    ),
+) -> List[BulkItemResult]:
+
+    results: Dict[int, BulkItemResult] = {}
+    updates: Dict[int, Tuple[UUID, Dict[str, Any]]] = {}
+    seen_uuids = set()
+
+    for index, pitch_request in enumerate(pitch_requests):
+        changes = pitch_request.model_dump(exclude_unset=True, exclude={"uuid"})
+
+        if pitch_request.uuid in seen_uuids:
+            results[index] = _failed_item(
+                pitch_request.uuid, HTTP_400_BAD_REQUEST, "Duplicate pitch in request"
+            )
+        elif not changes:
+            results[index] = _failed_item(
+                pitch_request.uuid, HTTP_400_BAD_REQUEST, "Nothing to update"
+            )
+        else:
+            updates[index] = (pitch_request.uuid, changes)
+
+        seen_uuids.add(pitch_request.uuid)
+
+    existing_uuids = await get_existing_pitch_uuids_from_db(
+        [pitch_uuid for pitch_uuid, _ in updates.values()]
+    )
+    for index, (pitch_uuid, _) in list(updates.items()):
+        if pitch_uuid not in existing_uuids:
+            results[index] = _failed_item(
+                pitch_uuid, HTTP_404_NOT_FOUND, "Pitch not found"
+            )
+            del updates[index]
+
+    write_result = await bulk_set_pitch_fields_in_db(list(updates.values()))
+
+    for index, (pitch_uuid, _) in updates.items():
+        results[index] = _get_written_item(pitch_uuid, write_result.failures)
+        if pitch_uuid not in write_result.failures:
+            notify_pitch_changed(pitch_uuid)
+
+    return [results[index] for index in range(len(pitch_requests))]
+
+
+@app.post(
+    "/pitches/bulk/schedule-turf-replacement",
+    response_model=List[BulkItemResult],
+    description=f"Schedule the turf replacement of up to {MAX_BULK_SIZE} pitches at once, returning the result of each one in the order of the request",
     tags=["Maintenance"],
 )
-def get_pitches_needing_turf_replacement() -> List[PitchResponse]:
+async def bulk_schedule_turf_replacement(
+    replacement_requests: List[TurfReplacementRequest] = Body(
+        ..., min_length=1, max_length=MAX_BULK_SIZE
+    ),
+) -> List[BulkItemResult]:
+
+    # Replacement dates are naive UTC once validated
+    now = datetime.utcnow()
+
+    pitches_by_uuid = {
+        pitch.uuid: pitch
+        for pitch in await get_pitches_by_uuid_from_db(
+            [replacement_request.uuid for replacement_request in replacement_requests]
+        )
+    }
+
+    results: Dict[int, BulkItemResult] = {}
+    scheduled: Dict[int, Pitch] = {}
+    seen_uuids = set()
 
-    turf_replacement_required_filter = {"current_condition": {"$lte": 2}}
+    for index, replacement_request in enumerate(replacement_requests):
+        pitch_uuid = replacement_request.uuid
+        pitch = pitches_by_uuid.get(pitch_uuid)
 
-    pitches = get_all_pitches_from_db(turf_replacement_required_filter)
+        if pitch_uuid in seen_uuids:
+            results[index] = _failed_item(
+                pitch_uuid, HTTP_400_BAD_REQUEST, "Duplicate pitch in request"
+            )
+        elif pitch is None:
+            results[index] = _failed_item(
+                pitch_uuid, HTTP_404_NOT_FOUND, "Pitch not found"
+            )
+        elif replacement_request.replacement_date <= now:
+            results[index] = _failed_item(
+                pitch_uuid,
+                HTTP_400_BAD_REQUEST,
+                "Replacement date must be in the future",
+            )
+        else:
+            pitch.replacement_date = replacement_request.replacement_date
+            scheduled[index] = pitch
 
-    return [PitchResponse.model_validate(pitch.model_dump()) for pitch in pitches]
+        seen_uuids.add(pitch_uuid)
+
+    await _write_bulk_pitches(scheduled, results)
+
+    return [results[index] for index in range(len(replacement_requests))]
+
+
+@app.post(
+    "/pitches/bulk/execute-maintenance",
+    response_model=List[BulkItemResult],
+    description=f"Execute the due maintenance of up to {MAX_BULK_SIZE} pitches at once, returning the result of each one in the order of the request",
+    tags=["Maintenance"],
+)
+async def bulk_execute_maintenance(
+    pitch_ids: List[UUID] = Body(..., min_length=1, max_length=MAX_BULK_SIZE),
+) -> List[BulkItemResult]:
+
+    now = datetime.utcnow()
+
+    # Load full documents, as maintenance resets fields the processor does not load
+    pitches_by_uuid = {
+        pitch.uuid: pitch
+        for pitch in await get_pitches_by_uuid_from_db(pitch_ids, projection=None)
+    }
+
+    results: Dict[int, BulkItemResult] = {}
+    maintained: Dict[int, Pitch] = {}
+    seen_uuids = set()
+
+    for index, pitch_id in enumerate(pitch_ids):
+        pitch = pitches_by_uuid.get(pitch_id)
+
+        if pitch_id in seen_uuids:
+            results[index] = _failed_item(
+                pitch_id, HTTP_400_BAD_REQUEST, "Duplicate pitch in request"
+            )
+        elif pitch is None:
+            results[index] = _failed_item(
+                pitch_id, HTTP_404_NOT_FOUND, "Pitch not found"
+            )
+        elif (
+            pitch.next_scheduled_maintenance is None
+            or pitch.next_scheduled_maintenance > now
+        ):
+            results[index] = _failed_item(
+                pitch_id,
+                HTTP_400_BAD_REQUEST,
+                "No due maintenance scheduled for this pitch",
+            )
+        else:
+            maintained[index] = perform_maintenance(pitch)
+
+        seen_uuids.add(pitch_id)
+
+    await _write_bulk_pitches(maintained, results)
+
+    maintained_pitches = [
+        pitch
+        for index, pitch in maintained.items()
+        if results[index].status_code == HTTP_200_OK
+    ]
+
+    await record_history_points(
+        [get_maintenance_point(pitch) for pitch in maintained_pitches]
+    )
+
+    # The improved condition may require a new maintenance to be scheduled
+    for pitch in maintained_pitches:
+        notify_pitch_changed(pitch.uuid)
+
+    return [results[index] for index in range(len(pitch_ids))]
 
 
 @app.post(
@@ -74,7 +550,7 @@ def get_pitches_needing_turf_replacement() -> List[PitchResponse]:
     response_model=None,
     tags=["Maintenance"],
 )
-def schedule_turf_replacement(
+async def schedule_turf_replacement(
     pitch_id: UUID,
     replacement_date: datetime = Body(
         ...,
@@ -83,7 +559,7 @@ def schedule_turf_replacement(
     ),
 ) -> None:
 
-    pitch = get_pitch_from_db(pitch_id)
+    pitch = await get_pitch_from_db(pitch_id)
     if pitch is None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Pitch not found")
 
@@ -96,17 +572,19 @@ def schedule_turf_replacement(
 
     # Set the replacement date for the pitch
     pitch.replacement_date = replacement_date
+    event = get_pitch_change_event(pitch)
 
     # Update the pitch record in the database
-    update_pitch_in_db(pitch_id, pitch)
+    if await update_pitch_in_db(pitch_id, pitch):
+        publish_pitch_event(event)
 
 
 @app.post(
     "/pitches/{pitch_id}/execute-maintenance", response_model=None, tags=["Maintenance"]
 )
-def execute_maintenance(pitch_id: UUID) -> None:
+async def execute_maintenance(pitch_id: UUID) -> None:
 
-    pitch = get_pitch_from_db(pitch_id)
+    pitch = await get_pitch_from_db(pitch_id)
     if pitch is None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Pitch not found")
 
@@ -121,14 +599,52 @@ def execute_maintenance(pitch_id: UUID) -> None:
         )
 
     pitch = perform_maintenance(pitch)
+    event = get_pitch_change_event(pitch)
+
+    if await update_pitch_in_db(pitch_id, pitch):
+        publish_pitch_event(event)
+        await record_history_points([get_maintenance_point(pitch)])
 
-    update_pitch_in_db(pitch_id, pitch)
+    # The improved condition may require a new maintenance to be scheduled
+    notify_pitch_changed(pitch_id)
+
+
+@app.get(
+    "/pitches/{pitch_id}/history",
+    response_model=Union[List[ConditionHistoryPoint], List[ConditionHistoryBucket]],
+    description="Get the condition history of a pitch: every check and maintenance, or their hourly or daily rollups",
+    tags=["History"],
+)
+async def get_pitch_history(
+    pitch_id: UUID,
+    start: datetime = Query(..., description="Start of the time range"),
+    end: Optional[datetime] = Query(
+        None, description="End of the time range, excluded. Defaults to now"
+    ),
+    resolution: Literal["raw", "hourly", "daily"] = Query(
+        "raw",
+        description="Every point, kept for a limited time, or buckets of an hour or a day",
+    ),
+) -> Union[List[ConditionHistoryPoint], List[ConditionHistoryBucket]]:
+
+    start, end = _get_history_range(start, end)
+
+    if not await get_existing_pitch_uuids_from_db([pitch_id]):
+        raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Pitch not found")
+
+    if resolution == "raw":
+        points = await get_pitch_history_from_db(pitch_id, start, end)
+        return [ConditionHistoryPoint.model_validate(point) for point in points]
+
+    buckets = await get_history_rollups_from_db(resolution, start, end, [pitch_id])
+
+    return [ConditionHistoryBucket.model_validate(bucket) for bucket in buckets]
 
 
 @app.post(
     "/pitches/", response_model=UUID, description="Create a new pitch", tags=["Pitches"]
 )
-def create_pitch(pitch_request: CreatePitchRequest) -> UUID:
+async def create_pitch(pitch_request: CreatePitchRequest) -> UUID:
 
     new_pitch = Pitch(
         uuid=uuid4(),
@@ -139,12 +655,14 @@ def create_pitch(pitch_request: CreatePitchRequest) -> UUID:
         last_checked_at=datetime.utcnow(),
     )
 
-    if not create_pitch_in_db(new_pitch):
+    if not await create_pitch_in_db(new_pitch):
         raise HTTPException(
             status_code=HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create new pitch",
         )
 
+    notify_pitch_changed(new_pitch.uuid)
+
     return new_pitch.uuid
 
 
@@ -154,13 +672,15 @@ def create_pitch(pitch_request: CreatePitchRequest) -> UUID:
     description="Update a pitch by its ID",
     tags=["Pitches"],
 )
-def update_pitch(pitch_id: UUID, pitch_request: UpdatePitchRequest) -> None:
+async def update_pitch(pitch_id: UUID, pitch_request: UpdatePitchRequest) -> None:
 
-    if not update_pitch_in_db(pitch_id, pitch_request):
+    if not await update_pitch_in_db(pitch_id, pitch_request):
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND, detail="Pitch not found or not updated"
         )
 
+    notify_pitch_changed(pitch_id)
+
 
 @app.delete(
     "/pitches/{pitch_id}",
@@ -168,9 +688,9 @@ def update_pitch(pitch_id: UUID, pitch_request: UpdatePitchRequest) -> None:
     description="Delete a pitch by its ID",
     tags=["Pitches"],
 )
-def delete_pitch(pitch_id: UUID) -> None:
+async def delete_pitch(pitch_id: UUID) -> None:
 
-    if not delete_pitch_from_db(pitch_id):
+    if not await delete_pitch_from_db(pitch_id):
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND, detail="Pitch not found or not deleted"
         )
@@ -182,14 +702,11 @@ def delete_pitch(pitch_id: UUID) -> None:
     description="Retrieve all pitches",
     tags=["Pitches"],
 )
-def get_all_pitches() -> List[PitchResponse]:
-
-    pitches = get_all_pitches_from_db()
-    pitch_responses = [
-        PitchResponse.model_validate(pitch.model_dump()) for pitch in pitches
-    ]
+async def get_all_pitches(
+    request: Request, params: ListingParams = Depends()
+) -> Response:
 
-    return pitch_responses
+    return await _list_pitches(request, params)
 
 
 @app.get(
@@ -198,14 +715,301 @@ def get_all_pitches() -> List[PitchResponse]:
     description="Retrieve a pitch by its ID",
     tags=["Pitches"],
 )
-def get_pitch(
+async def get_pitch(
+    request: Request,
     pitch_id: UUID = Path(..., description="The ID of the pitch to retrieve"),
-) -> PitchResponse:
+) -> Response:
 
-    pitch = get_pitch_from_db(pitch_id)
+    async def load() -> Optional[Tuple[CachedResponse, List[str]]]:
+        pitch = await get_pitch_document_from_db(pitch_id)
+        if pitch is None:
+            return None
 
-    if pitch is None:
+        return (
+            CachedResponse(render_pitch_response(pitch, trusted=TRUSTED_READS)),
+            [pitch_tag(pitch_id)],
+        )
+
+    response = await get_or_load(f"pitch:{pitch_id}", load)
+
+    if response is None:
         raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail="Pitch not found")
-    pitch_response = PitchResponse.model_validate(pitch)
 
-    return pitch_response
+    return _conditional_response(request, response)
+
+
+async def _list_pitches(
+    request: Request,
+    params: ListingParams,
+    filters: Optional[Dict] = None,
+    cache_name: Optional[str] = None,
+) -> Response:
+    """
+    List the pitches matching the filters, as a full list, a page or a stream depending on the parameters.
+
+    Documents are rendered straight into the JSON of the response, bypassing the response model, so
+    each pitch is validated at most once.
+
+    Args:
+        request: The request, whose entity tags are compared to the one of the response.
+        params: The listing parameters of the request.
+        filters: Optional dictionary of filter criteria.
+        cache_name: Name of the list in the read cache, or None to not cache it. Cached lists must
+            only filter on the fields of LIST_MEMBERSHIP_FIELDS.
+
+    Returns:
+        Response: The matching pitches.
+    """
+
+    if params.stream:
+        return StreamingResponse(
+            _stream_pitches(filters), media_type="application/x-ndjson"
+        )
+
+    async def load() -> Tuple[CachedResponse, List[str]]:
+        headers = {}
+
+        if params.limit is None and params.cursor is None:
+            pitches = await get_pitch_documents_from_db(filters)
+
+        else:
+            limit = params.limit or DEFAULT_PAGE_SIZE
+            pitches = await get_pitch_documents_from_db(
+                filters, limit=limit, after=params.cursor
+            )
+
+            # A full page means there may be more pitches after it
+            if len(pitches) == limit:
+                headers[NEXT_CURSOR_HEADER] = str(pitches[-1]["uuid"])
+
+        response = CachedResponse(
+            render_pitch_responses(pitches, trusted=TRUSTED_READS), headers=headers
+        )
+
+        return response, [
+            LIST_MEMBERSHIP_TAG,
+            *(pitch_tag(pitch["uuid"]) for pitch in pitches),
+        ]
+
+    if cache_name is None:
+        response, _ = await load()
+    else:
+        response = await get_or_load(
+            f"list:{cache_name}:{params.limit}:{params.cursor}", load
+        )
+
+    return _conditional_response(request, response)
+
+
+def _conditional_response(request: Request, response: CachedResponse) -> Response:
+    """
+    Build the response of a rendered read, or a 304 if the client already has the same version.
+
+    Args:
+        request: The request, with the entity tags known by the client in its If-None-Match header.
+        response: The rendered read.
+
+    Returns:
+        Response: The response, carrying the entity tag of the read.
+    """
+
+    headers = {**response.headers, "ETag": response.etag}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison, as required for If-None-Match
+        known_etags = {
+            etag.strip().removeprefix("W/") for etag in if_none_match.split(",")
+        }
+        if "*" in known_etags or response.etag in known_etags:
+            return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(response.body, media_type="application/json", headers=headers)
+
+
+async def _stream_pitches(filters: Optional[Dict] = None) -> AsyncIterator[bytes]:
+    """
+    Serialize the pitches matching the filters one JSON document per line, as they are read from the
+    database.
+
+    Args:
+        filters: Optional dictionary of filter criteria.
+
+    Returns:
+        AsyncIterator[bytes]: One serialized pitch per line.
+    """
+
+    async for document in iter_pitch_documents_from_db(
+        filters, batch_size=STREAM_BATCH_SIZE
+    ):
+        yield render_pitch_response(document, trusted=TRUSTED_READS) + b"\n"
+
+
+async def _write_bulk_pitches(
+    pitches: Dict[int, Pitch], results: Dict[int, BulkItemResult]
+) -> None:
+    """
+    Write the pitches modified by a bulk endpoint at once, recording the result of each one and pushing
+    their changes to the event subscribers.
+
+    Args:
+        pitches: The modified pitches, by index in the request.
+        results: The results of the request, by index, completed with the ones of the pitches.
+    """
+
+    # Pitches are marked clean once written, so their changes are collected beforehand
+    events = {index: get_pitch_change_event(pitch) for index, pitch in pitches.items()}
+
+    write_result = await bulk_update_pitches_in_db(list(pitches.values()))
+
+    for index, pitch in pitches.items():
+        results[index] = _get_written_item(pitch.uuid, write_result.failures)
+        if pitch.uuid not in write_result.failures:
+            publish_pitch_event(events[index])
+
+
+def _get_history_range(
+    start: datetime, end: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    """
+    Convert the time range of a history request to the naive UTC dates stored in the database.
+
+    Args:
+        start: The start of the range.
+        end: The end of the range, or None for now.
+
+    Returns:
+        Tuple[datetime, datetime]: The start and the end of the range.
+
+    Raises:
+        HTTPException: If the range is empty.
+    """
+
+    start, end = [
+        (
+            moment.astimezone(timezone.utc).replace(tzinfo=None)
+            if moment.tzinfo is not None
+            else moment
+        )
+        for moment in (start, end or datetime.utcnow())
+    ]
+
+    if end <= start:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST,
+            detail="The end of the range must come after its start",
+        )
+
+    return start, end
+
+
+def _get_written_item(pitch_uuid: UUID, failures: Dict[UUID, str]) -> BulkItemResult:
+    """
+    Get the result of a pitch written by a bulk endpoint.
+
+    Args:
+        pitch_uuid: The UUID of the pitch.
+        failures: The error message of every pitch that could not be written, by pitch UUID.
+
+    Returns:
+        BulkItemResult: The result of the pitch.
+    """
+
+    if pitch_uuid in failures:
+        return _failed_item(
+            pitch_uuid, HTTP_500_INTERNAL_SERVER_ERROR, failures[pitch_uuid]
+        )
+
+    return BulkItemResult(uuid=pitch_uuid, status_code=HTTP_200_OK)
+
+
+def _failed_item(pitch_uuid: UUID, status_code: int, detail: str) -> BulkItemResult:
+    """
+    Build the result of a pitch a bulk endpoint could not handle.
+
+    Args:
+        pitch_uuid: The UUID of the pitch.
+        status_code: The status code the single-pitch endpoint would have returned.
+        detail: The reason of the failure.
+
+    Returns:
+        BulkItemResult: The result of the pitch.
+    """
+
+    return BulkItemResult(uuid=pitch_uuid, status_code=status_code, detail=detail)
+
+
+async def _stream_pitch_events(
+    subscription: PitchEventSubscription,
+) -> AsyncIterator[bytes]:
+    """
+    Serialize the events of a subscription as Server-Sent Events, as they are published.
+
+    Args:
+        subscription: The subscription, ended when the client disconnects.
+
+    Returns:
+        AsyncIterator[bytes]: One event, or keep-alive comment, at a time.
+    """
+
+    try:
+        while True:
+            try:
+                event = await subscription.next_event(EVENTS_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+
+            if event is None:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+
+            yield f"event: pitch-changed\ndata: {event.to_json()}\n\n".encode()
+
+    finally:
+        pitch_events.unsubscribe(subscription)
+
+
+@app.get(
+    "/diagnostics/query-plans",
+    response_model=Dict[str, Dict[str, Any]],
+    description="Explain the query plan of every query issued by the application",
+    tags=["Diagnostics"],
+)
+async def get_query_plans() -> Dict[str, Dict[str, Any]]:
+
+    return await explain_queries()
+
+
+@app.post(
+    "/diagnostics/profile",
+    description="Profile the next processing cycles, writing one profile file per cycle to the PROCESSOR_PROFILE_DIR directory",
+    tags=["Diagnostics"],
+)
+async def request_cycle_profile(
+    cycles: int = Query(1, ge=1, le=100, description="Number of cycles to profile"),
+    kind: Literal["cprofile", "sampling"] = Query(
+        "cprofile",
+        description="Either a deterministic cProfile dump, or sampled stacks in the folded format of flame graph tools",
+    ),
+) -> Dict[str, Any]:
+
+    cycle_profiler.request(cycles, kind)
+
+    return {
+        "pending_cycles": cycle_profiler.pending_cycles,
+        "directory": cycle_profiler.directory,
+    }
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    description="Processor, weather, database and API metrics in the Prometheus text format",
+    tags=["Diagnostics"],
+)
+async def get_metrics() -> Response:
+
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from uuid import UUID
+from pydantic import BaseModel, Field, field_validator
 
 from pitch_health_monitor.models.schemas import Location, TurfType
 
@@ -53,3 +55,34 @@ class UpdatePitchRequest(BaseModel):
         example=10,
         description="Current condition rating of the pitch (from 1 to 10)",
     )
+
+
+class BulkUpdatePitchRequest(UpdatePitchRequest):
+    uuid: UUID = Field(..., description="UUID of the pitch to update")
+
+
+class TurfReplacementRequest(BaseModel):
+    uuid: UUID = Field(..., description="UUID of the pitch")
+    replacement_date: datetime = Field(
+        ...,
+        description="The future date when turf replacement is scheduled. Must be a datetime object in the future.",
+    )
+
+    @field_validator("replacement_date")
+    @classmethod
+    def to_naive_utc(cls, replacement_date: datetime) -> datetime:
+        """
+        Convert the replacement date to the naive UTC dates stored in the database, a naive date being
+        taken as UTC already.
+
+        Args:
+            replacement_date: The requested replacement date.
+
+        Returns:
+            datetime: The replacement date in naive UTC.
+        """
+
+        if replacement_date.tzinfo is None:
+            return replacement_date
+
+        return replacement_date.astimezone(timezone.utc).replace(tzinfo=None)
@@ -1,8 +1,9 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
+from pydantic_core import to_json
 
 from pitch_health_monitor.models.schemas import Location, TurfType
 
@@ -48,3 +49,96 @@ class PitchResponse(BaseModel):
     replacement_date: Optional[datetime] = Field(
         None, description="Date and time for scheduled replacement of the pitch"
     )
+
+
+class BulkItemResult(BaseModel):
+    uuid: UUID = Field(..., description="UUID of the pitch")
+    status_code: int = Field(
+        ...,
+        example=200,
+        description="Status code the single-pitch endpoint would have returned for this item",
+    )
+    detail: Optional[str] = Field(None, description="Reason of the failure, if any")
+
+
+class ConditionHistoryPoint(BaseModel):
+    recorded_at: datetime = Field(
+        ..., description="Date and time when the pitch was checked or maintained"
+    )
+    kind: Literal["check", "maintenance"] = Field(
+        ...,
+        example="check",
+        description="Whether the point records a check of the processor or an executed maintenance",
+    )
+    condition: int = Field(
+        ..., ge=1, le=10, example=8, description="Condition rating of the pitch"
+    )
+    consecutive_rain_hours: int = Field(
+        ..., description="Duration of the cycle of consecutive rain hours of the pitch"
+    )
+    raining: Optional[bool] = Field(
+        None, description="Whether it was raining at the pitch, for checks"
+    )
+
+
+class ConditionHistoryBucket(BaseModel):
+    start: datetime = Field(..., description="Start of the hour or of the day")
+    pitch_count: int = Field(
+        1, description="Number of pitches with points in the bucket"
+    )
+    point_count: int = Field(
+        ..., description="Number of checks and maintenances in the bucket"
+    )
+    condition_avg: float = Field(
+        ..., example=7.5, description="Average condition rating of the points"
+    )
+    condition_min: int = Field(..., description="Lowest condition rating of the points")
+    condition_max: int = Field(
+        ..., description="Highest condition rating of the points"
+    )
+    rain_count: int = Field(..., description="Number of checks finding rain")
+    maintenance_count: int = Field(..., description="Number of executed maintenances")
+
+
+pitch_responses_adapter = TypeAdapter(List[PitchResponse])
+
+
+def render_pitch_response(document: Dict[str, Any], trusted: bool = False) -> bytes:
+    """
+    Serialize a pitch document, as stored in the database, into the JSON of a PitchResponse.
+
+    Args:
+        document: The pitch document, projected to the PitchResponse fields.
+        trusted: Skip validation, for documents known to have been written by this service.
+
+    Returns:
+        bytes: The JSON representation of the pitch.
+    """
+
+    if trusted:
+        return to_json(document)
+
+    return PitchResponse.model_validate(document).model_dump_json().encode()
+
+
+def render_pitch_responses(
+    documents: List[Dict[str, Any]], trusted: bool = False
+) -> bytes:
+    """
+    Serialize pitch documents, as stored in the database, into the JSON array of a List[PitchResponse]
+    with a single validation pass.
+
+    Args:
+        documents: The pitch documents, projected to the PitchResponse fields.
+        trusted: Skip validation, for documents known to have been written by this service.
+
+    Returns:
+        bytes: The JSON representation of the pitches.
+    """
+
+    if trusted:
+        return to_json(documents)
+
+    return pitch_responses_adapter.dump_json(
+        pitch_responses_adapter.validate_python(documents)
+    )
@@ -1,13 +1,29 @@
-from typing import Literal, Optional
-from pydantic import BaseModel, Field
+from typing import Annotated, Any, Dict, FrozenSet, Literal, Optional, Set, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
 from uuid import UUID
 from datetime import datetime
 from enum import Enum
 
 
+class GeoPoint(BaseModel):
+    type: Literal["Point"] = "Point"
+    coordinates: Tuple[
+        Annotated[float, Field(ge=-180, le=180)],
+        Annotated[float, Field(ge=-90, le=90)],
+    ] = Field(
+        ...,
+        example=(7.7765, 49.4344),
+        description="Longitude and latitude, in this order as in GeoJSON",
+    )
+
+
 class Location(BaseModel):
     city: str = Field(..., example="Kaiserslautern", description="Name of the city")
     country: str = Field(..., example="Germany", description="Name of the country")
+    coordinates: Optional[GeoPoint] = Field(
+        None,
+        description="GeoJSON point of the pitch, used to share weather lookups with nearby pitches",
+    )
 
 
 class TurfType(str, Enum):
@@ -62,3 +78,48 @@ class Pitch(BaseModel):
     current_consecutive_rain_hours: int = Field(
         default=0, description="Duration of the current cycle of consecutive rain hours"
     )
+
+    # Fields whose value changed since the pitch was created or loaded from the database. Only
+    # assignments to the fields of the pitch are tracked: mutating a nested model in place, such as
+    # `pitch.location.city = ...`, is not, so assign a new `Location` instead
+    _dirty_fields: Set[str] = PrivateAttr(default_factory=set)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in type(self).model_fields and getattr(self, name) != value:
+            self._dirty_fields.add(name)
+
+        super().__setattr__(name, value)
+
+    @property
+    def dirty_fields(self) -> FrozenSet[str]:
+        """
+        Names of the fields modified since the pitch was loaded or last marked clean.
+        """
+        return frozenset(self._dirty_fields)
+
+    def has_material_changes(self) -> bool:
+        """
+        Check if anything besides the last checked timestamp was modified.
+
+        Returns:
+            bool: True if any field other than `last_checked_at` was modified, False otherwise.
+        """
+
+        return bool(self._dirty_fields - {"last_checked_at"})
+
+    def dirty_dump(self) -> Dict[str, Any]:
+        """
+        Serialize only the modified fields, so they can be written with a partial update.
+
+        Returns:
+            Dict[str, Any]: The modified fields and their current values.
+        """
+
+        return self.model_dump(include=self._dirty_fields)
+
+    def mark_clean(self) -> None:
+        """
+        Forget the modified fields, typically after they have been written to the database.
+        """
+
+        self._dirty_fields.clear()
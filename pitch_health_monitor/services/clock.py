@@ -0,0 +1,89 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Iterator
+
+
+class Clock:
+    """
+    Source of the current time used by the processing rules, reading the system clock.
+    """
+
+    def now(self) -> datetime:
+        """
+        Get the current time.
+
+        Returns:
+            datetime: The current UTC time.
+        """
+        return datetime.utcnow()
+
+
+class SimulatedClock(Clock):
+    """
+    Clock standing still until it is explicitly advanced, to run the processing rules on simulated time.
+    """
+
+    def __init__(self, start: datetime):
+        """
+        Initialize the SimulatedClock.
+
+        Args:
+            start (datetime): The initial time, in UTC.
+        """
+        self._now = start
+
+    def now(self) -> datetime:
+        """
+        Get the simulated time.
+
+        Returns:
+            datetime: The simulated UTC time.
+        """
+        return self._now
+
+    def advance(self, delta: timedelta) -> datetime:
+        """
+        Move the simulated time forward.
+
+        Args:
+            delta (timedelta): The duration to advance by.
+
+        Returns:
+            datetime: The new simulated time.
+        """
+        self._now += delta
+        return self._now
+
+
+# Context-local so a simulated clock never leaks into other tasks or threads
+_current_clock: ContextVar[Clock] = ContextVar("current_clock", default=Clock())
+
+
+def utcnow() -> datetime:
+    """
+    Get the current UTC time from the clock in use.
+
+    Returns:
+        datetime: The current time, simulated if a simulated clock is in use.
+    """
+    return _current_clock.get().now()
+
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    """
+    Use the given clock in the current context, until the block exits.
+
+    Args:
+        clock (Clock): The clock to use.
+
+    Returns:
+        Iterator[Clock]: The clock, for use in a `with` statement.
+    """
+
+    token = _current_clock.set(clock)
+    try:
+        yield clock
+    finally:
+        _current_clock.reset(token)
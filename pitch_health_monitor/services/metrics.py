@@ -0,0 +1,393 @@
+from abc import ABC, abstractmethod
+import math
+import re
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Upper bounds in seconds of the histogram buckets, from fast cache hits to slow processing cycles
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    300,
+)
+
+# Valid metric and label names of the Prometheus data model
+METRIC_NAME_PATTERN = re.compile(r"[a-zA-Z_:][a-zA-Z0-9_:]*")
+LABEL_NAME_PATTERN = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]*")
+
+
+class _Metric(ABC):
+    """
+    Base class of the metrics, holding one value per combination of label values.
+    """
+
+    type_name = ""
+    # Label names set by the metric type on its samples, which its own labels cannot use
+    reserved_label_names: Tuple[str, ...] = ()
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): Name of the metric.
+            documentation (str): Description of the metric.
+            label_names (Sequence[str]): Names of the labels the values are split by.
+
+        Raises:
+            ValueError: If the name or a label name is not valid in the Prometheus data model.
+        """
+        if not METRIC_NAME_PATTERN.fullmatch(name):
+            raise ValueError(f"Invalid metric name: {name!r}")
+
+        for label_name in label_names:
+            if (
+                not LABEL_NAME_PATTERN.fullmatch(label_name)
+                or label_name.startswith("__")
+                or label_name in self.reserved_label_names
+            ):
+                raise ValueError(f"Invalid label name of {name}: {label_name!r}")
+
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        """
+        Render the metric in the Prometheus text format.
+
+        Returns:
+            List[str]: The lines of the metric.
+        """
+
+        with self._lock:
+            samples = list(self._samples())
+
+        return [
+            f"# HELP {self.name} {_escape_help(self.documentation)}",
+            f"# TYPE {self.name} {self.type_name}",
+            *samples,
+        ]
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """
+        Get the label values of an observation, in the order of the label names.
+
+        Args:
+            labels (Dict[str, str]): The label values, by label name.
+
+        Returns:
+            Tuple[str, ...]: The label values.
+
+        Raises:
+            ValueError: If the labels do not match the label names of the metric.
+        """
+
+        if set(labels) != set(self.label_names):
+            raise ValueError(
+                f"{self.name} expects labels {self.label_names}, got {tuple(labels)}"
+            )
+
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _format_labels(
+        self, key: Tuple[str, ...], extra: Iterable[Tuple[str, str]] = ()
+    ) -> str:
+        """
+        Format label values as a Prometheus label set.
+
+        Args:
+            key (Tuple[str, ...]): The label values, in the order of the label names.
+            extra (Iterable[Tuple[str, str]]): Additional labels, e.g. the bucket of a histogram.
+
+        Returns:
+            str: The label set, or an empty string if there are no labels.
+        """
+
+        pairs = [*zip(self.label_names, key), *extra]
+        if not pairs:
+            return ""
+
+        return (
+            "{"
+            + ",".join(
+                f'{name}="{_escape_label_value(value)}"' for name, value in pairs
+            )
+            + "}"
+        )
+
+    @abstractmethod
+    def _samples(self) -> Iterable[str]:
+        """
+        Render the samples of the metric, called with its lock held.
+
+        Returns:
+            Iterable[str]: The sample lines.
+        """
+        pass
+
+
+class Counter(_Metric):
+    """
+    Metric that only goes up, e.g. a number of processed pitches.
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        Increment the counter.
+
+        Args:
+            amount (float): The increment.
+            **labels (str): The label values.
+        """
+
+        key = self._key(labels)
+
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> Iterable[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{self._format_labels(key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """
+    Metric counting observations, e.g. latencies, in buckets of increasing upper bounds.
+    """
+
+    type_name = "histogram"
+    reserved_label_names = ("le",)
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): Name of the metric.
+            documentation (str): Description of the metric.
+            label_names (Sequence[str]): Names of the labels the values are split by.
+            buckets (Sequence[float]): Upper bounds of the buckets, in increasing order.
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+        # Per label values: the count of each bucket (not cumulative), then the sum of observations
+        self._counts: Dict[Tuple[str, ...], List[float]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value (float): The observed value.
+            **labels (str): The label values.
+        """
+
+        key = self._key(labels)
+
+        # Observations above the last bound only count in the implicit +Inf bucket
+        bucket = next(
+            (
+                index
+                for index, upper_bound in enumerate(self.buckets)
+                if value <= upper_bound
+            ),
+            len(self.buckets),
+        )
+
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[bucket] += 1
+            self._sums[key] = self._sums.get(key, 0) + value
+
+    def _samples(self) -> Iterable[str]:
+        for key, counts in self._counts.items():
+            cumulative_count = 0
+            for upper_bound, count in zip([*self.buckets, math.inf], counts):
+                cumulative_count += count
+                labels = self._format_labels(key, [("le", _format_value(upper_bound))])
+                yield f"{self.name}_bucket{labels} {cumulative_count}"
+
+            labels = self._format_labels(key)
+            yield f"{self.name}_sum{labels} {_format_value(self._sums[key])}"
+            yield f"{self.name}_count{labels} {cumulative_count}"
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics exposed together.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> Counter:
+        """
+        Create and register a counter.
+
+        Args:
+            name (str): Name of the metric.
+            documentation (str): Description of the metric.
+            label_names (Sequence[str]): Names of the labels the values are split by.
+
+        Returns:
+            Counter: The counter.
+        """
+
+        counter = Counter(name, documentation, label_names)
+        self._metrics.append(counter)
+
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        Create and register a histogram.
+
+        Args:
+            name (str): Name of the metric.
+            documentation (str): Description of the metric.
+            label_names (Sequence[str]): Names of the labels the values are split by.
+            buckets (Sequence[float]): Upper bounds of the buckets, in increasing order.
+
+        Returns:
+            Histogram: The histogram.
+        """
+
+        histogram = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(histogram)
+
+        return histogram
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics.
+        """
+
+        return "".join(
+            f"{line}\n" for metric in self._metrics for line in metric.render()
+        )
+
+
+def _escape_help(documentation: str) -> str:
+    """
+    Escape the documentation of a metric for the HELP line of the Prometheus text format.
+
+    Args:
+        documentation (str): The documentation.
+
+    Returns:
+        str: The escaped documentation.
+    """
+
+    return documentation.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label_value(value: str) -> str:
+    """
+    Escape a label value for the Prometheus text format.
+
+    Args:
+        value (str): The label value.
+
+    Returns:
+        str: The escaped value.
+    """
+
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value or bucket bound for the Prometheus text format.
+
+    Args:
+        value (float): The value.
+
+    Returns:
+        str: The formatted value.
+    """
+
+    if value == math.inf:
+        return "+Inf"
+
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+PROCESSOR_CYCLE_SECONDS = REGISTRY.histogram(
+    "pitch_processor_cycle_seconds",
+    "Duration of the processing cycles, or of the batches in scheduler mode",
+    ["mode", "engine"],
+)
+PROCESSOR_PITCHES = REGISTRY.counter(
+    "pitch_processor_pitches_total",
+    "Pitches handled by the processor, by outcome: due, processed, skipped or failed",
+    ["outcome"],
+)
+WEATHER_LOOKUP_SECONDS = REGISTRY.histogram(
+    "weather_lookup_seconds",
+    "Duration of the weather lookups of the processor, by kind and weather cache outcome",
+    ["kind", "cache"],
+)
+WEATHER_REQUEST_SECONDS = REGISTRY.histogram(
+    "weather_provider_request_seconds",
+    "Duration of the requests to the weather provider, by endpoint and HTTP status",
+    ["endpoint", "status"],
+)
+DB_OPERATION_SECONDS = REGISTRY.histogram(
+    "db_operation_seconds",
+    "Duration of the database operations, by database method",
+    ["operation"],
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds",
+    "Duration of the API requests until the response starts, by route and HTTP status",
+    ["method", "route", "status"],
+)
+READ_CACHE_LOOKUPS = REGISTRY.counter(
+    "read_cache_lookups_total",
+    "Lookups of the cache of the read endpoints, by result: hit or miss",
+    ["result"],
+)
+PITCH_EVENT_SUBSCRIBERS_DROPPED = REGISTRY.counter(
+    "pitch_event_subscribers_dropped_total",
+    "Subscribers of the pitch events dropped because they fell too far behind",
+)
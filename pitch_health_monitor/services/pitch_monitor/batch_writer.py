@@ -0,0 +1,95 @@
+from typing import Any, Dict, List, Optional
+from pitch_health_monitor.database.async_db_methods import bulk_update_pitches_in_db
+from pitch_health_monitor.database.common import BulkUpdateResult
+from pitch_health_monitor.models.schemas import Pitch
+from pitch_health_monitor.services.pitch_monitor.history import (
+    get_pitch_check_point,
+    record_history_points,
+)
+from pitch_health_monitor.services.pitch_monitor.notifications import (
+    PitchEventBroadcaster,
+    get_pitch_change_event,
+    publish_written_pitch_events,
+)
+
+
+class PitchBatchWriter:
+    """
+    Collect the pitches updated during a processing cycle and write them to the database in bulk.
+    """
+
+    def __init__(
+        self, chunk_size: int = 500, events: Optional[PitchEventBroadcaster] = None
+    ):
+        """
+        Initialize the PitchBatchWriter.
+
+        Args:
+            chunk_size (int): Maximum number of pitches sent in a single bulk write.
+            events (Optional[PitchEventBroadcaster]): Broadcaster to publish the condition and schedule
+                changes on, once written.
+        """
+        self.chunk_size = chunk_size
+        self.events = events
+        self.material_change_count = 0
+        self._pitches: List[Pitch] = []
+        self._history_points: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._pitches)
+
+    def add(self, pitch: Pitch, is_raining_now: Optional[bool] = None) -> None:
+        """
+        Queue a pitch to be written on the next flush. Only its modified fields will be written, so a
+        pitch whose rules changed nothing but the last checked timestamp becomes a timestamp bump.
+
+        Args:
+            pitch: The updated pitch object.
+            is_raining_now: Whether it was raining at the pitch, when its weather was checked. The check
+                is then recorded in the condition history once the pitch is written.
+        """
+
+        if pitch.has_material_changes():
+            self.material_change_count += 1
+
+        self._pitches.append(pitch)
+
+        if is_raining_now is not None:
+            self._history_points.append(get_pitch_check_point(pitch, is_raining_now))
+
+    async def flush(self) -> BulkUpdateResult:
+        """
+        Write all queued pitches to the database and clear the queue.
+
+        Returns:
+            BulkUpdateResult: The outcome of the bulk update, including per-pitch failures.
+        """
+
+        pitches, self._pitches = self._pitches, []
+        history_points, self._history_points = self._history_points, []
+
+        # Pitches are marked clean once written, so their changes are collected beforehand
+        events = []
+        if self.events is not None:
+            events = [
+                event
+                for event in map(get_pitch_change_event, pitches)
+                if event is not None
+            ]
+
+        result = await bulk_update_pitches_in_db(pitches, chunk_size=self.chunk_size)
+
+        if events:
+            publish_written_pitch_events(self.events, events, result.failures)
+
+        # Checks are only recorded once their pitch is written, so the history never gets ahead of it
+        await record_history_points(
+            [
+                point
+                for point in history_points
+                if point["pitch"]["uuid"] not in result.failures
+            ],
+            chunk_size=self.chunk_size,
+        )
+
+        return result
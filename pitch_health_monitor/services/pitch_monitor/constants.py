@@ -1,5 +1,62 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
 from pitch_health_monitor.models.schemas import TurfType
 
 DRYING_TIME = {TurfType.artificial: 12, TurfType.hybrid: 24, TurfType.natural: 36}
 
 RAIN_TOLERANCE = {TurfType.artificial: 6, TurfType.hybrid: 4, TurfType.natural: 3}
+
+# Context-local so overridden parameters never leak into other tasks or threads
+_rule_parameters: ContextVar[Tuple[Dict[TurfType, int], Dict[TurfType, int]]] = (
+    ContextVar("rule_parameters", default=(DRYING_TIME, RAIN_TOLERANCE))
+)
+
+
+def get_drying_time() -> Dict[TurfType, int]:
+    """
+    Get the drying time in use.
+
+    Returns:
+        Dict[TurfType, int]: Hours before maintenance can take place, by turf type.
+    """
+    return _rule_parameters.get()[0]
+
+
+def get_rain_tolerance() -> Dict[TurfType, int]:
+    """
+    Get the rain tolerance in use.
+
+    Returns:
+        Dict[TurfType, int]: Consecutive rain hours damaging the pitch, by turf type.
+    """
+    return _rule_parameters.get()[1]
+
+
+@contextmanager
+def override_rule_parameters(
+    drying_time: Optional[Dict[TurfType, int]] = None,
+    rain_tolerance: Optional[Dict[TurfType, int]] = None,
+) -> Iterator[None]:
+    """
+    Override the drying time and rain tolerance of some turf types in the current context until the
+    block exits, e.g. to tune them in a simulation. Both rule engines read the overrides.
+
+    Args:
+        drying_time: Hours before maintenance can take place, by turf type.
+        rain_tolerance: Consecutive rain hours damaging the pitch, by turf type.
+
+    Returns:
+        Iterator[None]: A context manager restoring the previous values on exit.
+    """
+
+    token = _rule_parameters.set(
+        (
+            {**get_drying_time(), **(drying_time or {})},
+            {**get_rain_tolerance(), **(rain_tolerance or {})},
+        )
+    )
+    try:
+        yield
+    finally:
+        _rule_parameters.reset(token)
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from uuid import UUID
+from pitch_health_monitor.database.async_db_methods import (
+    get_pitches_by_uuid_from_db,
+    watch_pitch_changes_in_db,
+)
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.pitch_monitor.batch_writer import PitchBatchWriter
+from pitch_health_monitor.services.pitch_monitor.notifications import (
+    PitchEventBroadcaster,
+)
+from pitch_health_monitor.services.pitch_monitor.rules import apply_maintenance_rules
+
+logger = logging.getLogger(__name__)
+
+
+class PitchChangeBus:
+    """
+    In-process queue of the pitches whose maintenance schedule must be re-evaluated.
+
+    A pitch published several times before being consumed is only queued once, so the queue never
+    holds more entries than there are pitches.
+    """
+
+    def __init__(self):
+        # Insertion ordered, used as an ordered set
+        self._pending: Dict[UUID, None] = {}
+        self._published: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def publish(self, pitch_uuid: UUID) -> None:
+        """
+        Queue a pitch to be re-evaluated.
+
+        Args:
+            pitch_uuid: The UUID of the changed pitch.
+        """
+
+        self._pending[pitch_uuid] = None
+        self._get_published_event().set()
+
+    async def next_batch(self, limit: int) -> List[UUID]:
+        """
+        Wait until pitches are queued, then remove and return the oldest ones.
+
+        Args:
+            limit: Maximum number of pitches to return.
+
+        Returns:
+            List[UUID]: The UUIDs of at least one and at most `limit` pitches.
+        """
+
+        published = self._get_published_event()
+
+        while not self._pending:
+            published.clear()
+            await published.wait()
+
+        pitch_uuids = []
+        for pitch_uuid in self._pending:
+            if len(pitch_uuids) == limit:
+                break
+            pitch_uuids.append(pitch_uuid)
+
+        for pitch_uuid in pitch_uuids:
+            del self._pending[pitch_uuid]
+
+        return pitch_uuids
+
+    def _get_published_event(self) -> asyncio.Event:
+        """
+        Get the event set whenever a pitch is published, created on first use so that it belongs to the
+        running event loop.
+
+        Returns:
+            asyncio.Event: The event.
+        """
+
+        if self._published is None:
+            self._published = asyncio.Event()
+
+        return self._published
+
+
+async def process_pitch_changes(
+    bus: PitchChangeBus,
+    batch_size: int = 100,
+    chunk_size: int = 500,
+    events: Optional[PitchEventBroadcaster] = None,
+):
+    """
+    Re-evaluate the maintenance schedule of the pitches published on the bus, as soon as they are
+    published.
+
+    Args:
+        bus: The bus the changed pitches are published on.
+        batch_size: Maximum number of pitches re-evaluated together.
+        chunk_size: Maximum number of pitches sent in a single bulk write.
+        events: Broadcaster to publish the rescheduled pitches on.
+    """
+
+    while True:
+        pitch_uuids = await bus.next_batch(batch_size)
+
+        try:
+            await reevaluate_pitches(pitch_uuids, chunk_size=chunk_size, events=events)
+        except Exception as e:
+            logger.error("Error re-evaluating pitches %s: %s", pitch_uuids, e)
+
+
+async def reevaluate_pitches(
+    pitch_uuids: List[UUID],
+    chunk_size: int = 500,
+    events: Optional[PitchEventBroadcaster] = None,
+) -> int:
+    """
+    Apply the maintenance rules that do not depend on the weather to the given pitches, and write the
+    ones whose schedule changed. The pitches are not marked as checked, so the weather is still checked
+    when they are due.
+
+    Args:
+        pitch_uuids: The UUIDs of the pitches to re-evaluate.
+        chunk_size: Maximum number of pitches sent in a single bulk write.
+        events: Broadcaster to publish the rescheduled pitches on.
+
+    Returns:
+        int: The number of pitches whose schedule changed.
+    """
+
+    # Deleted pitches are not returned, and so they are skipped
+    pitches = [
+        apply_maintenance_rules(pitch)
+        for pitch in await get_pitches_by_uuid_from_db(pitch_uuids)
+    ]
+
+    changed_count = sum(1 for pitch in pitches if pitch.dirty_fields)
+
+    writer = PitchBatchWriter(chunk_size=chunk_size, events=events)
+    for pitch in pitches:
+        writer.add(pitch)
+
+    # Unchanged pitches are skipped by the bulk update
+    write_result = await writer.flush()
+    for pitch_uuid, error in write_result.failures.items():
+        logger.error("Error writing pitch %s: %s", pitch_uuid, error)
+
+    logger.info(
+        "[%s] Re-evaluated %d changed pitches, %d rescheduled",
+        clock.utcnow(),
+        len(pitches),
+        changed_count,
+    )
+
+    return changed_count
+
+
+async def forward_pitch_changes(bus: PitchChangeBus, retry_delay_seconds: float = 5):
+    """
+    Publish on the bus the pitches changed by any process, read from the change stream of the pitches
+    collection. The stream is resumed after the last change read whenever it fails.
+
+    Args:
+        bus: The bus to publish the changed pitches on.
+        retry_delay_seconds: Delay before reopening the change stream after an error.
+    """
+
+    resume_after = None
+
+    while True:
+        try:
+            # The resume token is updated with every change read
+            async for pitch_uuid, resume_after in watch_pitch_changes_in_db(
+                resume_after
+            ):
+                bus.publish(pitch_uuid)
+
+        except Exception as e:
+            logger.error("Error watching pitch changes: %s", e)
+
+        await asyncio.sleep(retry_delay_seconds)
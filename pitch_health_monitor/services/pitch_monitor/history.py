@@ -0,0 +1,250 @@
+import asyncio
+from datetime import datetime
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from pitch_health_monitor.database.async_db_methods import (
+    get_history_rollup_start_from_db,
+    insert_history_points_in_db,
+    rollup_history_in_db,
+)
+from pitch_health_monitor.models.schemas import Pitch
+from pitch_health_monitor.services import clock
+
+logger = logging.getLogger(__name__)
+
+# Record the condition of every checked pitch and every executed maintenance in the condition history
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() == "true"
+
+# Seconds between two downsamplings of the condition history into hourly and daily rollups
+HISTORY_ROLLUP_INTERVAL_SECONDS = float(
+    os.getenv("HISTORY_ROLLUP_INTERVAL_SECONDS", "900")
+)
+
+# Rollup resolutions in the order they are built, each one from the previous one
+HISTORY_ROLLUP_RESOLUTIONS = ("hourly", "daily")
+
+
+def get_point_meta(
+    pitch_uuid: UUID, city: str, country: str, turf_type: str
+) -> Dict[str, Any]:
+    """
+    Build the metadata of the condition history points of a pitch, which the rollups are grouped and
+    filtered by.
+
+    Args:
+        pitch_uuid: The UUID of the pitch.
+        city: The city of the pitch.
+        country: The country of the pitch.
+        turf_type: The turf type of the pitch.
+
+    Returns:
+        Dict[str, Any]: The metadata, as stored in the metaField of the time-series collection.
+    """
+
+    return {
+        "uuid": pitch_uuid,
+        "city": city,
+        "country": country,
+        "turf_type": turf_type,
+    }
+
+
+def get_pitch_point_meta(pitch: Pitch) -> Dict[str, Any]:
+    """
+    Build the metadata of the condition history points of a pitch.
+
+    Args:
+        pitch: The pitch.
+
+    Returns:
+        Dict[str, Any]: The metadata, as stored in the metaField of the time-series collection.
+    """
+
+    return get_point_meta(
+        pitch.uuid, pitch.location.city, pitch.location.country, pitch.turf_type.value
+    )
+
+
+def get_check_point(
+    meta: Dict[str, Any],
+    recorded_at: datetime,
+    condition: int,
+    consecutive_rain_hours: int,
+    raining: bool,
+) -> Dict[str, Any]:
+    """
+    Build the condition history point of a pitch checked by the processor.
+
+    Args:
+        meta: The metadata of the points of the pitch, see `get_point_meta`.
+        recorded_at: When the pitch was checked.
+        condition: The condition of the pitch after the check.
+        consecutive_rain_hours: The consecutive rain hours of the pitch after the check.
+        raining: Whether it was raining at the pitch.
+
+    Returns:
+        Dict[str, Any]: The point, as stored in the time-series collection.
+    """
+
+    return {
+        "recorded_at": recorded_at,
+        "pitch": meta,
+        "kind": "check",
+        "condition": condition,
+        "consecutive_rain_hours": consecutive_rain_hours,
+        "raining": raining,
+    }
+
+
+def get_pitch_check_point(pitch: Pitch, raining: bool) -> Dict[str, Any]:
+    """
+    Build the condition history point of a pitch the rules were applied to.
+
+    Args:
+        pitch: The checked pitch.
+        raining: Whether it was raining at the pitch.
+
+    Returns:
+        Dict[str, Any]: The point, as stored in the time-series collection.
+    """
+
+    return get_check_point(
+        get_pitch_point_meta(pitch),
+        pitch.last_checked_at,
+        pitch.current_condition,
+        pitch.current_consecutive_rain_hours,
+        raining,
+    )
+
+
+def get_maintenance_point(pitch: Pitch) -> Dict[str, Any]:
+    """
+    Build the condition history point of a pitch whose maintenance was just executed.
+
+    Args:
+        pitch: The maintained pitch, with its last maintenance date set.
+
+    Returns:
+        Dict[str, Any]: The point, as stored in the time-series collection.
+    """
+
+    return {
+        "recorded_at": pitch.last_maintenance_date,
+        "pitch": get_pitch_point_meta(pitch),
+        "kind": "maintenance",
+        "condition": pitch.current_condition,
+        "consecutive_rain_hours": pitch.current_consecutive_rain_hours,
+    }
+
+
+async def record_history_points(
+    points: List[Dict[str, Any]], chunk_size: int = 500
+) -> None:
+    """
+    Insert condition history points in bulk, if the history is enabled. The history is a side record
+    of the processing, so failures are logged rather than raised.
+
+    Args:
+        points: The points to insert.
+        chunk_size: Maximum number of points sent in a single bulk insert.
+    """
+
+    if not HISTORY_ENABLED or not points:
+        return
+
+    result = await insert_history_points_in_db(points, chunk_size)
+
+    if result.inserted_count < len(points):
+        logger.error(
+            "Error recording the condition history: %d of %d points lost: %s",
+            len(points) - result.inserted_count,
+            len(points),
+            "; ".join(result.errors),
+        )
+
+
+def truncate_to_bucket(moment: datetime, resolution: str) -> datetime:
+    """
+    Get the start of the rollup bucket containing a date.
+
+    Args:
+        moment: The date.
+        resolution: The resolution of the rollups, "hourly" or "daily".
+
+    Returns:
+        datetime: The start of the hour or of the day.
+
+    Raises:
+        ValueError: If the resolution is unknown.
+    """
+
+    if resolution == "hourly":
+        return moment.replace(minute=0, second=0, microsecond=0)
+
+    if resolution == "daily":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    raise ValueError(f"Unknown history resolution: {resolution}")
+
+
+async def rollup_history(
+    resolution: str, now: Optional[datetime] = None
+) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Roll up the condition history into the buckets of a resolution that are complete, from the latest
+    bucket rolled up before, which is rebuilt to include the points recorded after its rollup.
+
+    Args:
+        resolution: The resolution of the rollups, "hourly" or "daily".
+        now: The current time, defaults to the current time of the clock in use.
+
+    Returns:
+        Optional[Tuple[datetime, datetime]]: The range rolled up, or None if there was nothing to roll up.
+    """
+
+    start = await get_history_rollup_start_from_db(resolution)
+    end = truncate_to_bucket(now or clock.utcnow(), resolution)
+
+    if start is None:
+        return None
+
+    start = truncate_to_bucket(start, resolution)
+    if start >= end:
+        return None
+
+    await rollup_history_in_db(resolution, start, end)
+
+    return start, end
+
+
+async def downsample_history(
+    interval_seconds: float = HISTORY_ROLLUP_INTERVAL_SECONDS,
+):
+    """
+    Periodically downsample the raw condition history into hourly rollups, and these into daily
+    rollups, so that long range queries read one document per pitch and bucket. Old points and rollups
+    are then dropped by the retention of their collection.
+
+    Args:
+        interval_seconds: Seconds between two downsamplings.
+    """
+
+    while True:
+        try:
+            for resolution in HISTORY_ROLLUP_RESOLUTIONS:
+                rolled_up = await rollup_history(resolution)
+
+                if rolled_up is not None:
+                    logger.info(
+                        "[%s] Rolled up the %s condition history from %s to %s",
+                        clock.utcnow(),
+                        resolution,
+                        *rolled_up,
+                    )
+
+        except Exception as e:
+            logger.error("Error downsampling the condition history: %s", e)
+
+        await asyncio.sleep(interval_seconds)
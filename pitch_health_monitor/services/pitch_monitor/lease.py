@@ -0,0 +1,142 @@
+import asyncio
+from datetime import datetime, timedelta
+import logging
+import os
+import socket
+from typing import Awaitable, Callable, Optional
+from uuid import uuid4
+from pitch_health_monitor.database.async_db_methods import (
+    acquire_lease_in_db,
+    release_lease_in_db,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessorLease:
+    """
+    Lease stored in MongoDB ensuring a routine runs in a single process across all workers and nodes.
+
+    Every process competes for the lease, and only its holder runs the routine. The holder renews the
+    lease with a heartbeat. If it dies or loses contact with the database, the lease expires and
+    another process takes over.
+
+    Expiration times come from the clock of each process. Clocks therefore need to be reasonably
+    synchronized compared to the lease duration.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: timedelta = timedelta(seconds=30),
+        heartbeat_interval: Optional[timedelta] = None,
+        owner: Optional[str] = None,
+    ):
+        """
+        Initialize the ProcessorLease.
+
+        Args:
+            name (str): The name of the lease, shared by all competing processes.
+            ttl (timedelta): How long the lease is held without being renewed.
+            heartbeat_interval (Optional[timedelta]): Interval between renewals and acquisition attempts.
+                Defaults to a third of the TTL.
+            owner (Optional[str]): Identifier of this process. Defaults to the host name and process ID.
+        """
+        self.name = name
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval or ttl / 3
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+    async def run_while_held(self, routine: Callable[[], Awaitable[None]]) -> None:
+        """
+        Run the routine whenever this process holds the lease, stopping it as soon as the lease is lost.
+
+        Args:
+            routine (Callable[[], Awaitable[None]]): Function creating the coroutine to run.
+        """
+
+        try:
+            while True:
+                if await self._try_acquire():
+                    logger.info(
+                        "[%s] Lease %s acquired by %s",
+                        datetime.utcnow(),
+                        self.name,
+                        self.owner,
+                    )
+                    await self._run_until_lost(routine)
+                    logger.info(
+                        "[%s] Lease %s given up by %s",
+                        datetime.utcnow(),
+                        self.name,
+                        self.owner,
+                    )
+
+                await asyncio.sleep(self.heartbeat_interval.total_seconds())
+
+        finally:
+            # Let another process take over right away instead of waiting for the lease to expire
+            try:
+                await release_lease_in_db(self.name, self.owner)
+            except Exception as e:
+                logger.error("Error releasing lease %s: %s", self.name, e)
+
+    async def _run_until_lost(self, routine: Callable[[], Awaitable[None]]) -> None:
+        """
+        Run the routine while renewing the lease, cancelling the routine if the lease cannot be renewed
+        before it expires.
+
+        Args:
+            routine (Callable[[], Awaitable[None]]): Function creating the coroutine to run.
+        """
+
+        expires_at = datetime.utcnow() + self.ttl
+        task = asyncio.ensure_future(routine())
+
+        try:
+            while True:
+                done, _ = await asyncio.wait(
+                    {task}, timeout=self.heartbeat_interval.total_seconds()
+                )
+
+                if done:
+                    # Surface the error of the routine, the lease will be acquired again afterwards
+                    if not task.cancelled() and task.exception() is not None:
+                        logger.error(
+                            "Error running %s", self.name, exc_info=task.exception()
+                        )
+                    return
+
+                renewed_at = datetime.utcnow()
+                held = await self._try_acquire()
+
+                if held:
+                    expires_at = renewed_at + self.ttl
+
+                # Another process took the lease over
+                elif held is not None:
+                    return
+
+                # The database could not be reached, so stop before the lease expires to make sure
+                # two processes never run the routine together
+                elif datetime.utcnow() + self.heartbeat_interval >= expires_at:
+                    return
+
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _try_acquire(self) -> Optional[bool]:
+        """
+        Try to acquire or renew the lease.
+
+        Returns:
+            Optional[bool]: True if this process holds the lease, False if another process does, or None
+                if the database could not be reached.
+        """
+
+        try:
+            return await acquire_lease_in_db(self.name, self.owner, self.ttl)
+        except Exception as e:
+            logger.error("Error acquiring lease %s: %s", self.name, e)
+            return None
@@ -1,35 +1,43 @@
 from datetime import datetime, timedelta
+from typing import Optional
 from pitch_health_monitor.models.schemas import Pitch
+from pitch_health_monitor.services import clock
 
-from pitch_health_monitor.services.pitch_monitor.constants import DRYING_TIME
+from pitch_health_monitor.services.pitch_monitor.constants import get_drying_time
 
 
-def reschedule_due_to_rain(pitch: Pitch, is_raining_now: bool) -> Pitch:
+def reschedule_due_to_rain(
+    pitch: Pitch, is_raining_now: bool, now: Optional[datetime] = None
+) -> Pitch:
     """
     Reschedule the pitch maintenance due to rain, if it is raining and maintenance is scheduled soon.
 
     Args:
         pitch: The pitch object to check and possibly reschedule.
         is_raining_now (bool): Indicates whether it is currently raining.
+        now (Optional[datetime]): The current time, defaults to the current time of the clock in use.
 
     Returns:
         The updated pitch object with possibly rescheduled maintenance.
     """
 
-    if is_raining_now and _is_maintenance_soon(pitch):
-        pitch.next_scheduled_maintenance = datetime.utcnow() + timedelta(
-            hours=DRYING_TIME[pitch.turf_type]
+    now = now or clock.utcnow()
+
+    if is_raining_now and _is_maintenance_soon(pitch, now):
+        pitch.next_scheduled_maintenance = now + timedelta(
+            hours=get_drying_time()[pitch.turf_type]
         )
 
     return pitch
 
 
-def schedule_regular_maintenance(pitch: Pitch) -> Pitch:
+def schedule_regular_maintenance(pitch: Pitch, now: Optional[datetime] = None) -> Pitch:
     """
     Schedule regular maintenance for the pitch if its condition is below a certain threshold and no maintenance is scheduled.
 
     Args:
         pitch: The pitch object to schedule maintenance for.
+        now (Optional[datetime]): The current time, defaults to the current time of the clock in use.
 
     Returns:
         The updated pitch object with scheduled maintenance.
@@ -40,8 +48,8 @@ def schedule_regular_maintenance(pitch: Pitch) -> Pitch:
         and pitch.current_condition > 2
         and pitch.current_condition < 10
     ):
-        pitch.next_scheduled_maintenance = datetime.utcnow() + timedelta(
-            hours=DRYING_TIME[pitch.turf_type]
+        pitch.next_scheduled_maintenance = (now or clock.utcnow()) + timedelta(
+            hours=get_drying_time()[pitch.turf_type]
         )
 
     return pitch
@@ -78,8 +86,10 @@ def perform_maintenance(pitch: Pitch) -> Pitch:
     pitch.current_condition = min(pitch.current_condition + 4, 10)
     pitch.current_consecutive_rain_hours = 0
 
-    pitch.last_maintenance_date = datetime.utcnow()
-    pitch.last_checked_at = datetime.utcnow()
+    now = clock.utcnow()
+
+    pitch.last_maintenance_date = now
+    pitch.last_checked_at = now
 
     pitch.next_scheduled_maintenance = None
     pitch.replacement_date = None
@@ -87,12 +97,13 @@ def perform_maintenance(pitch: Pitch) -> Pitch:
     return pitch
 
 
-def _is_maintenance_soon(pitch: Pitch) -> bool:
+def _is_maintenance_soon(pitch: Pitch, now: datetime) -> bool:
     """
     Check if the maintenance for the pitch is scheduled soon.
 
     Args:
         pitch: The pitch object to check for upcoming maintenance.
+        now: The current time.
 
     Returns:
         A boolean indicating whether maintenance is scheduled soon.
@@ -100,5 +111,5 @@ def _is_maintenance_soon(pitch: Pitch) -> bool:
 
     return (
         pitch.next_scheduled_maintenance is not None
-        and pitch.next_scheduled_maintenance > datetime.utcnow()
+        and pitch.next_scheduled_maintenance > now
     )
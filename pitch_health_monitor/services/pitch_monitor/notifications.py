@@ -0,0 +1,314 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set
+from uuid import UUID
+from pitch_health_monitor.database.async_db_methods import watch_pitch_events_in_db
+from pitch_health_monitor.database.common import PITCH_EVENT_FIELDS
+from pitch_health_monitor.models.schemas import Pitch
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.metrics import PITCH_EVENT_SUBSCRIBERS_DROPPED
+
+logger = logging.getLogger(__name__)
+
+WATCHED_FIELDS = frozenset(PITCH_EVENT_FIELDS)
+
+
+@dataclass
+class PitchChangeEvent:
+    """
+    Change of the condition or maintenance schedule of a pitch.
+
+    Attributes:
+        pitch_uuid: The UUID of the pitch.
+        name: The name of the pitch.
+        city: The city of the pitch.
+        country: The country of the pitch.
+        turf_type: The turf type of the pitch.
+        changes: The new value of every changed watched field.
+        changed_at: When the change was written.
+    """
+
+    pitch_uuid: UUID
+    name: str
+    city: str
+    country: str
+    turf_type: str
+    changes: Dict[str, Any]
+    changed_at: datetime
+
+    def to_json(self) -> str:
+        """
+        Serialize the event.
+
+        Returns:
+            str: The event as a JSON object.
+        """
+
+        return json.dumps(
+            {
+                "uuid": str(self.pitch_uuid),
+                "name": self.name,
+                "city": self.city,
+                "country": self.country,
+                "turf_type": self.turf_type,
+                "changes": self.changes,
+                "changed_at": self.changed_at.isoformat(),
+            },
+            default=lambda value: value.isoformat(),
+        )
+
+
+@dataclass
+class PitchEventFilter:
+    """
+    Filter of the events a subscriber receives. Empty criteria match every pitch.
+
+    Attributes:
+        cities: The cities of the pitches, compared case-insensitively.
+        countries: The countries of the pitches, compared case-insensitively.
+        turf_types: The turf types of the pitches.
+    """
+
+    cities: FrozenSet[str] = frozenset()
+    countries: FrozenSet[str] = frozenset()
+    turf_types: FrozenSet[str] = frozenset()
+
+    def __post_init__(self):
+        self.cities = frozenset(city.casefold() for city in self.cities)
+        self.countries = frozenset(country.casefold() for country in self.countries)
+        self.turf_types = frozenset(self.turf_types)
+
+    def matches(self, event: PitchChangeEvent) -> bool:
+        """
+        Check if an event passes the filter.
+
+        Args:
+            event: The event.
+
+        Returns:
+            bool: True if the event matches all criteria, False otherwise.
+        """
+
+        return (
+            (not self.cities or event.city.casefold() in self.cities)
+            and (not self.countries or event.country.casefold() in self.countries)
+            and (not self.turf_types or event.turf_type in self.turf_types)
+        )
+
+
+@dataclass(eq=False)
+class PitchEventSubscription:
+    """
+    Events queued for a subscriber, until it reads them or falls too far behind.
+
+    Attributes:
+        event_filter: The events the subscriber receives.
+        queue: The events not read yet, None marking the end of the subscription.
+        dropped: Whether the subscription was dropped because its queue was full.
+    """
+
+    event_filter: PitchEventFilter
+    queue: asyncio.Queue
+    dropped: bool = False
+
+    async def next_event(self, timeout_seconds: float) -> Optional[PitchChangeEvent]:
+        """
+        Wait for the next event.
+
+        Args:
+            timeout_seconds: Maximum number of seconds to wait.
+
+        Returns:
+            Optional[PitchChangeEvent]: The event, or None if the subscription was dropped.
+
+        Raises:
+            asyncio.TimeoutError: If no event was published in time.
+        """
+
+        return await asyncio.wait_for(self.queue.get(), timeout_seconds)
+
+
+class PitchEventBroadcaster:
+    """
+    Fan-out of the pitch change events to the subscribers of this process.
+
+    Publishing never waits: a subscriber whose queue is full is dropped rather than slowing down the
+    processor or buffering without bound, and is expected to reconnect and reload the pitches it missed.
+    """
+
+    def __init__(self, max_queued_events: int = 100):
+        """
+        Initialize the PitchEventBroadcaster.
+
+        Args:
+            max_queued_events: Maximum number of events queued for a subscriber before it is dropped.
+        """
+        self.max_queued_events = max_queued_events
+        self.published_count = 0
+        self._subscriptions: Set[PitchEventSubscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(self, event_filter: PitchEventFilter) -> PitchEventSubscription:
+        """
+        Start receiving the events matching a filter.
+
+        Args:
+            event_filter: The events to receive.
+
+        Returns:
+            PitchEventSubscription: The subscription, to iterate over and to unsubscribe when done.
+        """
+
+        # One extra slot so the end marker always fits
+        subscription = PitchEventSubscription(
+            event_filter, asyncio.Queue(self.max_queued_events + 1)
+        )
+        self._subscriptions.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: PitchEventSubscription) -> None:
+        """
+        Stop receiving events.
+
+        Args:
+            subscription: The subscription.
+        """
+
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event: PitchChangeEvent) -> None:
+        """
+        Queue an event for every subscriber whose filter it matches.
+
+        Args:
+            event: The event.
+        """
+
+        self.published_count += 1
+
+        for subscription in list(self._subscriptions):
+            if not subscription.event_filter.matches(event):
+                continue
+
+            if subscription.queue.qsize() < self.max_queued_events:
+                subscription.queue.put_nowait(event)
+                continue
+
+            subscription.dropped = True
+            subscription.queue.put_nowait(None)
+            self.unsubscribe(subscription)
+            PITCH_EVENT_SUBSCRIBERS_DROPPED.inc()
+
+
+def get_pitch_change_event(pitch: Pitch) -> Optional[PitchChangeEvent]:
+    """
+    Build the event of the watched fields modified on a pitch, before it is written and marked clean.
+
+    Args:
+        pitch: The modified pitch.
+
+    Returns:
+        Optional[PitchChangeEvent]: The event, or None if no watched field was modified.
+    """
+
+    changed_fields = pitch.dirty_fields & WATCHED_FIELDS
+    if not changed_fields:
+        return None
+
+    return PitchChangeEvent(
+        pitch_uuid=pitch.uuid,
+        name=pitch.name,
+        city=pitch.location.city,
+        country=pitch.location.country,
+        turf_type=pitch.turf_type.value,
+        changes=pitch.model_dump(mode="json", include=set(changed_fields)),
+        changed_at=clock.utcnow(),
+    )
+
+
+def get_change_stream_event(change: Dict[str, Any]) -> Optional[PitchChangeEvent]:
+    """
+    Build the event of a change read from the pitch events change stream.
+
+    Args:
+        change: The change event, with the full document looked up.
+
+    Returns:
+        Optional[PitchChangeEvent]: The event, or None if the pitch was deleted since the change.
+    """
+
+    document = change.get("fullDocument")
+    if not document:
+        return None
+
+    updated_fields = change["updateDescription"]["updatedFields"]
+
+    return PitchChangeEvent(
+        pitch_uuid=document["uuid"],
+        name=document["name"],
+        city=document["location"]["city"],
+        country=document["location"]["country"],
+        turf_type=document["turf_type"],
+        changes={
+            name: value
+            for name, value in updated_fields.items()
+            if name in WATCHED_FIELDS
+        },
+        changed_at=change["clusterTime"].as_datetime().replace(tzinfo=None),
+    )
+
+
+def publish_written_pitch_events(
+    broadcaster: PitchEventBroadcaster,
+    events: Iterable[PitchChangeEvent],
+    failed_uuids: Iterable[UUID] = (),
+) -> None:
+    """
+    Publish the events of the pitches that were written successfully.
+
+    Args:
+        broadcaster: The broadcaster to publish on.
+        events: The events collected before the write.
+        failed_uuids: The UUIDs of the pitches that could not be written.
+    """
+
+    failed_uuids = set(failed_uuids)
+
+    for event in events:
+        if event.pitch_uuid not in failed_uuids:
+            broadcaster.publish(event)
+
+
+async def forward_pitch_events(
+    broadcaster: PitchEventBroadcaster, retry_delay_seconds: float = 5
+):
+    """
+    Publish the changes of the watched fields written by any process, read from the change stream of
+    the pitches collection. The stream is resumed after the last change read whenever it fails.
+
+    Args:
+        broadcaster: The broadcaster to publish the events on.
+        retry_delay_seconds: Delay before reopening the change stream after an error.
+    """
+
+    resume_after = None
+
+    while True:
+        try:
+            async for change in watch_pitch_events_in_db(resume_after):
+                resume_after = change["_id"]
+
+                event = get_change_stream_event(change)
+                if event is not None:
+                    broadcaster.publish(event)
+
+        except Exception as e:
+            logger.error("Error watching pitch events: %s", e)
+
+        await asyncio.sleep(retry_delay_seconds)
@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Optional
+from pitch_health_monitor.models.schemas import Pitch
+from pitch_health_monitor.services.pitch_monitor.rules import apply_rules
+from pitch_health_monitor.services.weather import HourlyForecast
+
+CHECK_INTERVAL = timedelta(hours=1)
+
+
+@dataclass
+class ProjectedState:
+    """
+    Projected state of a pitch after one of its future hourly checks.
+
+    Attributes:
+        checked_at: Time of the check.
+        is_raining: Whether it is forecast to rain at that time.
+        current_condition: Projected condition of the pitch.
+        current_consecutive_rain_hours: Projected consecutive rain hours.
+        next_scheduled_maintenance: Projected next scheduled maintenance.
+    """
+
+    checked_at: datetime
+    is_raining: bool
+    current_condition: int
+    current_consecutive_rain_hours: int
+    next_scheduled_maintenance: Optional[datetime]
+
+
+def project_pitch(
+    pitch: Pitch, forecast: HourlyForecast, start: datetime
+) -> List[ProjectedState]:
+    """
+    Project the state of a pitch over its hourly checks covered by the forecast, by applying the rule
+    chain to a copy of the pitch with the forecast weather.
+
+    Args:
+        pitch: The pitch object to project. It is left untouched.
+        forecast: The hourly forecast of the location of the pitch.
+        start: Time of the first projected check.
+
+    Returns:
+        List[ProjectedState]: The projected state after each check, in chronological order.
+    """
+
+    projected_pitch = pitch.model_copy(deep=True)
+    projection = []
+
+    checked_at = start
+    while True:
+        is_raining = forecast.is_raining_at(checked_at)
+        if is_raining is None:
+            return projection
+
+        projected_pitch = apply_rules(projected_pitch, is_raining, checked_at)
+        projection.append(
+            ProjectedState(
+                checked_at=checked_at,
+                is_raining=is_raining,
+                current_condition=projected_pitch.current_condition,
+                current_consecutive_rain_hours=projected_pitch.current_consecutive_rain_hours,
+                next_scheduled_maintenance=projected_pitch.next_scheduled_maintenance,
+            )
+        )
+
+        checked_at += CHECK_INTERVAL
+
+
+def plan_maintenance(
+    pitch: Pitch, forecast: HourlyForecast, now: datetime
+) -> Optional[datetime]:
+    """
+    Plan when the scheduled maintenance of a pitch can actually take place, given the rain forecast
+    before it.
+
+    Args:
+        pitch: The pitch object, already checked at `now`.
+        forecast: The hourly forecast of the location of the pitch.
+        now: The current time.
+
+    Returns:
+        Optional[datetime]: The planned maintenance date, or None if the forecast gives no reason to
+            move the scheduled maintenance.
+    """
+
+    scheduled_at = pitch.next_scheduled_maintenance
+
+    if scheduled_at is None or scheduled_at <= now:
+        return None
+
+    # Only rain forecast before the maintenance postpones it, so most pitches are not projected
+    first_check_at = now + CHECK_INTERVAL
+    checked_at = first_check_at
+    while not forecast.is_raining_at(checked_at):
+        checked_at += CHECK_INTERVAL
+        if checked_at >= min(scheduled_at, forecast.ends_at):
+            return None
+
+    planned_at = None
+    for state in project_pitch(pitch, forecast, first_check_at):
+        # Projected rain damage is left to the checks that will observe it
+        if state.next_scheduled_maintenance is None:
+            return None
+
+        planned_at = state.next_scheduled_maintenance
+
+        # The maintenance is due before the next check, so later rain does not matter
+        if planned_at <= state.checked_at + CHECK_INTERVAL:
+            break
+
+    return planned_at if planned_at != scheduled_at else None
+
+
+def reschedule_for_forecast_rain(
+    pitch: Pitch, forecast: HourlyForecast, now: Optional[datetime] = None
+) -> Pitch:
+    """
+    Reschedule the pitch maintenance ahead of the rain forecast before it, instead of waiting for each
+    rainy check to postpone it.
+
+    Args:
+        pitch: The pitch object, already checked.
+        forecast: The hourly forecast of the location of the pitch.
+        now (Optional[datetime]): The time of the check, defaults to the last checked date of the pitch.
+
+    Returns:
+        The updated pitch object with possibly rescheduled maintenance.
+    """
+
+    planned_at = plan_maintenance(pitch, forecast, now or pitch.last_checked_at)
+
+    if planned_at is not None:
+        pitch.next_scheduled_maintenance = planned_at
+
+    return pitch
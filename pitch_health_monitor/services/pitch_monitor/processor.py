@@ -1,91 +1,731 @@
 import asyncio
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from datetime import timedelta
+import logging
+import multiprocessing
 import os
-from pitch_health_monitor.database.db_methods import (
-    update_pitch_in_db,
-    get_all_pitches_from_db,
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional
+from uuid import UUID
+import httpx
+from pitch_health_monitor.database.async_db_methods import (
+    get_due_pitches_from_db,
+    get_pitch_check_times_from_db,
+    get_pitches_by_uuid_from_db,
 )
+from pitch_health_monitor.database.read_cache import read_cache
 from pitch_health_monitor.models.schemas import Pitch
-from pitch_health_monitor.services.pitch_monitor.maintenance_utils import (
-    cancel_maintenance_if_needed,
-    reschedule_due_to_rain,
-    schedule_regular_maintenance,
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.metrics import (
+    PROCESSOR_CYCLE_SECONDS,
+    PROCESSOR_PITCHES,
 )
-from pitch_health_monitor.services.pitch_monitor.weather_utils import (
-    apply_rain_damage,
-    update_weather_status,
+from pitch_health_monitor.services.pitch_monitor.batch_writer import PitchBatchWriter
+from pitch_health_monitor.services.pitch_monitor.events import (
+    PitchChangeBus,
+    forward_pitch_changes,
+    process_pitch_changes,
+)
+from pitch_health_monitor.services.pitch_monitor.history import (
+    HISTORY_ENABLED,
+    downsample_history,
+)
+from pitch_health_monitor.services.pitch_monitor.lease import ProcessorLease
+from pitch_health_monitor.services.pitch_monitor.notifications import (
+    PitchChangeEvent,
+    PitchEventBroadcaster,
+    forward_pitch_events,
+    publish_written_pitch_events,
+)
+from pitch_health_monitor.services.pitch_monitor.planner import (
+    reschedule_for_forecast_rain,
+)
+from pitch_health_monitor.services.pitch_monitor.scheduler import DueTimeScheduler
+from pitch_health_monitor.services.pitch_monitor.sharding import (
+    process_due_pitches_in_shards,
+)
+from pitch_health_monitor.services.pitch_monitor.rules import apply_rules
+from pitch_health_monitor.services.pitch_monitor.vectorized import (
+    process_due_pitches_vectorized,
+)
+from pitch_health_monitor.services.pitch_monitor.weather_grid import (
+    get_weather_cell,
+)
+from pitch_health_monitor.services.profiling import CycleProfiler
+from pitch_health_monitor.services.weather import (
+    AsyncOpenWeatherAPI,
+    AsyncWeatherAPI,
+    CachedWeatherAPI,
+    CoalescingWeatherAPI,
+    ForecastWeatherAPI,
+    ResilientWeatherAPI,
 )
-from pitch_health_monitor.services.weather import OpenWeatherAPI, WeatherAPI
 
 OPEN_WEATHER_API_KEY = os.getenv(
     "OPEN_WEATHER_API_KEY", "a22034aed53ca5845e3c8af45d527d3a"
 )
 
+WEATHER_MAX_CONCURRENCY = int(os.getenv("WEATHER_MAX_CONCURRENCY", "20"))
+WEATHER_TIMEOUT_SECONDS = float(os.getenv("WEATHER_TIMEOUT_SECONDS", "10"))
+WEATHER_CACHE_TTL_SECONDS = float(os.getenv("WEATHER_CACHE_TTL_SECONDS", "600"))
+WEATHER_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "10000"))
+WEATHER_CACHE_SNAPSHOT_PATH = os.getenv("WEATHER_CACHE_SNAPSHOT_PATH")
+# Interval at which the weather cache snapshot is saved while the processor runs, besides on shutdown
+WEATHER_CACHE_SNAPSHOT_INTERVAL_SECONDS = float(
+    os.getenv("WEATHER_CACHE_SNAPSHOT_INTERVAL_SECONDS", "300")
+)
+
+# Calls allowed by the OpenWeather plan, 60 calls per minute on the free plan
+WEATHER_RATE_LIMIT_PER_SECOND = float(os.getenv("WEATHER_RATE_LIMIT_PER_SECOND", "1"))
+WEATHER_RATE_LIMIT_BURST = int(os.getenv("WEATHER_RATE_LIMIT_BURST", "60"))
+WEATHER_MAX_RETRIES = int(os.getenv("WEATHER_MAX_RETRIES", "3"))
+WEATHER_BREAKER_FAILURE_THRESHOLD = int(
+    os.getenv("WEATHER_BREAKER_FAILURE_THRESHOLD", "5")
+)
+WEATHER_BREAKER_RESET_SECONDS = float(os.getenv("WEATHER_BREAKER_RESET_SECONDS", "60"))
+WEATHER_FALLBACK_MAX_AGE_SECONDS = float(
+    os.getenv("WEATHER_FALLBACK_MAX_AGE_SECONDS", "10800")
+)
+
+# Either "current", polling the current weather of every location, or "forecast", fetching the hourly
+# forecast of every location once and planning maintenance ahead of the forecast rain. Only the
+# "objects" engine of the "sweep" mode and the "scheduler" mode plan ahead of the forecast
+WEATHER_SOURCE = os.getenv("WEATHER_SOURCE", "current")
+WEATHER_FORECAST_HOURS = int(os.getenv("WEATHER_FORECAST_HOURS", "24"))
+WEATHER_FORECAST_MAX_AGE_SECONDS = float(
+    os.getenv("WEATHER_FORECAST_MAX_AGE_SECONDS", "21600")
+)
+
+PROCESS_WRITE_CHUNK_SIZE = int(os.getenv("PROCESS_WRITE_CHUNK_SIZE", "500"))
+
+# Either "sweep", processing all due pitches at a fixed interval, "scheduler", processing each pitch
+# when it is due, or "sharded", processing all due pitches at a fixed interval in a pool of processes
+PROCESSOR_MODE = os.getenv("PROCESSOR_MODE", "sweep")
+
+# Either "objects", applying the rules to each Pitch object, or "vectorized", applying them to all due
+# pitches at once as NumPy arrays. Only used by the "sweep" mode
+PROCESSOR_ENGINE = os.getenv("PROCESSOR_ENGINE", "objects")
+
 PROCESS_INTERVAL_SECONDS = 1800
 
+# Run the processor in a single process when the API is served by several workers or nodes
+PROCESSOR_LEASE_ENABLED = os.getenv("PROCESSOR_LEASE_ENABLED", "true").lower() == "true"
+PROCESSOR_LEASE_NAME = "pitch-processor"
+PROCESSOR_LEASE_TTL = timedelta(
+    seconds=int(os.getenv("PROCESSOR_LEASE_TTL_SECONDS", "30"))
+)
+
+# Either "bus", re-evaluating right away the pitches written through the API of this process,
+# "change-stream", re-evaluating the pitches written by any process (requires a replica set), or "none",
+# leaving them to the next check
+PROCESSOR_EVENTS = os.getenv("PROCESSOR_EVENTS", "bus")
+EVENTS_BATCH_SIZE = int(os.getenv("EVENTS_BATCH_SIZE", "100"))
+
+# Source of the condition and schedule changes pushed to the subscribers: "local", the changes written
+# by the processor and the maintenance endpoints of this process, "change-stream", the changes written
+# by any process (requires a replica set), or "none". With the processor lease, only the subscribers of
+# the process holding it receive the processor changes, so "local" is refused with several workers
+PITCH_EVENTS_SOURCE = os.getenv("PITCH_EVENTS_SOURCE", "local")
+PITCH_EVENTS_MAX_QUEUED = int(os.getenv("PITCH_EVENTS_MAX_QUEUED", "100"))
+
+# Number of worker processes serving the API, as read by uvicorn
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+PROCESSOR_SHARDS = int(os.getenv("PROCESSOR_SHARDS", str(os.cpu_count() or 1)))
+
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "100"))
+SCHEDULER_REFRESH_INTERVAL = timedelta(
+    seconds=int(os.getenv("SCHEDULER_REFRESH_INTERVAL_SECONDS", "600"))
+)
+SCHEDULER_RETRY_DELAY = timedelta(
+    seconds=int(os.getenv("SCHEDULER_RETRY_DELAY_SECONDS", "300"))
+)
+
+# Pitches checked more recently than this are not processed again
+RECHECK_INTERVAL = timedelta(hours=1)
+
+# Directory the profiles of the processing cycles are written to, when requested through the API
+PROCESSOR_PROFILE_DIR = os.getenv("PROCESSOR_PROFILE_DIR", "profiles")
+
+logger = logging.getLogger(__name__)
+
+pitch_change_bus = PitchChangeBus()
+pitch_events = PitchEventBroadcaster(PITCH_EVENTS_MAX_QUEUED)
+cycle_profiler = CycleProfiler(PROCESSOR_PROFILE_DIR)
+
+
+def notify_pitch_changed(pitch_uuid: UUID):
+    """
+    Notify the processor that a pitch was created or changed through the API, so that its maintenance
+    schedule is re-evaluated right away when the event bus is enabled.
+
+    Args:
+        pitch_uuid: The UUID of the changed pitch.
+    """
+
+    if PROCESSOR_EVENTS == "bus":
+        pitch_change_bus.publish(pitch_uuid)
+
+
+def publish_pitch_event(event: Optional[PitchChangeEvent]):
+    """
+    Push a condition or schedule change written through the API to the subscribers, unless the changes
+    are read from the change stream.
+
+    Args:
+        event: The change, or None if no pushed field changed.
+    """
+
+    if event is not None and PITCH_EVENTS_SOURCE == "local":
+        pitch_events.publish(event)
+
+
+def _get_local_pitch_events() -> Optional[PitchEventBroadcaster]:
+    """
+    Get the broadcaster the processor publishes the changes it writes on.
+
+    Returns:
+        Optional[PitchEventBroadcaster]: The broadcaster, or None if the changes are read from the
+            change stream or not pushed.
+    """
+
+    return pitch_events if PITCH_EVENTS_SOURCE == "local" else None
+
+
+async def run_processor():
+    """
+    Run the pitch processing routine, in a single process across all workers and nodes when the
+    processor lease is enabled, along with the re-evaluation of the changed pitches.
+
+    Raises:
+        ValueError: If the processor events setting or the pitch events source is unknown, if local
+            pitch events are requested from several workers sharing the processor lease, or if the
+            forecast is requested with a rule engine that does not plan ahead of it.
+    """
+
+    if PROCESSOR_EVENTS not in ("bus", "change-stream", "none"):
+        raise ValueError(f"Unknown processor events: {PROCESSOR_EVENTS}")
+
+    if PITCH_EVENTS_SOURCE not in ("local", "change-stream", "none"):
+        raise ValueError(f"Unknown pitch events source: {PITCH_EVENTS_SOURCE}")
+
+    # Subscribers of the workers not holding the lease would silently miss the processor changes
+    if (
+        PITCH_EVENTS_SOURCE == "local"
+        and PROCESSOR_LEASE_ENABLED
+        and WEB_CONCURRENCY > 1
+    ):
+        raise ValueError(
+            f"Local pitch events only reach the worker holding the processor lease, use the change"
+            f" stream with {WEB_CONCURRENCY} workers"
+        )
+
+    # The forecast would only be used as the current weather, silently skipping the planning
+    if WEATHER_SOURCE == "forecast" and (
+        PROCESSOR_MODE == "sharded"
+        or (PROCESSOR_MODE == "sweep" and PROCESSOR_ENGINE == "vectorized")
+    ):
+        raise ValueError(
+            "The forecast weather source requires the scheduler mode or the objects engine of the"
+            " sweep mode"
+        )
+
+    routines = [_run_with_lease(_run_leased_routines)]
+
+    # Pitches are published by the process serving the request, so every process consumes its own
+    if PROCESSOR_EVENTS == "bus":
+        routines.append(
+            process_pitch_changes(
+                pitch_change_bus,
+                EVENTS_BATCH_SIZE,
+                PROCESS_WRITE_CHUNK_SIZE,
+                _get_local_pitch_events(),
+            )
+        )
+
+    # Subscribers connect to any process, so every process reads the changes of all of them
+    if PITCH_EVENTS_SOURCE == "change-stream":
+        routines.append(forward_pitch_events(pitch_events))
+
+    await asyncio.gather(*routines)
+
+
+async def _run_with_lease(routine: Callable[[], Awaitable[None]]):
+    """
+    Run the routine in a single process across all workers and nodes when the processor lease is
+    enabled, or in this process otherwise.
+
+    Args:
+        routine (Callable[[], Awaitable[None]]): Function creating the coroutine to run.
+    """
+
+    if not PROCESSOR_LEASE_ENABLED:
+        await routine()
+        return
+
+    lease = ProcessorLease(PROCESSOR_LEASE_NAME, ttl=PROCESSOR_LEASE_TTL)
+
+    await lease.run_while_held(routine)
+
+
+async def _run_leased_routines():
+    """
+    Run the routines that must run in a single process: the pitch processing routine, the
+    downsampling of the condition history when it is enabled and, when the change stream is enabled,
+    the re-evaluation of the pitches changed by any process.
+    """
+
+    routines = [_run_processor_mode()]
+
+    if HISTORY_ENABLED:
+        routines.append(downsample_history())
+
+    if PROCESSOR_EVENTS == "change-stream":
+        routines += [
+            forward_pitch_changes(pitch_change_bus),
+            process_pitch_changes(
+                pitch_change_bus,
+                EVENTS_BATCH_SIZE,
+                PROCESS_WRITE_CHUNK_SIZE,
+                _get_local_pitch_events(),
+            ),
+        ]
+
+    await asyncio.gather(*routines)
+
+
+async def _run_processor_mode():
+    """
+    Run the pitch processing routine selected by the PROCESSOR_MODE setting.
+
+    Raises:
+        ValueError: If the processor mode is unknown.
+    """
+
+    if PROCESSOR_MODE == "scheduler":
+        await process_pitches_on_schedule()
+
+    elif PROCESSOR_MODE == "sweep":
+        await process_all_pitches_periodically()
+
+    elif PROCESSOR_MODE == "sharded":
+        await process_all_pitches_in_shards()
+
+    else:
+        raise ValueError(f"Unknown processor mode: {PROCESSOR_MODE}")
+
 
 async def process_all_pitches_periodically():
     """
     Asynchronously process all pitches periodically based on current weather conditions and its health status, including rescheduling maintenance if necessary.
+
+    Raises:
+        ValueError: If the processor engine is unknown.
+    """
+
+    async with open_weather_api() as weather_api:
+        while True:
+            logger.info("[%s] Processing all pitches health conditions", clock.utcnow())
+
+            if PROCESSOR_ENGINE not in ("vectorized", "objects"):
+                raise ValueError(f"Unknown processor engine: {PROCESSOR_ENGINE}")
+
+            with _measure_cycle("sweep", PROCESSOR_ENGINE):
+                if PROCESSOR_ENGINE == "vectorized":
+                    await _process_all_pitches_vectorized(weather_api)
+
+                else:
+                    pitches = await get_due_pitches_from_db(
+                        clock.utcnow() - RECHECK_INTERVAL
+                    )
+
+                    await process_pitches(pitches, weather_api)
+
+            # Wait until the next processment
+            await asyncio.sleep(PROCESS_INTERVAL_SECONDS)
+
+
+async def _process_all_pitches_vectorized(weather_api: CachedWeatherAPI):
+    """
+    Process all due pitches at once with the vectorized rule engine.
+
+    Args:
+        weather_api: The cached weather API shared by all cycles.
+    """
+
+    report = await process_due_pitches_vectorized(
+        clock.utcnow() - RECHECK_INTERVAL,
+        weather_api,
+        chunk_size=PROCESS_WRITE_CHUNK_SIZE,
+        record_history=HISTORY_ENABLED,
+        events=_get_local_pitch_events(),
+    )
+
+    PROCESSOR_PITCHES.inc(report.pitch_count + report.skipped_count, outcome="due")
+    PROCESSOR_PITCHES.inc(
+        report.pitch_count - len(report.failures), outcome="processed"
+    )
+    PROCESSOR_PITCHES.inc(report.skipped_count, outcome="skipped")
+    PROCESSOR_PITCHES.inc(len(report.failures), outcome="failed")
+
+    for pitch_uuid, error in report.failures.items():
+        logger.error("Error writing pitch %s: %s", pitch_uuid, error)
+
+    logger.info(
+        "[%s] Processed %d pitches, %d with material changes, load %.3fs, rules %.3fs, write %.3fs"
+        " (weather: %s)",
+        clock.utcnow(),
+        report.pitch_count,
+        report.changed_count,
+        report.load_seconds,
+        report.rules_seconds,
+        report.write_seconds,
+        weather_api.stats,
+    )
+
+
+async def process_all_pitches_in_shards():
+    """
+    Asynchronously process all due pitches periodically, split by UUID in shards processed in parallel
+    by a pool of processes, each one with its own database connection.
+    """
+
+    # Spawn fresh processes, as database clients must not be shared with forked children
+    executor = ProcessPoolExecutor(
+        max_workers=PROCESSOR_SHARDS, mp_context=multiprocessing.get_context("spawn")
+    )
+
+    try:
+        async with open_weather_api() as weather_api:
+            while True:
+                logger.info(
+                    "[%s] Processing all pitches health conditions in %d shards",
+                    clock.utcnow(),
+                    PROCESSOR_SHARDS,
+                )
+
+                with _measure_cycle("sharded", "objects"):
+                    reports = await process_due_pitches_in_shards(
+                        clock.utcnow() - RECHECK_INTERVAL,
+                        weather_api,
+                        executor,
+                        PROCESSOR_SHARDS,
+                        chunk_size=PROCESS_WRITE_CHUNK_SIZE,
+                        record_history=HISTORY_ENABLED,
+                        collect_events=_get_local_pitch_events() is not None,
+                    )
+
+                # The shards write from other processes, so the pitches they wrote are not known here
+                await read_cache.clear()
+
+                for report in reports:
+                    if report.events:
+                        publish_written_pitch_events(pitch_events, report.events)
+
+                    # Pitches whose weather is unknown are left out of the shards, and not counted
+                    PROCESSOR_PITCHES.inc(
+                        report.pitch_count - len(report.failures), outcome="processed"
+                    )
+                    PROCESSOR_PITCHES.inc(len(report.failures), outcome="failed")
+
+                    logger.info(
+                        "[%s] Shard %d: %d pitches, load %.3fs, rules %.3fs, write %.3fs, %d failures",
+                        clock.utcnow(),
+                        report.shard,
+                        report.pitch_count,
+                        report.load_seconds,
+                        report.rules_seconds,
+                        report.write_seconds,
+                        len(report.failures),
+                    )
+                    for pitch_uuid, error in report.failures.items():
+                        logger.error("Error processing pitch %s: %s", pitch_uuid, error)
+
+                # Wait until the next processment
+                await asyncio.sleep(PROCESS_INTERVAL_SECONDS)
+
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def process_pitches_on_schedule():
+    """
+    Asynchronously process each pitch as soon as it is due, in small batches, sleeping until the next
+    pitch is due. This spreads the load evenly instead of processing every pitch at once.
+
+    The schedule is rebuilt from the database periodically, to pick up pitches created or checked
+    outside of the processor.
+    """
+
+    scheduler = DueTimeScheduler()
+    next_refresh_at = clock.utcnow()
+
+    async with open_weather_api() as weather_api:
+        while True:
+            now = clock.utcnow()
+
+            if now >= next_refresh_at:
+                scheduler.replace_all(
+                    (pitch_uuid, last_checked_at + RECHECK_INTERVAL)
+                    for pitch_uuid, last_checked_at in await get_pitch_check_times_from_db()
+                )
+                next_refresh_at = now + SCHEDULER_REFRESH_INTERVAL
+
+            due_pitch_uuids = scheduler.pop_due(now, SCHEDULER_BATCH_SIZE)
+
+            if due_pitch_uuids:
+                with _measure_cycle("scheduler", "objects"):
+                    await _process_scheduled_pitches(
+                        due_pitch_uuids, scheduler, weather_api
+                    )
+                continue
+
+            # Sleep until the next pitch is due, or until the schedule must be refreshed
+            wake_up_at = min(
+                scheduler.next_due_at() or next_refresh_at, next_refresh_at
+            )
+            await asyncio.sleep(max((wake_up_at - clock.utcnow()).total_seconds(), 0))
+
+
+async def _process_scheduled_pitches(
+    pitch_uuids: List[UUID], scheduler: DueTimeScheduler, weather_api: AsyncWeatherAPI
+):
+    """
+    Process a batch of scheduled pitches and schedule them again for their next check.
+
+    Args:
+        pitch_uuids: The UUIDs of the due pitches.
+        scheduler: The scheduler to enqueue the pitches in again.
+        weather_api: An instance of the AsyncWeatherAPI to check current weather conditions.
+    """
+
+    now = clock.utcnow()
+
+    # Deleted pitches are not returned, and so they are dropped from the schedule
+    pitches = await get_pitches_by_uuid_from_db(pitch_uuids)
+
+    # Pitches may have been checked meanwhile, e.g. by executing their maintenance
+    due_pitches = [
+        pitch for pitch in pitches if pitch.last_checked_at <= now - RECHECK_INTERVAL
+    ]
+
+    await process_pitches(due_pitches, weather_api)
+
+    for pitch in pitches:
+        due_at = pitch.last_checked_at + RECHECK_INTERVAL
+
+        # Pitches that failed were not checked, so they are retried after a delay
+        if due_at <= now:
+            due_at = now + SCHEDULER_RETRY_DELAY
+
+        scheduler.schedule(pitch.uuid, due_at)
+
+
+async def process_pitches(pitches: List[Pitch], weather_api: CachedWeatherAPI):
+    """
+    Process a batch of pitches, fetching the weather of each location once and writing the updated
+    pitches in bulk.
+
+    Args:
+        pitches: The pitch objects to process.
+        weather_api: The cached weather API shared by all batches.
+    """
+
+    # Share a single weather lookup per location across all pitches of this batch
+    batch_weather_api = CoalescingWeatherAPI(weather_api)
+
+    writer = PitchBatchWriter(
+        chunk_size=PROCESS_WRITE_CHUNK_SIZE, events=_get_local_pitch_events()
+    )
+
+    PROCESSOR_PITCHES.inc(len(pitches), outcome="due")
+
+    tasks = [process_pitch(pitch, batch_weather_api, writer) for pitch in pitches]
+
+    await asyncio.gather(*tasks)
+
+    # Write all updated pitches at once
+    written_count = len(writer)
+    write_result = await writer.flush()
+    for pitch_uuid, error in write_result.failures.items():
+        logger.error("Error writing pitch %s: %s", pitch_uuid, error)
+
+    PROCESSOR_PITCHES.inc(
+        written_count - len(write_result.failures), outcome="processed"
+    )
+    PROCESSOR_PITCHES.inc(len(write_result.failures), outcome="failed")
+
+    logger.info(
+        "[%s] Processed %d pitches in %d locations, %d with material changes (weather: %s)",
+        clock.utcnow(),
+        len(pitches),
+        batch_weather_api.location_count,
+        writer.material_change_count,
+        weather_api.stats,
+    )
+
+
+@contextmanager
+def _measure_cycle(mode: str, engine: str) -> Iterator[None]:
+    """
+    Record the duration of a processing cycle, profiling it if a profile was requested.
+
+    Args:
+        mode: The processor mode running the cycle.
+        engine: The rule engine of the cycle.
+
+    Returns:
+        Iterator[None]: Nothing, for use in a `with` statement.
+    """
+
+    started_at = time.perf_counter()
+
+    with cycle_profiler.profile(f"{mode}-{engine}"):
+        yield
+
+    PROCESSOR_CYCLE_SECONDS.observe(
+        time.perf_counter() - started_at, mode=mode, engine=engine
+    )
+
+
+@asynccontextmanager
+async def open_weather_api() -> AsyncIterator[CachedWeatherAPI]:
+    """
+    Create the weather API used by the processor, saving its cache snapshot periodically while it is
+    open. The snapshot is saved once more when it is closed.
+
+    Returns:
+        AsyncIterator[CachedWeatherAPI]: The cached OpenWeather API client, for use in an `async with`
+            statement.
+    """
+
+    async with create_weather_api() as weather_api:
+        snapshot_task = asyncio.create_task(
+            save_weather_snapshot_periodically(weather_api)
+        )
+
+        try:
+            yield weather_api
+        finally:
+            snapshot_task.cancel()
+
+
+async def save_weather_snapshot_periodically(weather_api: CachedWeatherAPI):
     """
+    Save the weather cache snapshot at a fixed interval, if configured, from a worker thread so the
+    processing is never blocked by the file write.
 
-    weather_api = OpenWeatherAPI(OPEN_WEATHER_API_KEY)
+    Args:
+        weather_api: The cached weather API whose snapshot is saved.
+    """
+
+    if not weather_api.snapshot_path:
+        return
 
     while True:
-        print(f"[{datetime.utcnow()}] Processing all pitches health conditions")
+        await asyncio.sleep(WEATHER_CACHE_SNAPSHOT_INTERVAL_SECONDS)
+
+        try:
+            await weather_api.save_snapshot_in_thread()
+        except OSError as e:
+            logger.error("Error saving the weather cache snapshot: %s", e)
+
+
+def create_weather_api(client: Optional[httpx.AsyncClient] = None) -> CachedWeatherAPI:
+    """
+    Create the weather API used by the processor, restoring its cache snapshot if configured.
+
+    Args:
+        client: HTTP client to send the OpenWeather requests with, e.g. to a fake server, instead of
+            a pooled one.
+
+    Returns:
+        CachedWeatherAPI: The cached OpenWeather API client.
 
-        pitches = get_all_pitches_from_db()
+    Raises:
+        ValueError: If the weather source is unknown.
+    """
+
+    weather_api = ResilientWeatherAPI(
+        AsyncOpenWeatherAPI(
+            OPEN_WEATHER_API_KEY,
+            max_concurrency=WEATHER_MAX_CONCURRENCY,
+            timeout_seconds=WEATHER_TIMEOUT_SECONDS,
+            client=client,
+        ),
+        rate_per_second=WEATHER_RATE_LIMIT_PER_SECOND,
+        burst=WEATHER_RATE_LIMIT_BURST,
+        max_retries=WEATHER_MAX_RETRIES,
+        failure_threshold=WEATHER_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout_seconds=WEATHER_BREAKER_RESET_SECONDS,
+        fallback_max_age_seconds=WEATHER_FALLBACK_MAX_AGE_SECONDS,
+        max_entries=WEATHER_CACHE_MAX_ENTRIES,
+    )
+
+    if WEATHER_SOURCE == "forecast":
+        weather_api = ForecastWeatherAPI(
+            weather_api,
+            hours=WEATHER_FORECAST_HOURS,
+            max_age_seconds=WEATHER_FORECAST_MAX_AGE_SECONDS,
+            max_entries=WEATHER_CACHE_MAX_ENTRIES,
+        )
 
-        tasks = [process_pitch(pitch, weather_api) for pitch in pitches]
+    elif WEATHER_SOURCE != "current":
+        raise ValueError(f"Unknown weather source: {WEATHER_SOURCE}")
 
-        await asyncio.gather(*tasks)
+    weather_api = CachedWeatherAPI(
+        weather_api,
+        ttl_seconds=WEATHER_CACHE_TTL_SECONDS,
+        max_entries=WEATHER_CACHE_MAX_ENTRIES,
+        snapshot_path=WEATHER_CACHE_SNAPSHOT_PATH,
+    )
+    weather_api.load_snapshot()
 
-        # Wait until the next processment
-        await asyncio.sleep(PROCESS_INTERVAL_SECONDS)
+    return weather_api
 
 
-async def process_pitch(pitch: Pitch, weather_api: WeatherAPI):
+async def process_pitch(
+    pitch: Pitch, weather_api: AsyncWeatherAPI, writer: PitchBatchWriter
+):
     """
     Process the pitch based on current weather conditions and its health status, including rescheduling maintenance if necessary.
 
     Args:
         pitch: The pitch object to process.
-        weather_api: An instance of the WeatherAPI to check current weather conditions.
+        weather_api: An instance of the AsyncWeatherAPI to check current weather conditions.
+        writer: The batch writer collecting the updated pitches of the cycle.
 
     Raises:
         Exception: If an error occurs while processing the pitch.
     """
 
-    one_hour_ago = datetime.utcnow() - timedelta(hours=1)
-
-    if pitch.last_checked_at > one_hour_ago:
+    if pitch.last_checked_at > clock.utcnow() - RECHECK_INTERVAL:
+        PROCESSOR_PITCHES.inc(outcome="skipped")
         return
 
-    print(f"[{datetime.utcnow()}] Processing pitch {pitch.name}")
+    # Debug level only, as this runs for every pitch of the fleet
+    logger.debug("Processing pitch %s", pitch.name)
 
     try:
-        is_raining_now = weather_api.is_raining_now(
-            pitch.location.city, pitch.location.country
-        )
-
-        # Check current weather and update control variables
-        pitch = update_weather_status(pitch, is_raining_now)
+        # Nearby pitches share the weather of their grid cell
+        weather_cell = get_weather_cell(pitch.location)
 
-        # If there was a maintenance scheduled, check if we need to postpone it due to more rain
-        pitch = reschedule_due_to_rain(pitch, is_raining_now)
-
-        # Apply rain damage to pitch object if a rain cycle is completed
-        pitch = apply_rain_damage(pitch)
-
-        # Check if pitch is not perfect and schedule a maintenance
-        pitch = schedule_regular_maintenance(pitch)
+        is_raining_now = await weather_api.is_raining_now(
+            pitch.location.city, pitch.location.country, weather_cell
+        )
 
-        # Cancel maintenance if
-        pitch = cancel_maintenance_if_needed(pitch)
+        pitch = apply_rules(pitch, is_raining_now)
 
-        pitch.last_checked_at = datetime.utcnow()
+        # The forecast was fetched along with the current weather, so this costs no extra call
+        if WEATHER_SOURCE == "forecast":
+            forecast = await weather_api.get_hourly_forecast(
+                pitch.location.city, pitch.location.country, coordinates=weather_cell
+            )
+            pitch = reschedule_for_forecast_rain(pitch, forecast)
 
-        update_pitch_in_db(pitch.uuid, pitch)
+        writer.add(pitch, is_raining_now)
 
     except Exception as e:
-        print(f"Error processing pitch {pitch.uuid}: {e}")
+        PROCESSOR_PITCHES.inc(outcome="failed")
+        logger.error("Error processing pitch %s: %s", pitch.uuid, e)
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import Optional
+from pitch_health_monitor.models.schemas import Pitch
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.pitch_monitor.maintenance_utils import (
+    cancel_maintenance_if_needed,
+    reschedule_due_to_rain,
+    schedule_regular_maintenance,
+)
+from pitch_health_monitor.services.pitch_monitor.weather_utils import (
+    apply_rain_damage,
+    update_weather_status,
+)
+
+
+def apply_rules(
+    pitch: Pitch, is_raining_now: bool, now: Optional[datetime] = None
+) -> Pitch:
+    """
+    Apply the whole chain of health and maintenance rules to a pitch, given the current weather.
+
+    Args:
+        pitch: The pitch object to update.
+        is_raining_now (bool): Indicates whether it is currently raining.
+        now (Optional[datetime]): The current time, defaults to the current time of the clock in use.
+
+    Returns:
+        The updated pitch object, marked as checked now.
+    """
+
+    now = now or clock.utcnow()
+
+    # Check current weather and update control variables
+    pitch = update_weather_status(pitch, is_raining_now)
+
+    # If there was a maintenance scheduled, check if we need to postpone it due to more rain
+    pitch = reschedule_due_to_rain(pitch, is_raining_now, now)
+
+    # Apply rain damage to pitch object if a rain cycle is completed
+    pitch = apply_rain_damage(pitch)
+
+    pitch = apply_maintenance_rules(pitch, now)
+
+    pitch.last_checked_at = now
+
+    return pitch
+
+
+def apply_maintenance_rules(pitch: Pitch, now: Optional[datetime] = None) -> Pitch:
+    """
+    Apply the rules scheduling or cancelling maintenance from the condition of a pitch, which do not
+    depend on the weather.
+
+    Args:
+        pitch: The pitch object to update.
+        now (Optional[datetime]): The current time, defaults to the current time of the clock in use.
+
+    Returns:
+        The updated pitch object. Its last checked date is left untouched.
+    """
+
+    # Check if pitch is not perfect and schedule a maintenance
+    pitch = schedule_regular_maintenance(pitch, now)
+
+    # Cancel maintenance if
+    pitch = cancel_maintenance_if_needed(pitch)
+
+    return pitch
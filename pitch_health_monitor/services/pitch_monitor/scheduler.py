@@ -0,0 +1,96 @@
+from datetime import datetime
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+
+class DueTimeScheduler:
+    """
+    Priority queue of pitches ordered by the time they are next due for processing.
+
+    Rescheduling a pitch does not remove its previous entry from the heap, the outdated entry is simply
+    skipped when it reaches the top.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, UUID]] = []
+        self._due_at: Dict[UUID, datetime] = {}
+
+    def __len__(self) -> int:
+        return len(self._due_at)
+
+    def schedule(self, pitch_uuid: UUID, due_at: datetime) -> None:
+        """
+        Schedule a pitch to be processed at the given time, replacing any previous schedule.
+
+        Args:
+            pitch_uuid: The UUID of the pitch.
+            due_at: The time at which the pitch is due.
+        """
+
+        self._due_at[pitch_uuid] = due_at
+        heapq.heappush(self._heap, (due_at, pitch_uuid))
+
+    def replace_all(self, schedule: Iterable[Tuple[UUID, datetime]]) -> None:
+        """
+        Replace the whole schedule, dropping pitches that are not part of it anymore.
+
+        Args:
+            schedule: The UUID and due time of every pitch.
+        """
+
+        self._due_at = dict(schedule)
+        self._heap = [
+            (due_at, pitch_uuid) for pitch_uuid, due_at in self._due_at.items()
+        ]
+        heapq.heapify(self._heap)
+
+    def next_due_at(self) -> Optional[datetime]:
+        """
+        Get the time at which the next pitch is due.
+
+        Returns:
+            Optional[datetime]: The earliest due time, or None if nothing is scheduled.
+        """
+
+        self._drop_outdated()
+
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime, limit: int) -> List[UUID]:
+        """
+        Remove and return the pitches due at the given time, earliest first.
+
+        Args:
+            now: The current time.
+            limit: Maximum number of pitches to return.
+
+        Returns:
+            List[UUID]: The UUIDs of at most `limit` due pitches.
+        """
+
+        due_pitches = []
+
+        while len(due_pitches) < limit:
+            self._drop_outdated()
+
+            if not self._heap or self._heap[0][0] > now:
+                break
+
+            _, pitch_uuid = heapq.heappop(self._heap)
+            del self._due_at[pitch_uuid]
+            due_pitches.append(pitch_uuid)
+
+        return due_pitches
+
+    def _drop_outdated(self) -> None:
+        """
+        Discard the entries at the top of the heap that were replaced by a newer schedule.
+        """
+
+        while self._heap:
+            due_at, pitch_uuid = self._heap[0]
+            if self._due_at.get(pitch_uuid) == due_at:
+                return
+
+            heapq.heappop(self._heap)
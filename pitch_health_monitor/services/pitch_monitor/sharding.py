@@ -0,0 +1,262 @@
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from datetime import datetime
+import logging
+import time
+from typing import Dict, List, Tuple
+from uuid import UUID
+from pitch_health_monitor.database.async_db_methods import (
+    get_due_pitch_locations_from_db,
+)
+from pitch_health_monitor.database.db_methods import (
+    bulk_update_pitches_in_db,
+    get_pitches_by_uuid_from_db,
+    insert_history_points_in_db,
+)
+from pitch_health_monitor.models.schemas import Location
+from pitch_health_monitor.services.pitch_monitor.history import get_pitch_check_point
+from pitch_health_monitor.services.pitch_monitor.notifications import (
+    PitchChangeEvent,
+    get_pitch_change_event,
+)
+from pitch_health_monitor.services.pitch_monitor.rules import apply_rules
+from pitch_health_monitor.services.pitch_monitor.weather_grid import (
+    get_weather_cell,
+    weather_location_key,
+)
+from pitch_health_monitor.services.weather import AsyncWeatherAPI
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ShardReport:
+    """
+    Outcome and timings of the processing of a shard.
+
+    Attributes:
+        shard: Index of the shard.
+        pitch_count: Number of pitches processed, the failed ones included.
+        load_seconds: Time spent loading the pitches from the database.
+        rules_seconds: Time spent applying the rules.
+        write_seconds: Time spent writing the pitches to the database.
+        failures: Error message of every pitch that could not be processed, by pitch UUID.
+        events: The condition and schedule changes written, when collected.
+    """
+
+    shard: int
+    pitch_count: int = 0
+    load_seconds: float = 0.0
+    rules_seconds: float = 0.0
+    write_seconds: float = 0.0
+    failures: Dict[UUID, str] = field(default_factory=dict)
+    events: List[PitchChangeEvent] = field(default_factory=list)
+
+
+def shard_of(pitch_uuid: UUID, shard_count: int) -> int:
+    """
+    Get the shard a pitch belongs to. UUIDs are random, so pitches are spread evenly across shards.
+
+    Args:
+        pitch_uuid: The UUID of the pitch.
+        shard_count: The number of shards.
+
+    Returns:
+        int: The index of the shard, between 0 and `shard_count - 1`.
+    """
+
+    return pitch_uuid.int % shard_count
+
+
+async def process_due_pitches_in_shards(
+    checked_before: datetime,
+    weather_api: AsyncWeatherAPI,
+    executor: Executor,
+    shard_count: int,
+    chunk_size: int = 500,
+    record_history: bool = False,
+    collect_events: bool = False,
+) -> List[ShardReport]:
+    """
+    Process the due pitches split in shards, each one run by the executor in parallel.
+
+    The weather of every location is fetched once here, so the shards only apply the rules and write
+    back the pitches, each with its own database connection.
+
+    Args:
+        checked_before: Pitches last checked at or before this date are due.
+        weather_api: An instance of the AsyncWeatherAPI to check current weather conditions.
+        executor: The executor running the shards, typically a process pool.
+        shard_count: The number of shards.
+        chunk_size: Maximum number of pitches sent in a single bulk write.
+        record_history: Whether to record the checks in the condition history.
+        collect_events: Whether to return the condition and schedule changes written, to be published
+            by this process.
+
+    Returns:
+        List[ShardReport]: The report of every shard.
+    """
+
+    due_pitches = await get_due_pitch_locations_from_db(checked_before)
+
+    weather_by_location = await fetch_weather_by_location(
+        [location for _, location in due_pitches], weather_api
+    )
+
+    shards: List[List[UUID]] = [[] for _ in range(shard_count)]
+    for pitch_uuid, location in due_pitches:
+        # Pitches whose weather is unknown are left due and retried next time
+        if weather_location_key(location) in weather_by_location:
+            shards[shard_of(pitch_uuid, shard_count)].append(pitch_uuid)
+
+    loop = asyncio.get_running_loop()
+
+    return await asyncio.gather(
+        *[
+            loop.run_in_executor(
+                executor,
+                process_shard,
+                shard,
+                pitch_uuids,
+                checked_before,
+                weather_by_location,
+                chunk_size,
+                record_history,
+                collect_events,
+            )
+            for shard, pitch_uuids in enumerate(shards)
+            if pitch_uuids
+        ]
+    )
+
+
+def process_shard(
+    shard: int,
+    pitch_uuids: List[UUID],
+    checked_before: datetime,
+    weather_by_location: Dict[Tuple[str, str], bool],
+    chunk_size: int = 500,
+    record_history: bool = False,
+    collect_events: bool = False,
+) -> ShardReport:
+    """
+    Load, process and write back the pitches of a shard. Meant to run in a worker process.
+
+    Args:
+        shard: Index of the shard.
+        pitch_uuids: The UUIDs of the pitches of the shard.
+        checked_before: Pitches checked after this date meanwhile are skipped.
+        weather_by_location: Whether it is raining, by normalized location.
+        chunk_size: Maximum number of pitches sent in a single bulk write.
+        record_history: Whether to record the checks in the condition history.
+        collect_events: Whether to return the condition and schedule changes written in the report.
+
+    Returns:
+        ShardReport: The outcome and timings of the shard.
+    """
+
+    report = ShardReport(shard=shard)
+
+    started_at = time.perf_counter()
+    pitches = get_pitches_by_uuid_from_db(pitch_uuids)
+    report.load_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    processed_pitches = []
+    history_points = []
+    for pitch in pitches:
+        if pitch.last_checked_at > checked_before:
+            continue
+
+        try:
+            is_raining_now = weather_by_location[weather_location_key(pitch.location)]
+            pitch = apply_rules(pitch, is_raining_now)
+            processed_pitches.append(pitch)
+
+            if record_history:
+                history_points.append(get_pitch_check_point(pitch, is_raining_now))
+
+        except Exception as e:
+            report.failures[pitch.uuid] = str(e)
+
+    report.pitch_count = len(processed_pitches) + len(report.failures)
+    report.rules_seconds = time.perf_counter() - started_at
+
+    # Pitches are marked clean once written, so their changes are collected beforehand
+    events = []
+    if collect_events:
+        events = [
+            event
+            for event in map(get_pitch_change_event, processed_pitches)
+            if event is not None
+        ]
+
+    started_at = time.perf_counter()
+    write_result = bulk_update_pitches_in_db(processed_pitches, chunk_size=chunk_size)
+    report.failures.update(write_result.failures)
+
+    report.events = [
+        event for event in events if event.pitch_uuid not in report.failures
+    ]
+
+    # Checks are only recorded once their pitch is written, so the history never gets ahead of it
+    history_points = [
+        point
+        for point in history_points
+        if point["pitch"]["uuid"] not in report.failures
+    ]
+    if history_points:
+        history_result = insert_history_points_in_db(history_points, chunk_size)
+        if history_result.inserted_count < len(history_points):
+            logger.error(
+                "Error recording the condition history of shard %d: %d points lost: %s",
+                shard,
+                len(history_points) - history_result.inserted_count,
+                "; ".join(history_result.errors),
+            )
+
+    report.write_seconds = time.perf_counter() - started_at
+
+    return report
+
+
+async def fetch_weather_by_location(
+    locations: List[Location], weather_api: AsyncWeatherAPI
+) -> Dict[Tuple[str, str], bool]:
+    """
+    Fetch the weather of each distinct location once, pitches in the same weather grid cell sharing
+    a single lookup.
+
+    Args:
+        locations: The locations of the pitches.
+        weather_api: An instance of the AsyncWeatherAPI to check current weather conditions.
+
+    Returns:
+        Dict[Tuple[str, str], bool]: Whether it is raining, by normalized location. Locations whose
+            weather could not be fetched are left out.
+    """
+
+    distinct_locations = {
+        weather_location_key(location): location for location in locations
+    }
+
+    results = await asyncio.gather(
+        *[
+            weather_api.is_raining_now(
+                location.city, location.country, get_weather_cell(location)
+            )
+            for location in distinct_locations.values()
+        ],
+        return_exceptions=True,
+    )
+
+    weather_by_location = {}
+    for key, result in zip(distinct_locations, results):
+        if isinstance(result, Exception):
+            logger.error("Error fetching weather for %s: %s", key, result)
+            continue
+
+        weather_by_location[key] = result
+
+    return weather_by_location
@@ -0,0 +1,583 @@
+"""
+Offline simulation of the pitch health rules over a synthetic fleet and a weather timeline.
+
+The `process_pitch` rule chain of the processor runs on a simulated clock, without database nor
+network, so months of processing cycles take seconds. Crews perform the maintenance of each pitch as
+soon as it is due, optionally limited to a number of maintenances per day.
+
+Usage:
+    python -m pitch_health_monitor.services.pitch_monitor.simulator --pitches 100 --days 90 \\
+        --drying-time natural=24 --crew-capacity 20 --output simulation.json
+"""
+
+import argparse
+import asyncio
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+import json
+import math
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.clock import SimulatedClock, use_clock
+from pitch_health_monitor.services.pitch_monitor.constants import (
+    override_rule_parameters,
+)
+from pitch_health_monitor.services.pitch_monitor.maintenance_utils import (
+    perform_maintenance,
+)
+from pitch_health_monitor.services.pitch_monitor.processor import (
+    RECHECK_INTERVAL,
+    process_pitch,
+)
+from pitch_health_monitor.services.weather import (
+    AsyncWeatherAPI,
+    Coordinates,
+    HourlyForecast,
+    location_key,
+)
+
+DEFAULT_START = datetime(2024, 1, 1)
+
+
+@dataclass
+class WeatherTimeline:
+    """
+    Whether it rains at each location, hour by hour.
+
+    Attributes:
+        starts_at: Start of the first hour, in UTC.
+        raining: Whether it rains for each hour from `starts_at`, by normalized location.
+    """
+
+    starts_at: datetime
+    raining: Dict[Tuple[str, str], List[bool]]
+
+    @classmethod
+    def generate(
+        cls,
+        locations: List[Location],
+        starts_at: datetime,
+        hours: int,
+        rng: random.Random,
+        rain_probability: float = 0.05,
+        rain_persistence: float = 0.8,
+    ) -> "WeatherTimeline":
+        """
+        Generate a timeline where rain comes in spells: each dry hour starts raining with a probability
+        of `rain_probability`, and each rainy hour keeps raining with a probability of `rain_persistence`.
+
+        Args:
+            locations: The locations to generate the weather of.
+            starts_at: Start of the first hour, in UTC.
+            hours: Number of hours to generate.
+            rng: The random number generator.
+            rain_probability: Probability for rain to start in a dry hour.
+            rain_persistence: Probability for rain to go on in a rainy hour.
+
+        Returns:
+            WeatherTimeline: The generated timeline.
+        """
+
+        raining = {}
+        for location in locations:
+            is_raining = False
+            location_raining = []
+            for _ in range(hours):
+                is_raining = rng.random() < (
+                    rain_persistence if is_raining else rain_probability
+                )
+                location_raining.append(is_raining)
+
+            raining[location_key(location.city, location.country)] = location_raining
+
+        return cls(starts_at=starts_at, raining=raining)
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["WeatherTimeline", List[Location]]:
+        """
+        Load a recorded timeline from a JSON file shaped like:
+        `{"starts_at": "2024-01-01T00:00:00", "locations": [{"city": "Berlin", "country": "Germany",
+        "raining": [false, true, ...]}]}`.
+
+        Args:
+            path: Path of the JSON file.
+
+        Returns:
+            Tuple[WeatherTimeline, List[Location]]: The timeline and the locations it covers.
+        """
+
+        with open(path) as timeline_file:
+            recorded = json.load(timeline_file)
+
+        locations = [
+            Location(city=entry["city"], country=entry["country"])
+            for entry in recorded["locations"]
+        ]
+        raining = {
+            location_key(entry["city"], entry["country"]): [
+                bool(value) for value in entry["raining"]
+            ]
+            for entry in recorded["locations"]
+        }
+
+        timeline = cls(
+            starts_at=datetime.fromisoformat(recorded["starts_at"]), raining=raining
+        )
+
+        return timeline, locations
+
+    def covers(
+        self, key: Tuple[str, str], starts_at: datetime, ends_at: datetime
+    ) -> bool:
+        """
+        Check if the timeline gives the weather of a location over a whole period.
+
+        Args:
+            key: The normalized location.
+            starts_at: Start of the period.
+            ends_at: End of the period.
+
+        Returns:
+            bool: True if every hour of the period is covered, False otherwise.
+        """
+
+        return (
+            key in self.raining
+            and starts_at >= self.starts_at
+            and ends_at <= self.starts_at + timedelta(hours=len(self.raining[key]))
+        )
+
+    def is_raining_at(self, key: Tuple[str, str], at: datetime) -> bool:
+        """
+        Check if it rains at a location at the given time.
+
+        Args:
+            key: The normalized location.
+            at: The time, in UTC.
+
+        Returns:
+            bool: True if it rains, False otherwise.
+
+        Raises:
+            ValueError: If the timeline does not cover the location at that time.
+        """
+
+        if not self.covers(key, at, at):
+            raise ValueError(f"The weather timeline does not cover {key} at {at}")
+
+        return self.raining[key][int((at - self.starts_at) / timedelta(hours=1))]
+
+    def forecast(
+        self, key: Tuple[str, str], at: datetime, hours: int
+    ) -> HourlyForecast:
+        """
+        Build the exact forecast of a location from the timeline.
+
+        Args:
+            key: The normalized location.
+            at: The time the forecast is made, in UTC.
+            hours: Number of hours to forecast, starting with the current one.
+
+        Returns:
+            HourlyForecast: The forecast, shorter than requested near the end of the timeline.
+        """
+
+        starts_at = at.replace(minute=0, second=0, microsecond=0)
+        index = max(int((starts_at - self.starts_at) / timedelta(hours=1)), 0)
+
+        return HourlyForecast(
+            starts_at=starts_at,
+            raining=self.raining[key][index : index + hours],
+            fetched_at=at,
+        )
+
+
+class TimelineWeatherAPI(AsyncWeatherAPI):
+    """
+    Weather API answering from a weather timeline at the time of the clock in use. Locations are
+    always looked up by city, as timelines are.
+    """
+
+    def __init__(self, timeline: WeatherTimeline):
+        """
+        Initialize the TimelineWeatherAPI.
+
+        Args:
+            timeline (WeatherTimeline): The weather timeline to answer from.
+        """
+        self.timeline = timeline
+
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        """
+        Check if it rains in the specified city and country according to the timeline.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Ignored.
+
+        Returns:
+            bool: True if it is currently raining, False otherwise.
+        """
+
+        return self.timeline.is_raining_at(location_key(city, country), clock.utcnow())
+
+    async def get_hourly_forecast(
+        self,
+        city: str,
+        country: str,
+        hours: int = 24,
+        coordinates: Optional[Coordinates] = None,
+    ) -> HourlyForecast:
+        """
+        Get the exact forecast of the specified city and country from the timeline.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            hours (int): Number of hours to forecast, starting with the current one.
+            coordinates (Optional[Coordinates]): Ignored.
+
+        Returns:
+            HourlyForecast: The forecast.
+        """
+
+        return self.timeline.forecast(
+            location_key(city, country), clock.utcnow(), hours
+        )
+
+
+@dataclass
+class PitchTrajectory:
+    """
+    Simulated history of a pitch.
+
+    Attributes:
+        uuid: UUID of the pitch.
+        name: Name of the pitch.
+        turf_type: Type of turf of the pitch.
+        conditions: Condition of the pitch at the end of each cycle.
+        maintenance_count: Number of maintenances performed on the pitch.
+    """
+
+    uuid: UUID
+    name: str
+    turf_type: TurfType
+    conditions: List[int] = field(default_factory=list)
+    maintenance_count: int = 0
+
+
+@dataclass
+class SimulationResult:
+    """
+    Outcome of a simulation.
+
+    Attributes:
+        starts_at: Time of the first cycle, in UTC.
+        cycle_minutes: Number of minutes between cycles.
+        cycle_count: Number of cycles simulated.
+        pitches: The trajectory of every pitch.
+        maintenance_by_day: Number of maintenances performed, by ISO date.
+        peak_backlog: Largest number of pitches whose due maintenance waited for a crew.
+    """
+
+    starts_at: datetime
+    cycle_minutes: int
+    cycle_count: int
+    pitches: List[PitchTrajectory]
+    maintenance_by_day: Dict[str, int]
+    peak_backlog: int = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the simulation over the whole fleet.
+
+        Returns:
+            Dict[str, Any]: The summary figures, by name.
+        """
+
+        final_conditions = [
+            trajectory.conditions[-1]
+            for trajectory in self.pitches
+            if trajectory.conditions
+        ]
+        daily_counts = list(self.maintenance_by_day.values()) or [0]
+
+        return {
+            "pitches": len(self.pitches),
+            "cycles": self.cycle_count,
+            "maintenances": sum(daily_counts),
+            "maintenances_per_day": round(sum(daily_counts) / len(daily_counts), 2),
+            "peak_maintenances_per_day": max(daily_counts),
+            "peak_backlog": self.peak_backlog,
+            "mean_final_condition": round(
+                sum(final_conditions) / max(len(final_conditions), 1), 2
+            ),
+            "turf_replacements_required": sum(
+                1 for condition in final_conditions if condition <= 2
+            ),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the result to a dictionary, along with its summary.
+
+        Returns:
+            Dict[str, Any]: The result.
+        """
+
+        return {"summary": self.summary(), **asdict(self)}
+
+
+class _DiscardingWriter:
+    """
+    Stand-in for the batch writer of the processor, dropping the updated pitches instead of writing
+    them to the database.
+    """
+
+    def add(self, pitch: Pitch, is_raining_now: Optional[bool] = None) -> None:
+        pitch.mark_clean()
+
+
+def generate_fleet(
+    count: int, locations: List[Location], starts_at: datetime, rng: random.Random
+) -> List[Pitch]:
+    """
+    Generate pitches spread over the locations, all due for processing at the start.
+
+    Args:
+        count: Number of pitches to generate.
+        locations: The locations of the pitches.
+        starts_at: Time of the first cycle, in UTC.
+        rng: The random number generator.
+
+    Returns:
+        List[Pitch]: The generated pitches.
+    """
+
+    return [
+        Pitch(
+            uuid=UUID(int=rng.getrandbits(128), version=4),
+            created_at=starts_at,
+            last_checked_at=starts_at - RECHECK_INTERVAL,
+            name=f"Pitch {index}",
+            location=locations[index % len(locations)],
+            turf_type=rng.choice(list(TurfType)),
+            current_condition=rng.randint(3, 10),
+        )
+        for index in range(count)
+    ]
+
+
+async def simulate(
+    pitches: List[Pitch],
+    timeline: WeatherTimeline,
+    starts_at: datetime,
+    cycle_count: int,
+    cycle_interval: timedelta = timedelta(minutes=30),
+    crew_capacity: Optional[int] = None,
+) -> SimulationResult:
+    """
+    Run the processing cycles of the processor over the pitches on a simulated clock. Before each
+    cycle, crews perform the maintenance that is due, earliest scheduled first.
+
+    Args:
+        pitches: The pitches to simulate. They are updated in place.
+        timeline: The weather timeline of the locations of the pitches.
+        starts_at: Time of the first cycle, in UTC.
+        cycle_count: Number of cycles to simulate.
+        cycle_interval: Simulated time between cycles.
+        crew_capacity: Maximum number of maintenances performed per day, unlimited if None.
+
+    Returns:
+        SimulationResult: The trajectories of the pitches and the maintenance workload.
+
+    Raises:
+        ValueError: If the timeline does not cover the location of a pitch over the simulation.
+    """
+
+    ends_at = starts_at + cycle_interval * cycle_count
+    for pitch in pitches:
+        key = location_key(pitch.location.city, pitch.location.country)
+        if not timeline.covers(key, starts_at, ends_at):
+            raise ValueError(f"The weather timeline does not cover {key}")
+
+    simulated_clock = SimulatedClock(starts_at)
+    weather_api = TimelineWeatherAPI(timeline)
+    writer = _DiscardingWriter()
+
+    result = SimulationResult(
+        starts_at=starts_at,
+        cycle_minutes=int(cycle_interval / timedelta(minutes=1)),
+        cycle_count=cycle_count,
+        pitches=[
+            PitchTrajectory(uuid=pitch.uuid, name=pitch.name, turf_type=pitch.turf_type)
+            for pitch in pitches
+        ],
+        maintenance_by_day={},
+    )
+
+    with use_clock(simulated_clock):
+        for _ in range(cycle_count):
+            now = simulated_clock.now()
+            day = now.date().isoformat()
+            result.maintenance_by_day.setdefault(day, 0)
+
+            due_rows = sorted(
+                (
+                    row
+                    for row, pitch in enumerate(pitches)
+                    if pitch.next_scheduled_maintenance is not None
+                    and pitch.next_scheduled_maintenance <= now
+                ),
+                key=lambda row: pitches[row].next_scheduled_maintenance,
+            )
+
+            if crew_capacity is not None:
+                available = max(crew_capacity - result.maintenance_by_day[day], 0)
+                result.peak_backlog = max(
+                    result.peak_backlog, len(due_rows) - available
+                )
+                due_rows = due_rows[:available]
+
+            for row in due_rows:
+                # Written right away, as by the maintenance endpoint
+                perform_maintenance(pitches[row]).mark_clean()
+                result.pitches[row].maintenance_count += 1
+
+            result.maintenance_by_day[day] += len(due_rows)
+
+            # Awaited one by one, as the simulated weather is answered without waiting
+            for pitch in pitches:
+                await process_pitch(pitch, weather_api, writer)
+
+            for trajectory, pitch in zip(result.pitches, pitches):
+                trajectory.conditions.append(pitch.current_condition)
+
+            simulated_clock.advance(cycle_interval)
+
+    return result
+
+
+def _parse_turf_hours(value: str) -> Tuple[TurfType, int]:
+    """
+    Parse a TURF=HOURS command line argument.
+
+    Args:
+        value: The argument.
+
+    Returns:
+        Tuple[TurfType, int]: The turf type and the number of hours.
+
+    Raises:
+        argparse.ArgumentTypeError: If the argument is malformed.
+    """
+
+    try:
+        turf_type, hours = value.split("=")
+        return TurfType(turf_type), int(hours)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Expected TURF=HOURS with TURF in {[turf.value for turf in TurfType]}, got {value}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pitches", type=int, default=100)
+    parser.add_argument(
+        "--locations",
+        type=int,
+        default=10,
+        help="Number of generated locations, ignored with --weather",
+    )
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--cycle-minutes", type=int, default=30)
+    parser.add_argument(
+        "--start",
+        type=datetime.fromisoformat,
+        help="UTC time of the first cycle, defaults to the start of the weather timeline",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--weather", help="Recorded weather timeline JSON file, generated if omitted"
+    )
+    parser.add_argument("--rain-probability", type=float, default=0.05)
+    parser.add_argument("--rain-persistence", type=float, default=0.8)
+    parser.add_argument(
+        "--drying-time",
+        type=_parse_turf_hours,
+        action="append",
+        default=[],
+        metavar="TURF=HOURS",
+    )
+    parser.add_argument(
+        "--rain-tolerance",
+        type=_parse_turf_hours,
+        action="append",
+        default=[],
+        metavar="TURF=HOURS",
+    )
+    parser.add_argument(
+        "--crew-capacity", type=int, help="Maximum number of maintenances per day"
+    )
+    parser.add_argument("--output", help="JSON file to write the trajectories to")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cycle_interval = timedelta(minutes=args.cycle_minutes)
+    cycle_count = int(timedelta(days=args.days) / cycle_interval)
+
+    if args.weather:
+        timeline, locations = WeatherTimeline.load(args.weather)
+        starts_at = args.start or timeline.starts_at
+    else:
+        starts_at = args.start or DEFAULT_START
+        locations = [
+            Location(city=f"City {index}", country="Simulation")
+            for index in range(args.locations)
+        ]
+        timeline = WeatherTimeline.generate(
+            locations,
+            starts_at,
+            math.ceil(cycle_count * cycle_interval / timedelta(hours=1)) + 1,
+            rng,
+            rain_probability=args.rain_probability,
+            rain_persistence=args.rain_persistence,
+        )
+
+    pitches = generate_fleet(args.pitches, locations, starts_at, rng)
+
+    started_at = time.perf_counter()
+    with override_rule_parameters(dict(args.drying_time), dict(args.rain_tolerance)):
+        result = asyncio.run(
+            simulate(
+                pitches,
+                timeline,
+                starts_at,
+                cycle_count,
+                cycle_interval=cycle_interval,
+                crew_capacity=args.crew_capacity,
+            )
+        )
+    elapsed_seconds = time.perf_counter() - started_at
+
+    for name, value in result.summary().items():
+        print(f"{name:>26}: {value}")
+    print(
+        f"Simulated {cycle_count} cycles of {len(pitches)} pitches in {elapsed_seconds:.1f}s"
+    )
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(result.to_dict(), output_file, default=str)
+
+
+if __name__ == "__main__":
+    main()
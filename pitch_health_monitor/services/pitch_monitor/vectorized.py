@@ -0,0 +1,549 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+import numpy as np
+from pitch_health_monitor.database.async_db_methods import (
+    bulk_set_pitch_fields_in_db,
+    get_pitch_documents_from_db,
+    iter_due_pitch_documents_from_db,
+    mark_pitches_checked_in_db,
+)
+from pitch_health_monitor.database.common import PITCH_EVENT_PROJECTION
+from pitch_health_monitor.models.schemas import Location, TurfType
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.pitch_monitor.constants import (
+    get_drying_time,
+    get_rain_tolerance,
+)
+from pitch_health_monitor.services.pitch_monitor.history import (
+    get_check_point,
+    get_point_meta,
+    record_history_points,
+)
+from pitch_health_monitor.services.pitch_monitor.notifications import (
+    PitchChangeEvent,
+    PitchEventBroadcaster,
+    publish_written_pitch_events,
+)
+from pitch_health_monitor.services.pitch_monitor.sharding import (
+    fetch_weather_by_location,
+)
+from pitch_health_monitor.services.pitch_monitor.weather_grid import (
+    weather_location_key,
+)
+from pitch_health_monitor.services.weather import AsyncWeatherAPI
+
+# Turf types are stored as their index in this list, so the constants become lookup tables
+TURF_TYPES = list(TurfType)
+TURF_CODES = {turf_type.value: code for code, turf_type in enumerate(TURF_TYPES)}
+
+NOT_SCHEDULED = np.datetime64("NaT", "us")
+
+
+@dataclass
+class PitchColumns:
+    """
+    Fields used by the processing rules for many pitches, stored as one NumPy array per field.
+
+    Attributes:
+        uuids: UUID of every pitch.
+        location_codes: Index of the location of every pitch in `locations`.
+        locations: One location per distinct weather lookup, i.e. per grid cell or city.
+        cities: City of every pitch.
+        countries: Country of every pitch.
+        turf_codes: Index of the turf type of every pitch in `TURF_TYPES`.
+        conditions: Current condition of every pitch.
+        rain_hours: Current consecutive rain hours of every pitch.
+        next_maintenance: Next scheduled maintenance of every pitch, NaT if none is scheduled.
+    """
+
+    uuids: np.ndarray
+    location_codes: np.ndarray
+    locations: List[Location]
+    cities: np.ndarray
+    countries: np.ndarray
+    turf_codes: np.ndarray
+    conditions: np.ndarray
+    rain_hours: np.ndarray
+    next_maintenance: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.uuids)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict[str, Any]]) -> "PitchColumns":
+        """
+        Build the columns from raw pitch documents, without validating them into Pitch objects.
+
+        Args:
+            documents: The pitch documents, with at least the fields of RULE_COLUMNS_PROJECTION.
+
+        Returns:
+            PitchColumns: The columns, one row per document.
+        """
+
+        uuids = []
+        location_codes = []
+        locations = []
+        codes_by_location: Dict[Tuple[str, str], int] = {}
+        # Each distinct raw location is only validated once
+        codes_by_raw_location: Dict[Tuple[Any, ...], int] = {}
+        cities = []
+        countries = []
+        turf_codes = []
+        conditions = []
+        rain_hours = []
+        next_maintenance = []
+
+        for document in documents:
+            location = document["location"]
+            coordinates = location.get("coordinates")
+            raw_key = (
+                location["city"],
+                location["country"],
+                tuple(coordinates["coordinates"]) if coordinates else None,
+            )
+
+            code = codes_by_raw_location.get(raw_key)
+            if code is None:
+                validated_location = Location.model_validate(location)
+
+                # Pitches sharing a weather lookup share a location code
+                key = weather_location_key(validated_location)
+                if key not in codes_by_location:
+                    codes_by_location[key] = len(locations)
+                    locations.append(validated_location)
+
+                code = codes_by_raw_location[raw_key] = codes_by_location[key]
+
+            uuids.append(document["uuid"])
+            location_codes.append(code)
+            cities.append(location["city"])
+            countries.append(location["country"])
+            turf_codes.append(TURF_CODES[document["turf_type"]])
+            conditions.append(document["current_condition"])
+            rain_hours.append(document.get("current_consecutive_rain_hours", 0))
+            next_maintenance.append(document.get("next_scheduled_maintenance"))
+
+        return cls(
+            uuids=np.array(uuids, dtype=object),
+            location_codes=np.array(location_codes, dtype=np.int64),
+            locations=locations,
+            cities=np.array(cities, dtype=object),
+            countries=np.array(countries, dtype=object),
+            turf_codes=np.array(turf_codes, dtype=np.int64),
+            conditions=np.array(conditions, dtype=np.int64),
+            rain_hours=np.array(rain_hours, dtype=np.int64),
+            next_maintenance=np.array(next_maintenance, dtype="datetime64[us]"),
+        )
+
+    def take(self, rows: np.ndarray) -> "PitchColumns":
+        """
+        Select some rows of the columns.
+
+        Args:
+            rows: The indices or boolean mask of the rows to select.
+
+        Returns:
+            PitchColumns: The selected rows, sharing the same distinct locations.
+        """
+
+        return PitchColumns(
+            uuids=self.uuids[rows],
+            location_codes=self.location_codes[rows],
+            locations=self.locations,
+            cities=self.cities[rows],
+            countries=self.countries[rows],
+            turf_codes=self.turf_codes[rows],
+            conditions=self.conditions[rows],
+            rain_hours=self.rain_hours[rows],
+            next_maintenance=self.next_maintenance[rows],
+        )
+
+
+@dataclass
+class RuleChanges:
+    """
+    Rows modified by the vectorized rule engine.
+
+    Attributes:
+        rows: Index of every modified row in the evaluated columns.
+        columns: The updated values of the modified rows.
+        condition_changed: Whether the condition of each modified row changed.
+        rain_hours_changed: Whether the consecutive rain hours of each modified row changed.
+        maintenance_changed: Whether the next scheduled maintenance of each modified row changed.
+    """
+
+    rows: np.ndarray
+    columns: PitchColumns
+    condition_changed: np.ndarray
+    rain_hours_changed: np.ndarray
+    maintenance_changed: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def updates(self, checked_at: datetime) -> List[Tuple[UUID, Dict[str, Any]]]:
+        """
+        Build the partial update of every modified pitch, setting only the fields that changed.
+
+        Args:
+            checked_at: The date at which the pitches were checked.
+
+        Returns:
+            List[Tuple[UUID, Dict[str, Any]]]: The UUID of each modified pitch and the fields to set.
+        """
+
+        updates = []
+
+        for (
+            pitch_uuid,
+            condition,
+            rain_hours,
+            next_maintenance,
+            condition_changed,
+            rain_hours_changed,
+            maintenance_changed,
+        ) in zip(
+            self.columns.uuids.tolist(),
+            self.columns.conditions.tolist(),
+            self.columns.rain_hours.tolist(),
+            # NaT becomes None
+            self.columns.next_maintenance.astype(object).tolist(),
+            self.condition_changed.tolist(),
+            self.rain_hours_changed.tolist(),
+            self.maintenance_changed.tolist(),
+        ):
+            fields = {"last_checked_at": checked_at}
+            if condition_changed:
+                fields["current_condition"] = condition
+            if rain_hours_changed:
+                fields["current_consecutive_rain_hours"] = rain_hours
+            if maintenance_changed:
+                fields["next_scheduled_maintenance"] = next_maintenance
+
+            updates.append((pitch_uuid, fields))
+
+        return updates
+
+    def watched_changes(self) -> Dict[UUID, Dict[str, Any]]:
+        """
+        Get the new value of the watched fields changed on the modified pitches, as pushed to the
+        subscribers of the pitch events.
+
+        Returns:
+            Dict[UUID, Dict[str, Any]]: The changed watched fields, by UUID of the pitches that have any.
+        """
+
+        changes = {}
+
+        for (
+            pitch_uuid,
+            condition,
+            next_maintenance,
+            condition_changed,
+            maintenance_changed,
+        ) in zip(
+            self.columns.uuids.tolist(),
+            self.columns.conditions.tolist(),
+            self.columns.next_maintenance.astype(object).tolist(),
+            self.condition_changed.tolist(),
+            self.maintenance_changed.tolist(),
+        ):
+            fields = {}
+            if condition_changed:
+                fields["current_condition"] = condition
+            if maintenance_changed:
+                fields["next_scheduled_maintenance"] = (
+                    next_maintenance.isoformat()
+                    if next_maintenance is not None
+                    else None
+                )
+
+            if fields:
+                changes[pitch_uuid] = fields
+
+        return changes
+
+
+@dataclass
+class VectorizedReport:
+    """
+    Outcome and timings of the processing of the due pitches by the vectorized rule engine.
+
+    Attributes:
+        pitch_count: Number of pitches processed.
+        skipped_count: Number of due pitches left due because their weather is unknown.
+        changed_count: Number of pitches with material changes.
+        load_seconds: Time spent loading the pitches from the database.
+        rules_seconds: Time spent applying the rules.
+        write_seconds: Time spent writing the pitches to the database.
+        failures: Error message of every pitch that could not be written, by pitch UUID.
+    """
+
+    pitch_count: int = 0
+    skipped_count: int = 0
+    changed_count: int = 0
+    load_seconds: float = 0.0
+    rules_seconds: float = 0.0
+    write_seconds: float = 0.0
+    failures: Dict[UUID, str] = field(default_factory=dict)
+
+
+def apply_rules_vectorized(
+    columns: PitchColumns, is_raining_now: np.ndarray, now: datetime
+) -> RuleChanges:
+    """
+    Apply the whole chain of health and maintenance rules to all pitches at once. This is equivalent to
+    calling `apply_rules` on every pitch, with the current time fixed to `now`.
+
+    Args:
+        columns: The fields of the pitches. They are left untouched.
+        is_raining_now: Whether it is currently raining, for every pitch.
+        now: The current time.
+
+    Returns:
+        RuleChanges: The rows with material changes, and their updated values.
+    """
+
+    # Built on every call, so the rule parameters overridden in the current context are applied
+    drying_time = get_drying_time()
+    drying_hours = np.array([drying_time[turf_type] for turf_type in TURF_TYPES])
+    rain_tolerance = get_rain_tolerance()
+    rain_tolerance_hours = np.array(
+        [rain_tolerance[turf_type] for turf_type in TURF_TYPES]
+    )
+
+    now = np.datetime64(now, "us")
+    rescheduled_at = now + drying_hours[columns.turf_codes] * np.timedelta64(1, "h")
+
+    # update_weather_status
+    rain_hours = columns.rain_hours + is_raining_now
+
+    # reschedule_due_to_rain, NaT never compares greater than a date
+    next_maintenance = np.where(
+        is_raining_now & (columns.next_maintenance > now),
+        rescheduled_at,
+        columns.next_maintenance,
+    )
+
+    # apply_rain_damage
+    damaged = rain_hours >= rain_tolerance_hours[columns.turf_codes]
+    conditions = np.where(
+        damaged, np.maximum(1, columns.conditions - 2), columns.conditions
+    )
+    rain_hours = np.where(damaged, 0, rain_hours)
+
+    # schedule_regular_maintenance
+    next_maintenance = np.where(
+        np.isnat(next_maintenance) & (conditions > 2) & (conditions < 10),
+        rescheduled_at,
+        next_maintenance,
+    )
+
+    # cancel_maintenance_if_needed
+    next_maintenance = np.where(conditions <= 2, NOT_SCHEDULED, next_maintenance)
+
+    condition_changed = conditions != columns.conditions
+    rain_hours_changed = rain_hours != columns.rain_hours
+    # NaT is never equal to itself, so unscheduled maintenance is compared separately
+    maintenance_changed = (next_maintenance != columns.next_maintenance) & ~(
+        np.isnat(next_maintenance) & np.isnat(columns.next_maintenance)
+    )
+
+    rows = np.flatnonzero(condition_changed | rain_hours_changed | maintenance_changed)
+
+    changed_columns = columns.take(rows)
+    changed_columns.conditions = conditions[rows]
+    changed_columns.rain_hours = rain_hours[rows]
+    changed_columns.next_maintenance = next_maintenance[rows]
+
+    return RuleChanges(
+        rows=rows,
+        columns=changed_columns,
+        condition_changed=condition_changed[rows],
+        rain_hours_changed=rain_hours_changed[rows],
+        maintenance_changed=maintenance_changed[rows],
+    )
+
+
+async def process_due_pitches_vectorized(
+    checked_before: datetime,
+    weather_api: AsyncWeatherAPI,
+    chunk_size: int = 500,
+    record_history: bool = False,
+    events: Optional[PitchEventBroadcaster] = None,
+) -> VectorizedReport:
+    """
+    Process the due pitches with the vectorized rule engine. Only the pitches with material changes
+    are written, in bulk with only their changed fields set, the others get their last checked date
+    set with a few bulk updates.
+
+    Args:
+        checked_before: Pitches last checked at or before this date are due.
+        weather_api: An instance of the AsyncWeatherAPI to check current weather conditions.
+        chunk_size: Maximum number of pitches sent in a single bulk write.
+        record_history: Whether to record the checks in the condition history.
+        events: Broadcaster to publish the condition and schedule changes on, once written.
+
+    Returns:
+        VectorizedReport: The outcome and timings of the processing.
+    """
+
+    report = VectorizedReport()
+
+    started_at = time.perf_counter()
+    columns = PitchColumns.from_documents(
+        [
+            document
+            async for document in iter_due_pitch_documents_from_db(
+                checked_before, batch_size=chunk_size
+            )
+        ]
+    )
+    report.load_seconds = time.perf_counter() - started_at
+
+    weather_by_location = await fetch_weather_by_location(
+        columns.locations, weather_api
+    )
+
+    started_at = time.perf_counter()
+    now = clock.utcnow()
+
+    # Pitches whose weather is unknown are left due and retried next time
+    known_weather = np.array(
+        [
+            weather_location_key(location) in weather_by_location
+            for location in columns.locations
+        ],
+        dtype=bool,
+    )
+    raining = np.array(
+        [
+            weather_by_location.get(weather_location_key(location), False)
+            for location in columns.locations
+        ],
+        dtype=bool,
+    )
+    due_count = len(columns)
+    columns = columns.take(known_weather[columns.location_codes])
+
+    is_raining_now = raining[columns.location_codes]
+    changes = apply_rules_vectorized(columns, is_raining_now, now)
+    unchanged_uuids = np.delete(columns.uuids, changes.rows).tolist()
+
+    report.pitch_count = len(columns)
+    report.skipped_count = due_count - len(columns)
+    report.changed_count = len(changes)
+    report.rules_seconds = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    write_result = await bulk_set_pitch_fields_in_db(
+        changes.updates(now), chunk_size=chunk_size
+    )
+    report.failures.update(write_result.failures)
+
+    check_result = await mark_pitches_checked_in_db(unchanged_uuids, now)
+    report.failures.update(check_result.failures)
+
+    if record_history:
+        await record_history_points(
+            get_check_points(columns, changes, is_raining_now, now, report.failures),
+            chunk_size=chunk_size,
+        )
+
+    if events is not None:
+        publish_written_pitch_events(
+            events, await get_change_events(changes, now), report.failures
+        )
+
+    report.write_seconds = time.perf_counter() - started_at
+
+    return report
+
+
+def get_check_points(
+    columns: PitchColumns,
+    changes: RuleChanges,
+    is_raining_now: np.ndarray,
+    now: datetime,
+    failures: Dict[UUID, str],
+) -> List[Dict[str, Any]]:
+    """
+    Build the condition history points of the pitches checked by the vectorized rule engine.
+
+    Args:
+        columns: The fields of the checked pitches, before the rules were applied.
+        changes: The rows modified by the rules, and their updated values.
+        is_raining_now: Whether it was raining, for every pitch.
+        now: The date at which the pitches were checked.
+        failures: Error message of every pitch that could not be written, by pitch UUID. Their checks
+            are not recorded.
+
+    Returns:
+        List[Dict[str, Any]]: The points, one per written pitch.
+    """
+
+    conditions = columns.conditions.copy()
+    conditions[changes.rows] = changes.columns.conditions
+    rain_hours = columns.rain_hours.copy()
+    rain_hours[changes.rows] = changes.columns.rain_hours
+
+    return [
+        get_check_point(
+            get_point_meta(pitch_uuid, city, country, TURF_TYPES[turf_code].value),
+            now,
+            condition,
+            pitch_rain_hours,
+            raining,
+        )
+        for pitch_uuid, city, country, turf_code, condition, pitch_rain_hours, raining in zip(
+            columns.uuids.tolist(),
+            columns.cities.tolist(),
+            columns.countries.tolist(),
+            columns.turf_codes.tolist(),
+            conditions.tolist(),
+            rain_hours.tolist(),
+            is_raining_now.tolist(),
+        )
+        if pitch_uuid not in failures
+    ]
+
+
+async def get_change_events(
+    changes: RuleChanges, changed_at: datetime
+) -> List[PitchChangeEvent]:
+    """
+    Build the events of the watched fields changed by the vectorized rule engine. The columns do not
+    hold the name and location of the pitches, so they are loaded for the changed pitches only.
+
+    Args:
+        changes: The rows modified by the rules, and their updated values.
+        changed_at: The date at which the changes were written.
+
+    Returns:
+        List[PitchChangeEvent]: The events, one per pitch with changed watched fields.
+    """
+
+    watched_changes = changes.watched_changes()
+    if not watched_changes:
+        return []
+
+    documents = await get_pitch_documents_from_db(
+        {"uuid": {"$in": list(watched_changes)}}, projection=PITCH_EVENT_PROJECTION
+    )
+
+    return [
+        PitchChangeEvent(
+            pitch_uuid=document["uuid"],
+            name=document["name"],
+            city=document["location"]["city"],
+            country=document["location"]["country"],
+            turf_type=document["turf_type"],
+            changes=watched_changes[document["uuid"]],
+            changed_at=changed_at,
+        )
+        for document in documents
+    ]
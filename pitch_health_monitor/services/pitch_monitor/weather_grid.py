@@ -0,0 +1,75 @@
+import math
+import os
+from typing import Optional, Tuple
+from pitch_health_monitor.models.schemas import Location
+from pitch_health_monitor.services.weather import Coordinates, location_key
+
+# Size in degrees of the grid cells sharing a weather lookup, 0.1 being about 11 km at the equator.
+# Pitches with coordinates share the weather of the center of their cell, the others the weather of
+# their city. Set to 0 to look the weather of every pitch up by city
+WEATHER_GRID_CELL_DEGREES = float(os.getenv("WEATHER_GRID_CELL_DEGREES", "0.1"))
+
+
+def get_weather_cell(
+    location: Location, cell_degrees: float = WEATHER_GRID_CELL_DEGREES
+) -> Optional[Coordinates]:
+    """
+    Get the center of the weather grid cell containing a location.
+
+    Args:
+        location: The location of a pitch.
+        cell_degrees: Size of the grid cells, in degrees.
+
+    Returns:
+        Optional[Coordinates]: The longitude and latitude of the center of the cell, or None if the
+            location has no coordinates or the grid is disabled.
+    """
+
+    if location.coordinates is None or cell_degrees <= 0:
+        return None
+
+    longitude, latitude = location.coordinates.coordinates
+
+    return (
+        _snap_to_cell_center(longitude, cell_degrees, 180),
+        _snap_to_cell_center(latitude, cell_degrees, 90),
+    )
+
+
+def weather_location_key(
+    location: Location, cell_degrees: float = WEATHER_GRID_CELL_DEGREES
+) -> Tuple[str, str]:
+    """
+    Build the key shared by all pitches whose weather is looked up together: those in the same grid
+    cell, or in the same city for pitches without coordinates.
+
+    Args:
+        location: The location of a pitch.
+        cell_degrees: Size of the grid cells, in degrees.
+
+    Returns:
+        Tuple[str, str]: The normalized location of the weather lookup.
+    """
+
+    return location_key(
+        location.city, location.country, get_weather_cell(location, cell_degrees)
+    )
+
+
+def _snap_to_cell_center(value: float, cell_degrees: float, limit: float) -> float:
+    """
+    Snap a longitude or latitude to the center of its grid cell.
+
+    Args:
+        value: The longitude or latitude.
+        cell_degrees: Size of the grid cells, in degrees.
+        limit: Largest valid absolute value, 180 for longitudes and 90 for latitudes.
+
+    Returns:
+        float: The center of the cell, kept within the valid range and rounded so every pitch of the
+            cell gets the exact same value.
+    """
+
+    center = (math.floor(value / cell_degrees) + 0.5) * cell_degrees
+
+    return round(max(-limit, min(limit, center)), 6)
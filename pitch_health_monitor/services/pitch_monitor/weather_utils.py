@@ -1,5 +1,5 @@
 from pitch_health_monitor.models.schemas import Pitch
-from pitch_health_monitor.services.pitch_monitor.constants import RAIN_TOLERANCE
+from pitch_health_monitor.services.pitch_monitor.constants import get_rain_tolerance
 
 
 def update_weather_status(pitch: Pitch, is_raining_now: bool) -> bool:
@@ -31,7 +31,7 @@ def apply_rain_damage(pitch: Pitch) -> Pitch:
         The updated pitch object with adjusted condition due to rain damage.
     """
 
-    tolerance_hours = RAIN_TOLERANCE[pitch.turf_type]
+    tolerance_hours = get_rain_tolerance()[pitch.turf_type]
 
     if pitch.current_consecutive_rain_hours >= tolerance_hours:
         pitch.current_condition = max(1, pitch.current_condition - 2)
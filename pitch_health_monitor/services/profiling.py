@@ -0,0 +1,172 @@
+import cProfile
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+import logging
+import os
+import sys
+import threading
+from types import FrameType
+from typing import Deque, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KINDS = ("cprofile", "sampling")
+
+
+class CycleProfiler:
+    """
+    Profile the next processing cycles on demand, dumping one profile file per cycle.
+
+    Profiles are either deterministic cProfile dumps, to open with `pstats` or snakeviz, or sampled
+    stacks in the folded format of flame graph tools, which costs much less on large cycles.
+    """
+
+    def __init__(self, directory: str, sampling_interval_seconds: float = 0.005):
+        """
+        Initialize the CycleProfiler.
+
+        Args:
+            directory (str): Directory the profiles are written to.
+            sampling_interval_seconds (float): Number of seconds between two samples of sampling profiles.
+        """
+        self.directory = directory
+        self.sampling_interval_seconds = sampling_interval_seconds
+        self._pending: Deque[str] = deque()
+
+    @property
+    def pending_cycles(self) -> int:
+        """
+        Number of coming cycles that will be profiled.
+        """
+        return len(self._pending)
+
+    def request(self, cycles: int = 1, kind: str = "cprofile") -> None:
+        """
+        Profile the next cycles.
+
+        Args:
+            cycles (int): Number of cycles to profile.
+            kind (str): Either "cprofile" or "sampling".
+
+        Raises:
+            ValueError: If the kind of profile is unknown.
+        """
+
+        if kind not in PROFILE_KINDS:
+            raise ValueError(f"Unknown profile kind: {kind}")
+
+        self._pending.extend([kind] * cycles)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[Optional[str]]:
+        """
+        Profile the block if a profile was requested, writing the profile when it exits.
+
+        Args:
+            name (str): Name of the cycle, used as prefix of the profile file.
+
+        Returns:
+            Iterator[Optional[str]]: The path of the profile file, or None if the block is not profiled.
+        """
+
+        if not self._pending:
+            yield None
+            return
+
+        kind = self._pending.popleft()
+
+        os.makedirs(self.directory, exist_ok=True)
+        extension = "prof" if kind == "cprofile" else "folded"
+        path = os.path.join(
+            self.directory, f"{name}-{datetime.utcnow():%Y%m%dT%H%M%S%f}.{extension}"
+        )
+
+        if kind == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield path
+            finally:
+                profiler.disable()
+                profiler.dump_stats(path)
+
+        else:
+            sampler = _StackSampler(
+                threading.get_ident(), self.sampling_interval_seconds
+            )
+            sampler.start()
+            try:
+                yield path
+            finally:
+                sampler.stop()
+                sampler.dump(path)
+
+        logger.info("Wrote %s profile of %s to %s", kind, name, path)
+
+
+class _StackSampler:
+    """
+    Thread sampling the stack of another thread at a fixed interval, counting identical stacks.
+    """
+
+    def __init__(self, thread_id: int, interval_seconds: float):
+        """
+        Initialize the _StackSampler.
+
+        Args:
+            thread_id (int): Identifier of the sampled thread.
+            interval_seconds (float): Number of seconds between two samples.
+        """
+        self.thread_id = thread_id
+        self.interval_seconds = interval_seconds
+        self.stacks: Dict[str, int] = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def dump(self, path: str) -> None:
+        """
+        Write the sampled stacks in the folded format, one `frame;frame;... count` line per stack.
+
+        Args:
+            path (str): The file to write.
+        """
+
+        with open(path, "w") as profile_file:
+            for stack, count in sorted(self.stacks.items()):
+                profile_file.write(f"{stack} {count}\n")
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_fold_stack(frame)] += 1
+
+
+def _fold_stack(frame: Optional[FrameType]) -> str:
+    """
+    Fold a stack into a single line, from the outermost frame to the innermost one.
+
+    Args:
+        frame (Optional[FrameType]): The innermost frame.
+
+    Returns:
+        str: The frames, separated by semicolons.
+    """
+
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+
+    return ";".join(reversed(frames))
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Rate limiter letting calls through at a steady rate, with bursts of up to `capacity` calls.
+
+    The bucket can also be paused, e.g. when the provider asks to slow down, in which case every caller
+    waits until the pause is over.
+    """
+
+    def __init__(
+        self,
+        rate_per_second: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the TokenBucket, full.
+
+        Args:
+            rate_per_second (float): Number of tokens added per second.
+            capacity (float): Maximum number of tokens held by the bucket.
+            clock (Callable[[], float]): Function returning the current time in seconds.
+        """
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock = None
+
+        self.throttled = 0
+
+    async def acquire(self) -> None:
+        """
+        Take a token, waiting until one is available.
+        """
+
+        # Created on first use so that it belongs to the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # Callers are served one at a time, in order
+        async with self._lock:
+            wait_seconds = self._take()
+
+            if wait_seconds > 0:
+                self.throttled += 1
+
+            while wait_seconds > 0:
+                await asyncio.sleep(wait_seconds)
+                wait_seconds = self._take()
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop letting calls through for the given duration, and empty the bucket so calls resume at the
+        steady rate afterwards.
+
+        Args:
+            seconds (float): Duration of the pause.
+        """
+
+        self._refill()
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+        # No tokens accumulate during the pause
+        self._updated_at = max(self._updated_at, self._paused_until)
+
+    def _take(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the number of seconds to wait before trying again.
+        """
+
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        return (1 - self._tokens) / self.rate_per_second
+
+    def _refill(self) -> None:
+        """
+        Add the tokens accumulated since the last refill.
+        """
+
+        now = self._clock()
+        if now <= self._updated_at:
+            return
+
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated_at) * self.rate_per_second,
+        )
+        self._updated_at = now
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker stopping calls to a failing provider.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are rejected. Once
+    `reset_timeout_seconds` have passed, a single trial call is let through: the circuit closes again
+    if it succeeds, and stays open for another period otherwise.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the CircuitBreaker, closed.
+
+        Args:
+            failure_threshold (int): Number of consecutive failures opening the circuit.
+            reset_timeout_seconds (float): Number of seconds the circuit stays open before a trial call.
+            clock (Callable[[], float]): Function returning the current time in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_progress = False
+
+        self.state = self.CLOSED
+
+    def allow(self) -> bool:
+        """
+        Check if a call may go through, reserving the trial call if the circuit can be half-opened.
+
+        Returns:
+            bool: True if the call may go through, False if it must be short-circuited.
+        """
+
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN:
+            if self._clock() - self._opened_at < self.reset_timeout_seconds:
+                return False
+            self.state = self.HALF_OPEN
+
+        if self._trial_in_progress:
+            return False
+
+        self._trial_in_progress = True
+        return True
+
+    def record_success(self) -> None:
+        """
+        Record a successful call, closing the circuit.
+        """
+
+        if self.state != self.CLOSED:
+            logger.info("Circuit breaker closed")
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._trial_in_progress = False
+
+    def release(self) -> None:
+        """
+        Give up a call let through without recording its outcome, e.g. because it was cancelled.
+        """
+
+        self._trial_in_progress = False
+
+    def record_failure(self) -> None:
+        """
+        Record a failed call, opening the circuit if the trial call failed or too many calls failed in a
+        row.
+        """
+
+        self._failures += 1
+        self._trial_in_progress = False
+
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(
+                    "Circuit breaker opened after %d failures", self._failures
+                )
+
+            self.state = self.OPEN
+            self._opened_at = self._clock()
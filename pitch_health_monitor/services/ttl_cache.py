@@ -0,0 +1,135 @@
+from collections import OrderedDict
+import time
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+
+class TTLCache:
+    """
+    In-memory cache whose entries expire after a fixed time-to-live and that evicts the least recently
+    used entries once it reaches its maximum size.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.time,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        """
+        Initialize the TTLCache.
+
+        Args:
+            ttl_seconds (float): Number of seconds an entry stays valid after being stored.
+            max_entries (int): Maximum number of entries kept before evicting the least recently used.
+            clock (Callable[[], float]): Function returning the current time in seconds.
+            on_evict (Optional[Callable[[Hashable, Any], None]]): Function called with the key and value
+                of every entry dropped because it expired or was the least recently used.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Retrieve a valid entry from the cache, marking it as recently used.
+
+        Args:
+            key (Hashable): The key of the entry.
+            default (Any): Value returned if the key is missing or expired.
+
+        Returns:
+            Any: The cached value, or the default if there is no valid entry.
+        """
+
+        entry = self._entries.get(key)
+
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._entries[key]
+                if self._on_evict is not None:
+                    self._on_evict(key, entry[1])
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return entry[1]
+
+    def set(
+        self, key: Hashable, value: Any, expires_at: Optional[float] = None
+    ) -> None:
+        """
+        Store an entry in the cache, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (Hashable): The key of the entry.
+            value (Any): The value to store.
+            expires_at (Optional[float]): Time at which the entry expires. Defaults to now plus the TTL.
+        """
+
+        if expires_at is None:
+            expires_at = self._clock() + self.ttl_seconds
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            evicted_key, (_, evicted_value) = self._entries.popitem(last=False)
+            self.evictions += 1
+            if self._on_evict is not None:
+                self._on_evict(evicted_key, evicted_value)
+
+    def delete(self, key: Hashable) -> None:
+        """
+        Remove an entry from the cache, if present.
+
+        Args:
+            key (Hashable): The key of the entry.
+        """
+
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all entries from the cache.
+        """
+
+        self._entries.clear()
+
+    def items(self) -> Iterator[Tuple[Hashable, Any, float]]:
+        """
+        Iterate over the valid entries, from least to most recently used.
+
+        Returns:
+            Iterator[Tuple[Hashable, Any, float]]: Tuples of key, value and expiration time.
+        """
+
+        now = self._clock()
+
+        for key, (expires_at, value) in list(self._entries.items()):
+            if expires_at > now:
+                yield key, value, expires_at
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters describing how the cache has been used.
+        """
+
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
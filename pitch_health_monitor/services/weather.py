@@ -1,6 +1,83 @@
 from abc import ABC, abstractmethod
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
 import requests
 
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.metrics import (
+    WEATHER_LOOKUP_SECONDS,
+    WEATHER_REQUEST_SECONDS,
+)
+from pitch_health_monitor.services.resilience import CircuitBreaker, TokenBucket
+from pitch_health_monitor.services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+OPEN_WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+OPEN_WEATHER_FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+
+# The OpenWeather forecast is given in steps of 3 hours
+OPEN_WEATHER_FORECAST_STEP_HOURS = 3
+
+# Longitude and latitude, in the GeoJSON order
+Coordinates = Tuple[float, float]
+
+
+class WeatherUnavailableError(Exception):
+    """
+    Raised when the weather provider is not called because its circuit breaker is open.
+    """
+
+
+@dataclass
+class HourlyForecast:
+    """
+    Whether it is forecast to rain at a location, hour by hour.
+
+    Attributes:
+        starts_at: Start of the first forecast hour, in UTC.
+        raining: Whether it is forecast to rain, for each hour from `starts_at`.
+        fetched_at: When the forecast was fetched, in UTC.
+    """
+
+    starts_at: datetime
+    raining: List[bool]
+    fetched_at: datetime
+
+    @property
+    def ends_at(self) -> datetime:
+        """
+        End of the last forecast hour.
+        """
+        return self.starts_at + timedelta(hours=len(self.raining))
+
+    def is_raining_at(self, at: datetime) -> Optional[bool]:
+        """
+        Check if it is forecast to rain at the given time.
+
+        Args:
+            at (datetime): The time, in UTC.
+
+        Returns:
+            Optional[bool]: Whether it is forecast to rain, or None if the time is not covered.
+        """
+
+        if at < self.starts_at or at >= self.ends_at:
+            return None
+
+        return self.raining[int((at - self.starts_at) / timedelta(hours=1))]
+
 
 class WeatherAPI(ABC):
     """
@@ -8,19 +85,46 @@ class WeatherAPI(ABC):
     """
 
     @abstractmethod
-    def is_raining_now(self, city: str, country: str) -> bool:
+    def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
         """
         Check if it is currently raining in the specified city and country.
 
         Args:
             city (str): The name of the city.
             country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
 
         Returns:
             bool: True if it is currently raining, False otherwise.
         """
         pass
 
+    def get_hourly_forecast(
+        self,
+        city: str,
+        country: str,
+        hours: int = 24,
+        coordinates: Optional[Coordinates] = None,
+    ) -> HourlyForecast:
+        """
+        Get whether it is forecast to rain in the specified city and country, hour by hour.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            hours (int): Number of hours to forecast, starting with the current one.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            HourlyForecast: The forecast.
+
+        Raises:
+            NotImplementedError: If the weather API does not provide forecasts.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not provide forecasts")
+
 
 class OpenWeatherAPI(WeatherAPI):
     """
@@ -36,40 +140,1130 @@ class OpenWeatherAPI(WeatherAPI):
         """
         self.api_key = api_key
 
-    def _fetch_weather_data(self, city: str, country: str) -> dict:
+    def _fetch_weather_data(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> dict:
         """
         Fetch weather data from the OpenWeatherAPI.
 
         Args:
             city (str): The name of the city.
             country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
 
         Returns:
             dict: Weather data JSON response.
         """
 
-        api_url = f"https://api.openweathermap.org/data/2.5/weather?q={city},{country}&appid={self.api_key}"
-        response = requests.get(api_url)
+        params = {**_location_params(city, country, coordinates), "appid": self.api_key}
+        response = requests.get(OPEN_WEATHER_URL, params=params)
         response.raise_for_status()
 
         return response.json()
 
-    def is_raining_now(self, city: str, country: str) -> bool:
+    def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        """
+        Check if it is currently raining in the specified city and country using OpenWeatherAPI.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            bool: True if it is currently raining, False otherwise.
+        """
+
+        weather_data = self._fetch_weather_data(city, country, coordinates)
+
+        return _is_raining(weather_data)
+
+    def get_hourly_forecast(
+        self,
+        city: str,
+        country: str,
+        hours: int = 24,
+        coordinates: Optional[Coordinates] = None,
+    ) -> HourlyForecast:
+        """
+        Get whether it is forecast to rain in the specified city and country, hour by hour, using the
+        3-hour forecast of OpenWeatherAPI.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            hours (int): Number of hours to forecast, starting with the current one.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            HourlyForecast: The forecast.
+        """
+
+        params = {
+            **_location_params(city, country, coordinates),
+            "appid": self.api_key,
+            "cnt": _count_forecast_steps(hours),
+        }
+        response = requests.get(OPEN_WEATHER_FORECAST_URL, params=params)
+        response.raise_for_status()
+
+        return _parse_hourly_forecast(response.json(), hours, datetime.utcnow())
+
+
+class AsyncWeatherAPI(ABC):
+    """
+    Abstract base class for weather APIs that can be awaited without blocking the event loop.
+    """
+
+    @abstractmethod
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        """
+        Check if it is currently raining in the specified city and country.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            bool: True if it is currently raining, False otherwise.
+        """
+        pass
+
+    async def get_hourly_forecast(
+        self,
+        city: str,
+        country: str,
+        hours: int = 24,
+        coordinates: Optional[Coordinates] = None,
+    ) -> HourlyForecast:
+        """
+        Get whether it is forecast to rain in the specified city and country, hour by hour.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            hours (int): Number of hours to forecast, starting with the current one.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            HourlyForecast: The forecast.
+
+        Raises:
+            NotImplementedError: If the weather API does not provide forecasts.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not provide forecasts")
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters of the weather API, along with those of the weather APIs it wraps.
+        """
+        return {}
+
+    async def aclose(self) -> None:
+        """
+        Release any resources (e.g. pooled connections) held by the weather API.
+        """
+        pass
+
+    async def __aenter__(self) -> "AsyncWeatherAPI":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+class AsyncOpenWeatherAPI(AsyncWeatherAPI):
+    """
+    Asynchronous implementation of a weather API using OpenWeatherMap.
+
+    A single pooled HTTP client with keep-alive connections is shared by all calls, and the number of
+    in-flight requests is capped by a semaphore so a large fleet does not flood the provider.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        max_concurrency: int = 20,
+        timeout_seconds: float = 10.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Initialize the AsyncOpenWeatherAPI with the provided API key.
+
+        Args:
+            api_key (str): The API key to access the OpenWeatherAPI.
+            max_concurrency (int): Maximum number of requests in flight at the same time.
+            timeout_seconds (float): Timeout applied to each request.
+            client (Optional[httpx.AsyncClient]): Client to use instead of creating a pooled one.
+        """
+        self.api_key = api_key
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+
+    async def _fetch_weather_data(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> dict:
+        """
+        Fetch weather data from the OpenWeatherAPI.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            dict: Weather data JSON response.
+        """
+
+        params = {**_location_params(city, country, coordinates), "appid": self.api_key}
+
+        return await self._request(OPEN_WEATHER_URL, params, "weather")
+
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
         """
         Check if it is currently raining in the specified city and country using OpenWeatherAPI.
 
         Args:
             city (str): The name of the city.
             country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            bool: True if it is currently raining, False otherwise.
+        """
+
+        weather_data = await self._fetch_weather_data(city, country, coordinates)
+
+        return _is_raining(weather_data)
+
+    async def get_hourly_forecast(
+        self,
+        city: str,
+        country: str,
+        hours: int = 24,
+        coordinates: Optional[Coordinates] = None,
+    ) -> HourlyForecast:
+        """
+        Get whether it is forecast to rain in the specified city and country, hour by hour, using the
+        3-hour forecast of OpenWeatherAPI.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            hours (int): Number of hours to forecast, starting with the current one.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            HourlyForecast: The forecast.
+        """
+
+        params = {
+            **_location_params(city, country, coordinates),
+            "appid": self.api_key,
+            "cnt": _count_forecast_steps(hours),
+        }
+
+        forecast_data = await self._request(
+            OPEN_WEATHER_FORECAST_URL, params, "forecast"
+        )
+
+        return _parse_hourly_forecast(forecast_data, hours, datetime.utcnow())
+
+    async def _request(self, url: str, params: Dict[str, Any], endpoint: str) -> dict:
+        """
+        Send a request to OpenWeatherAPI once a slot is free, recording its duration.
+
+        Args:
+            url (str): The URL of the endpoint.
+            params (Dict[str, Any]): The query parameters.
+            endpoint (str): Name of the endpoint in the metrics.
+
+        Returns:
+            dict: The JSON response.
+
+        Raises:
+            httpx.HTTPError: If the request fails or the response is an error.
+        """
+
+        async with self._semaphore:
+            started_at = time.perf_counter()
+            status = "error"
+            try:
+                response = await self._client.get(url, params=params)
+                status = str(response.status_code)
+            finally:
+                WEATHER_REQUEST_SECONDS.observe(
+                    time.perf_counter() - started_at, endpoint=endpoint, status=status
+                )
+
+        response.raise_for_status()
+
+        return response.json()
+
+    async def aclose(self) -> None:
+        """
+        Close the pooled HTTP client if it was created by this instance.
+        """
+
+        if self._owns_client:
+            await self._client.aclose()
+
+
+class CoalescingWeatherAPI(AsyncWeatherAPI):
+    """
+    Weather API wrapper that fetches each distinct location only once.
+
+    Calls for a location that is already being fetched wait on the same in-flight request, and the
+    result is then shared with every later caller. A failed lookup is raised to the callers waiting on
+    it and then forgotten, so a later caller retries it. Instances are meant to live for a single
+    processing cycle, so the shared results never outlive it.
+    """
+
+    def __init__(self, weather_api: AsyncWeatherAPI):
+        """
+        Initialize the CoalescingWeatherAPI around another weather API.
+
+        Args:
+            weather_api (AsyncWeatherAPI): The weather API used to perform the actual lookups.
+        """
+        self._weather_api = weather_api
+        self._lookups: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    @property
+    def location_count(self) -> int:
+        """
+        Number of distinct locations looked up so far, failed lookups left out.
+        """
+        return len(self._lookups)
+
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        """
+        Check if it is currently raining in the specified city and country, sharing the lookup with
+        every other caller asking for the same location.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            bool: True if it is currently raining, False otherwise.
+        """
+
+        key = location_key(city, country, coordinates)
+
+        lookup = self._lookups.get(key)
+        if lookup is None:
+            lookup = asyncio.ensure_future(
+                self._weather_api.is_raining_now(city, country, coordinates)
+            )
+            self._lookups[key] = lookup
+            lookup.add_done_callback(partial(self._forget_failed_lookup, key))
+
+        # Shield the shared lookup so a cancelled caller does not cancel it for everyone else
+        return await asyncio.shield(lookup)
+
+    def _forget_failed_lookup(
+        self, key: Tuple[str, str], lookup: asyncio.Future
+    ) -> None:
+        """
+        Forget a finished lookup if it failed, so the next caller asking for its location retries it.
+
+        Args:
+            key (Tuple[str, str]): The normalized location of the lookup.
+            lookup (asyncio.Future): The finished lookup.
+        """
+
+        failed = lookup.cancelled() or lookup.exception() is not None
+        if failed and self._lookups.get(key) is lookup:
+            del self._lookups[key]
+
+    async def get_hourly_forecast(
+        self,
+        city: str,
+        country: str,
+        hours: int = 24,
+        coordinates: Optional[Coordinates] = None,
+    ) -> HourlyForecast:
+        """
+        Get the forecast of the specified city and country from the wrapped weather API.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            hours (int): Number of hours to forecast, starting with the current one.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            HourlyForecast: The forecast.
+        """
+
+        return await self._weather_api.get_hourly_forecast(
+            city, country, hours, coordinates
+        )
+
+
+class CachedWeatherAPI(AsyncWeatherAPI):
+    """
+    Weather API wrapper that keeps recent results in a TTL cache bounded in size.
+
+    The cache can optionally be saved to and restored from a local snapshot file, so restarting the
+    service does not refetch locations whose weather is still fresh.
+    """
+
+    def __init__(
+        self,
+        weather_api: AsyncWeatherAPI,
+        ttl_seconds: float = 600,
+        max_entries: int = 10000,
+        snapshot_path: Optional[str] = None,
+    ):
+        """
+        Initialize the CachedWeatherAPI around another weather API.
+
+        Args:
+            weather_api (AsyncWeatherAPI): The weather API used on cache misses.
+            ttl_seconds (float): Number of seconds a weather result stays valid.
+            max_entries (int): Maximum number of locations kept in the cache.
+            snapshot_path (Optional[str]): File used to persist the cache between restarts.
+        """
+        self._weather_api = weather_api
+        self.cache = TTLCache(ttl_seconds, max_entries)
+        self.snapshot_path = snapshot_path
+        # A periodic save may still be writing from its thread when the final one starts
+        self._snapshot_lock = threading.Lock()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit, miss and eviction counters of the cache, along with the counters of the wrapped weather API.
+        """
+        return {**self._weather_api.stats, **self.cache.stats}
+
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        """
+        Check if it is currently raining in the specified city and country, using the cached result
+        if it is still valid.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
 
         Returns:
             bool: True if it is currently raining, False otherwise.
         """
 
-        weather_data = self._fetch_weather_data(city, country)
-        weather_ids = [str(item.get("id")) for item in weather_data.get("weather", [])]
+        key = location_key(city, country, coordinates)
+        started_at = time.perf_counter()
+
+        is_raining_now = self.cache.get(key)
+        if is_raining_now is not None:
+            WEATHER_LOOKUP_SECONDS.observe(
+                time.perf_counter() - started_at, kind="current", cache="hit"
+            )
+            return is_raining_now
+
+        try:
+            is_raining_now = await self._weather_api.is_raining_now(
+                city, country, coordinates
+            )
+        finally:
+            WEATHER_LOOKUP_SECONDS.observe(
+                time.perf_counter() - started_at, kind="current", cache="miss"
+            )
+
+        self.cache.set(key, is_raining_now)
+
+        return is_raining_now
+
+    async def get_hourly_forecast(
+        self,
+        city: str,
+        country: str,
+        hours: int = 24,
+        coordinates: Optional[Coordinates] = None,
+    ) -> HourlyForecast:
+        """
+        Get the forecast of the specified city and country from the wrapped weather API.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            hours (int): Number of hours to forecast, starting with the current one.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            HourlyForecast: The forecast.
+        """
+
+        return await self._weather_api.get_hourly_forecast(
+            city, country, hours, coordinates
+        )
+
+    def load_snapshot(self) -> int:
+        """
+        Restore the still valid entries from the snapshot file, if configured and present.
+
+        Returns:
+            int: The number of entries restored.
+        """
+
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return 0
+
+        try:
+            with open(self.snapshot_path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (OSError, ValueError) as e:
+            logger.warning(
+                "Ignoring unreadable weather cache snapshot %s: %s",
+                self.snapshot_path,
+                e,
+            )
+            return 0
+
+        for city, country, is_raining_now, expires_at in snapshot.get("entries", []):
+            self.cache.set((city, country), is_raining_now, expires_at=expires_at)
+
+        return len(list(self.cache.items()))
+
+    def save_snapshot(self) -> None:
+        """
+        Write the valid cache entries to the snapshot file, if configured.
+        """
+
+        if self.snapshot_path:
+            self._write_snapshot(self._get_snapshot_entries())
+
+    async def save_snapshot_in_thread(self) -> None:
+        """
+        Write the valid cache entries to the snapshot file, if configured, without blocking the event
+        loop on the file write.
+        """
+
+        if self.snapshot_path:
+            # The entries are copied here, as the cache keeps changing while the file is written
+            await asyncio.to_thread(self._write_snapshot, self._get_snapshot_entries())
+
+    def _get_snapshot_entries(self) -> List[List[Any]]:
+        """
+        Get the valid cache entries, as saved in the snapshot file.
+
+        Returns:
+            List[List[Any]]: The city, country, weather and expiry time of every entry.
+        """
+
+        return [
+            [city, country, is_raining_now, expires_at]
+            for (city, country), is_raining_now, expires_at in self.cache.items()
+        ]
+
+    def _write_snapshot(self, entries: List[List[Any]]) -> None:
+        """
+        Replace the snapshot file with the given entries.
+
+        Args:
+            entries: The city, country, weather and expiry time of every entry.
+        """
+
+        # Write to a temporary file first so a crash never leaves a truncated snapshot behind
+        temporary_path = f"{self.snapshot_path}.tmp"
+        with self._snapshot_lock:
+            with open(temporary_path, "w") as snapshot_file:
+                json.dump({"entries": entries}, snapshot_file)
+
+            os.replace(temporary_path, self.snapshot_path)
+
+    async def aclose(self) -> None:
+        """
+        Save the cache snapshot, if configured, and close the wrapped weather API.
+        """
+
+        self.save_snapshot()
+
+        await self._weather_api.aclose()
+
+
+class ForecastWeatherAPI(AsyncWeatherAPI):
+    """
+    Weather API wrapper answering from the hourly forecast of each location, fetched once and only
+    fetched again when it goes stale, instead of polling the current weather on every check.
+    """
+
+    def __init__(
+        self,
+        weather_api: AsyncWeatherAPI,
+        hours: int = 24,
+        max_age_seconds: float = 21600,
+        max_entries: int = 10000,
+    ):
+        """
+        Initialize the ForecastWeatherAPI around another weather API.
+
+        Args:
+            weather_api (AsyncWeatherAPI): The weather API providing the forecasts.
+            hours (int): Number of hours covered by each forecast.
+            max_age_seconds (float): Number of seconds after which a forecast is stale.
+            max_entries (int): Maximum number of locations whose forecast is kept.
+        """
+        self._weather_api = weather_api
+        self.hours = hours
+        self.cache = TTLCache(max_age_seconds, max_entries)
+        self._fetches: Dict[Tuple[str, str], asyncio.Future] = {}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Hit, miss and eviction counters of the forecast cache, along with the counters of the wrapped
+        weather API.
+        """
+        return {
+            **self._weather_api.stats,
+            **{f"forecast_{name}": count for name, count in self.cache.stats.items()},
+        }
+
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        """
+        Check if it is currently raining in the specified city and country according to its forecast,
+        falling back to the current weather if the forecast does not cover the current hour.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            bool: True if it is currently raining, False otherwise.
+        """
+
+        forecast = await self.get_hourly_forecast(
+            city, country, coordinates=coordinates
+        )
+
+        is_raining_now = forecast.is_raining_at(clock.utcnow())
+        if is_raining_now is None:
+            is_raining_now = await self._weather_api.is_raining_now(
+                city, country, coordinates
+            )
+
+        return is_raining_now
+
+    async def get_hourly_forecast(
+        self,
+        city: str,
+        country: str,
+        hours: Optional[int] = None,
+        coordinates: Optional[Coordinates] = None,
+    ) -> HourlyForecast:
+        """
+        Get the forecast of the specified city and country, fetching it only if it is not cached yet,
+        is stale or does not cover the coming hour anymore. Concurrent fetches of the same location are
+        shared.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            hours (Optional[int]): Ignored, forecasts always cover the number of hours of this instance.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            HourlyForecast: The forecast.
+        """
+
+        key = location_key(city, country, coordinates)
+        started_at = time.perf_counter()
+
+        forecast = self.cache.get(key)
+        if forecast is not None and forecast.ends_at > clock.utcnow() + timedelta(
+            hours=1
+        ):
+            WEATHER_LOOKUP_SECONDS.observe(
+                time.perf_counter() - started_at, kind="forecast", cache="hit"
+            )
+            return forecast
+
+        fetch = self._fetches.get(key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(
+                self._fetch_forecast(key, city, country, coordinates)
+            )
+            self._fetches[key] = fetch
+
+        # Shield the shared fetch so a cancelled caller does not cancel it for everyone else
+        try:
+            return await asyncio.shield(fetch)
+        finally:
+            WEATHER_LOOKUP_SECONDS.observe(
+                time.perf_counter() - started_at, kind="forecast", cache="miss"
+            )
+
+    async def _fetch_forecast(
+        self,
+        key: Tuple[str, str],
+        city: str,
+        country: str,
+        coordinates: Optional[Coordinates],
+    ) -> HourlyForecast:
+        """
+        Fetch the forecast of a location and cache it.
+
+        Args:
+            key (Tuple[str, str]): The normalized location.
+            city (str): The name of the city.
+            country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            HourlyForecast: The forecast.
+        """
+
+        try:
+            forecast = await self._weather_api.get_hourly_forecast(
+                city, country, self.hours, coordinates
+            )
+
+            # The forecast may be an older one returned while the provider is unavailable
+            age_seconds = (datetime.utcnow() - forecast.fetched_at).total_seconds()
+            self.cache.set(
+                key,
+                forecast,
+                expires_at=time.time() + self.cache.ttl_seconds - age_seconds,
+            )
+
+            return forecast
+
+        finally:
+            del self._fetches[key]
+
+    async def aclose(self) -> None:
+        """
+        Close the wrapped weather API.
+        """
+
+        await self._weather_api.aclose()
+
+
+class ResilientWeatherAPI(AsyncWeatherAPI):
+    """
+    Weather API wrapper protecting the provider and the service from each other.
+
+    Calls are rate limited by a token bucket sized to the API plan, transient failures are retried with
+    jittered exponential backoff, and a circuit breaker stops calling the provider after repeated
+    failures. Meanwhile, the last known weather of each location is returned instead.
+    """
+
+    def __init__(
+        self,
+        weather_api: AsyncWeatherAPI,
+        rate_per_second: float = 1.0,
+        burst: int = 60,
+        max_retries: int = 3,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 30,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 60,
+        fallback_max_age_seconds: float = 10800,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the ResilientWeatherAPI around another weather API.
+
+        Args:
+            weather_api (AsyncWeatherAPI): The weather API calling the provider.
+            rate_per_second (float): Sustained number of calls per second allowed by the API plan.
+            burst (int): Number of calls that can be made at once after a quiet period.
+            max_retries (int): Maximum number of retries of a call failing with a transient error.
+            backoff_base_seconds (float): Maximum delay before the first retry, doubled at each retry.
+            backoff_max_seconds (float): Upper bound of the delay between retries.
+            failure_threshold (int): Number of consecutive failures opening the circuit breaker.
+            reset_timeout_seconds (float): Number of seconds the circuit stays open before a trial call.
+            fallback_max_age_seconds (float): Number of seconds the last known weather can be used for.
+            max_entries (int): Maximum number of locations whose last known weather is kept.
+            clock (Callable[[], float]): Function returning the current time in seconds, shared by the
+                rate limiter, the circuit breaker and the last known weather.
+        """
+        self._weather_api = weather_api
+        self.rate_limiter = TokenBucket(rate_per_second, burst, clock)
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold, reset_timeout_seconds, clock
+        )
+        self.last_known = TTLCache(fallback_max_age_seconds, max_entries, clock)
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+        self.retried = 0
+        self.short_circuited = 0
+        self.failures = 0
+        self.fallbacks = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Number of calls throttled, retried, short-circuited, failed and answered with the last known
+        weather, along with the counters of the wrapped weather API.
+        """
+        return {
+            **self._weather_api.stats,
+            "throttled": self.rate_limiter.throttled,
+            "retried": self.retried,
+            "short_circuited": self.short_circuited,
+            "failures": self.failures,
+            "fallbacks": self.fallbacks,
+        }
+
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        """
+        Check if it is currently raining in the specified city and country, or if it was the last
+        time the provider answered, while it is unavailable.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            bool: True if it is currently raining, False otherwise.
+        """
+
+        return await self._call(
+            ("current", *location_key(city, country, coordinates)),
+            lambda: self._weather_api.is_raining_now(city, country, coordinates),
+        )
+
+    async def get_hourly_forecast(
+        self,
+        city: str,
+        country: str,
+        hours: int = 24,
+        coordinates: Optional[Coordinates] = None,
+    ) -> HourlyForecast:
+        """
+        Get the forecast of the specified city and country, or the last forecast the provider gave
+        while it is unavailable.
+
+        Args:
+            city (str): The name of the city.
+            country (str): The name of the country.
+            hours (int): Number of hours to forecast, starting with the current one.
+            coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+        Returns:
+            HourlyForecast: The forecast.
+        """
+
+        return await self._call(
+            ("forecast", *location_key(city, country, coordinates)),
+            lambda: self._weather_api.get_hourly_forecast(
+                city, country, hours, coordinates
+            ),
+        )
+
+    async def aclose(self) -> None:
+        """
+        Close the wrapped weather API.
+        """
+
+        await self._weather_api.aclose()
+
+    async def _call(self, key: Tuple[str, ...], call: Callable[[], Awaitable]) -> Any:
+        """
+        Call the provider, falling back to the last result stored under the key if the provider is
+        unavailable.
+
+        Args:
+            key (Tuple[str, ...]): The key of the last known result.
+            call (Callable[[], Awaitable]): Function making the call.
+
+        Returns:
+            Any: The result of the call, or the last known result.
+
+        Raises:
+            Exception: The error of the call, if there is no last known result or if the error is not
+                caused by the provider being unavailable.
+        """
+
+        try:
+            result = await self._call_with_retries(call)
+
+        except Exception as e:
+            if not isinstance(e, WeatherUnavailableError) and not _is_transient_error(
+                e
+            ):
+                raise
+
+            result = self.last_known.get(key)
+            if result is None:
+                raise
+
+            self.fallbacks += 1
+            return result
+
+        self.last_known.set(key, result)
+
+        return result
+
+    async def _call_with_retries(self, call: Callable[[], Awaitable]) -> Any:
+        """
+        Call the provider through the rate limiter and the circuit breaker, retrying transient errors.
+
+        Args:
+            call (Callable[[], Awaitable]): Function making the call.
+
+        Returns:
+            Any: The result of the call.
+
+        Raises:
+            WeatherUnavailableError: If the circuit breaker is open.
+            Exception: The error of the last attempt.
+        """
+
+        attempt = 0
+
+        while True:
+            if not self.circuit_breaker.allow():
+                self.short_circuited += 1
+                raise WeatherUnavailableError("The weather provider circuit is open")
+
+            await self.rate_limiter.acquire()
+
+            try:
+                result = await call()
+
+            except asyncio.CancelledError:
+                self.circuit_breaker.release()
+                raise
+
+            except Exception as e:
+                # The provider answered, only this request is wrong (e.g. unknown city)
+                if not _is_transient_error(e):
+                    self.circuit_breaker.record_success()
+                    raise
+
+                self.failures += 1
+                self.circuit_breaker.record_failure()
+
+                if attempt >= self.max_retries:
+                    raise
+
+                backoff_seconds = random.uniform(
+                    0,
+                    min(
+                        self.backoff_max_seconds,
+                        self.backoff_base_seconds * 2**attempt,
+                    ),
+                )
+
+                # Slow every caller down, not only this one, when the provider asks to
+                if _is_rate_limited(e):
+                    self.rate_limiter.pause(_get_retry_after(e) or backoff_seconds)
+
+                attempt += 1
+                self.retried += 1
+                await asyncio.sleep(backoff_seconds)
+                continue
+
+            self.circuit_breaker.record_success()
+
+            return result
+
+
+def location_key(
+    city: str, country: str, coordinates: Optional[Coordinates] = None
+) -> Tuple[str, str]:
+    """
+    Build a normalized key identifying a location, so spelling differences in case and whitespace
+    refer to the same place.
+
+    Args:
+        city (str): The name of the city.
+        country (str): The name of the country.
+        coordinates (Optional[Coordinates]): Where the weather is looked up instead of the city, if any.
+
+    Returns:
+        Tuple[str, str]: The normalized (city, country) pair, or ("geo", "<longitude>,<latitude>") when
+            the weather is looked up by coordinates.
+    """
+
+    if coordinates is not None:
+        longitude, latitude = coordinates
+        return ("geo", f"{longitude:.4f},{latitude:.4f}")
+
+    return (" ".join(city.split()).casefold(), " ".join(country.split()).casefold())
+
+
+def _location_params(
+    city: str, country: str, coordinates: Optional[Coordinates]
+) -> Dict[str, Any]:
+    """
+    Build the OpenWeatherAPI query parameters locating a weather lookup.
+
+    Args:
+        city (str): The name of the city.
+        country (str): The name of the country.
+        coordinates (Optional[Coordinates]): Where to look the weather up instead of the city.
+
+    Returns:
+        Dict[str, Any]: The `lat` and `lon` parameters if coordinates are given, the `q` parameter
+            otherwise.
+    """
+
+    if coordinates is not None:
+        longitude, latitude = coordinates
+        return {"lat": latitude, "lon": longitude}
+
+    return {"q": f"{city},{country}"}
+
+
+def _is_raining(weather_data: dict) -> bool:
+    """
+    Check if an OpenWeatherAPI response reports rain.
+
+    Args:
+        weather_data (dict): Weather data JSON response.
+
+    Returns:
+        bool: True if any of the reported weather conditions is rain, False otherwise.
+    """
+
+    weather_ids = [str(item.get("id")) for item in weather_data.get("weather", [])]
+
+    # OpenWeatherAPI use codes to indicate the current weather
+    # In this case, codes starting with 5xx means it is raining
+    # For more information: https://openweathermap.org/weather-conditions
+    return any(weather_id.startswith("5") for weather_id in weather_ids)
+
+
+def _count_forecast_steps(hours: int) -> int:
+    """
+    Count the OpenWeatherAPI forecast steps needed to cover the given number of hours.
+
+    Args:
+        hours (int): Number of hours to forecast, starting with the current one.
+
+    Returns:
+        int: The number of 3-hour steps, including the one in progress.
+    """
+
+    return math.ceil(hours / OPEN_WEATHER_FORECAST_STEP_HOURS) + 1
+
+
+def _parse_hourly_forecast(
+    forecast_data: dict, hours: int, fetched_at: datetime
+) -> HourlyForecast:
+    """
+    Expand an OpenWeatherAPI 3-hour forecast into an hourly forecast starting with the current hour.
+
+    Each step is considered to last until the next one. The hours before the first step, which is
+    always in the future, take the weather of the first step.
+
+    Args:
+        forecast_data (dict): Forecast data JSON response.
+        hours (int): Number of hours to forecast, starting with the current one.
+        fetched_at (datetime): When the forecast was fetched, in UTC.
+
+    Returns:
+        HourlyForecast: The forecast, shorter than requested if the response covers fewer hours.
+    """
+
+    starts_at = fetched_at.replace(minute=0, second=0, microsecond=0)
+
+    steps = sorted(
+        (datetime.utcfromtimestamp(step["dt"]), _is_raining(step))
+        for step in forecast_data.get("list", [])
+    )
+    if not steps:
+        return HourlyForecast(starts_at=starts_at, raining=[], fetched_at=fetched_at)
+
+    last_step_ends_at = steps[-1][0] + timedelta(hours=OPEN_WEATHER_FORECAST_STEP_HOURS)
+
+    raining = []
+    step_index = 0
+    hour = starts_at
+    while len(raining) < hours and hour < last_step_ends_at:
+        while step_index + 1 < len(steps) and steps[step_index + 1][0] <= hour:
+            step_index += 1
+
+        raining.append(steps[step_index][1])
+        hour += timedelta(hours=1)
+
+    return HourlyForecast(starts_at=starts_at, raining=raining, fetched_at=fetched_at)
+
+
+def _is_transient_error(error: Exception) -> bool:
+    """
+    Check if an error is caused by the weather provider being unavailable or overloaded, rather than by
+    the request itself.
+
+    Args:
+        error (Exception): The error raised by a call.
+
+    Returns:
+        bool: True for connection errors, timeouts, rate limiting and server errors, False otherwise.
+    """
+
+    if isinstance(error, httpx.TransportError):
+        return True
+
+    if isinstance(error, httpx.HTTPStatusError):
+        return _is_rate_limited(error) or error.response.status_code >= 500
+
+    return False
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """
+    Check if an error is a rate limiting response of the weather provider.
+
+    Args:
+        error (Exception): The error raised by a call.
+
+    Returns:
+        bool: True if the provider answered with 429 Too Many Requests, False otherwise.
+    """
+
+    return (
+        isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429
+    )
+
+
+def _get_retry_after(error: httpx.HTTPStatusError) -> Optional[float]:
+    """
+    Get the delay requested by the weather provider in the Retry-After header of a response.
+
+    Args:
+        error (httpx.HTTPStatusError): The error raised by a call.
+
+    Returns:
+        Optional[float]: The delay in seconds, or None if the header is missing or not a number.
+    """
 
-        # OpenWeatherAPI use codes to indicate the current weather
-        # In this case, codes starting with 5xx means it is raining
-        # For more information: https://openweathermap.org/weather-conditions
-        return any(weather_id.startswith("5") for weather_id in weather_ids)
+    try:
+        return float(error.response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
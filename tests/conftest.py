@@ -0,0 +1,11 @@
+import pytest
+from benchmarks.load_test import use_in_process_database
+
+
+@pytest.fixture
+def database() -> None:
+    """
+    Point the database methods at a fresh in-process database.
+    """
+
+    use_in_process_database()
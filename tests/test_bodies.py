@@ -0,0 +1,21 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+import pytest
+from pitch_health_monitor.models.bodies import TurfReplacementRequest
+
+
+@pytest.mark.parametrize(
+    "replacement_date",
+    [
+        datetime(2030, 5, 1, 12),
+        datetime(2030, 5, 1, 12, tzinfo=timezone.utc),
+        datetime(2030, 5, 1, 14, tzinfo=timezone(timedelta(hours=2))),
+    ],
+)
+def test_replacement_date_is_naive_utc(replacement_date: datetime):
+    request = TurfReplacementRequest(uuid=uuid4(), replacement_date=replacement_date)
+
+    assert request.replacement_date == datetime(2030, 5, 1, 12)
+
+    # Comparable with the naive UTC dates of the database
+    assert request.replacement_date > datetime.utcnow()
@@ -0,0 +1,192 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+from uuid import UUID, uuid4
+import httpx
+from pitch_health_monitor.database import db_methods
+from pitch_health_monitor.main import app
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+
+# Whole seconds, as the database keeps dates to the millisecond
+NOW = datetime.utcnow().replace(microsecond=0)
+
+KAISERSLAUTERN = {"city": "Kaiserslautern", "country": "Germany"}
+
+
+def create_pitch(
+    name: str,
+    condition: int = 8,
+    next_scheduled_maintenance: Optional[datetime] = None,
+    replacement_date: Optional[datetime] = None,
+) -> Pitch:
+    pitch = Pitch(
+        uuid=uuid4(),
+        name=name,
+        location=Location(**KAISERSLAUTERN),
+        turf_type=TurfType.natural,
+        current_condition=condition,
+        last_checked_at=NOW,
+        next_scheduled_maintenance=next_scheduled_maintenance,
+        replacement_date=replacement_date,
+    )
+    db_methods.create_pitches_in_db([pitch])
+
+    return pitch
+
+
+def send(method: str, path: str, body: Any) -> List[dict]:
+    async def run() -> httpx.Response:
+        # The lifespan is not run, so no processor is started
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await client.request(method, path, json=body)
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+
+    return response.json()
+
+
+def get_stored_pitch(pitch_uuid: UUID) -> Pitch:
+    return db_methods.get_pitch_from_db(pitch_uuid)
+
+
+def test_bulk_create_reports_each_pitch_in_request_order(database):
+    create_pitch("Fritz-Walter-Stadion")
+    # Makes the creation of a pitch with a taken name fail
+    db_methods.pitches_collection.create_index("name", unique=True)
+
+    results = send(
+        "POST",
+        "/pitches/bulk",
+        [
+            {"name": name, "location": KAISERSLAUTERN, "turf_type": "natural"}
+            for name in ["Betzenberg", "Fritz-Walter-Stadion", "Erbsenberg"]
+        ],
+    )
+
+    assert [result["status_code"] for result in results] == [200, 500, 200]
+    assert results[1]["detail"] == "Failed to create new pitch"
+    assert get_stored_pitch(UUID(results[0]["uuid"])).name == "Betzenberg"
+    assert db_methods.pitches_collection.count_documents({}) == 3
+
+
+def test_bulk_update_reports_each_pitch_in_request_order(database):
+    renamed, conflicting, unchanged = [
+        create_pitch(name) for name in ["Betzenberg", "Erbsenberg", "Waldstadion"]
+    ]
+    db_methods.pitches_collection.create_index("name", unique=True)
+    missing_uuid = str(uuid4())
+
+    results = send(
+        "PUT",
+        "/pitches/bulk",
+        [
+            {"uuid": str(renamed.uuid), "current_condition": 5},
+            {"uuid": missing_uuid, "current_condition": 5},
+            {"uuid": str(renamed.uuid), "current_condition": 4},
+            {"uuid": str(unchanged.uuid)},
+            {"uuid": str(conflicting.uuid), "name": "Betzenberg"},
+        ],
+    )
+
+    assert [(result["uuid"], result["status_code"]) for result in results] == [
+        (str(renamed.uuid), 200),
+        (missing_uuid, 404),
+        (str(renamed.uuid), 400),
+        (str(unchanged.uuid), 400),
+        (str(conflicting.uuid), 500),
+    ]
+    assert results[2]["detail"] == "Duplicate pitch in request"
+    assert results[3]["detail"] == "Nothing to update"
+
+    # Only the first request of a pitch is applied, and the failed one is left as it was
+    assert get_stored_pitch(renamed.uuid).current_condition == 5
+    assert get_stored_pitch(conflicting.uuid).name == "Erbsenberg"
+
+
+def test_bulk_turf_replacement_reports_each_pitch_in_request_order(database):
+    # Distinct past dates, so the replacement dates can be made unique
+    scheduled, past, conflicting = [
+        create_pitch(name, replacement_date=NOW - timedelta(days=index + 1))
+        for index, name in enumerate(["Betzenberg", "Erbsenberg", "Waldstadion"])
+    ]
+    db_methods.pitches_collection.create_index("replacement_date", unique=True)
+    replacement_date = NOW + timedelta(days=30)
+    missing_uuid = str(uuid4())
+
+    results = send(
+        "POST",
+        "/pitches/bulk/schedule-turf-replacement",
+        [
+            {"uuid": str(scheduled.uuid), "replacement_date": str(replacement_date)},
+            {"uuid": missing_uuid, "replacement_date": str(replacement_date)},
+            {"uuid": str(scheduled.uuid), "replacement_date": str(replacement_date)},
+            {"uuid": str(past.uuid), "replacement_date": str(NOW - timedelta(days=1))},
+            {
+                "uuid": str(conflicting.uuid),
+                "replacement_date": str(replacement_date),
+            },
+        ],
+    )
+
+    assert [(result["uuid"], result["status_code"]) for result in results] == [
+        (str(scheduled.uuid), 200),
+        (missing_uuid, 404),
+        (str(scheduled.uuid), 400),
+        (str(past.uuid), 400),
+        (str(conflicting.uuid), 500),
+    ]
+    assert results[3]["detail"] == "Replacement date must be in the future"
+
+    assert get_stored_pitch(scheduled.uuid).replacement_date == replacement_date
+    assert get_stored_pitch(conflicting.uuid).replacement_date == (
+        conflicting.replacement_date
+    )
+
+
+def test_bulk_maintenance_reports_each_pitch_in_request_order(database):
+    due = NOW - timedelta(hours=1)
+    maintained = create_pitch("Betzenberg", 6, next_scheduled_maintenance=due)
+    conflicting = create_pitch("Erbsenberg", 7, next_scheduled_maintenance=due)
+    not_due = create_pitch(
+        "Waldstadion", 5, next_scheduled_maintenance=NOW + timedelta(days=1)
+    )
+    unscheduled = create_pitch("Bieberer Berg", 4)
+    # Both due pitches are restored to 10, so only the first one written gets through
+    db_methods.pitches_collection.create_index("current_condition", unique=True)
+    missing_uuid = str(uuid4())
+
+    results = send(
+        "POST",
+        "/pitches/bulk/execute-maintenance",
+        [
+            str(maintained.uuid),
+            str(conflicting.uuid),
+            str(not_due.uuid),
+            str(unscheduled.uuid),
+            missing_uuid,
+            str(maintained.uuid),
+        ],
+    )
+
+    assert [(result["uuid"], result["status_code"]) for result in results] == [
+        (str(maintained.uuid), 200),
+        (str(conflicting.uuid), 500),
+        (str(not_due.uuid), 400),
+        (str(unscheduled.uuid), 400),
+        (missing_uuid, 404),
+        (str(maintained.uuid), 400),
+    ]
+    assert results[2]["detail"] == "No due maintenance scheduled for this pitch"
+
+    assert get_stored_pitch(maintained.uuid).current_condition == 10
+    assert get_stored_pitch(maintained.uuid).next_scheduled_maintenance is None
+    assert get_stored_pitch(conflicting.uuid).current_condition == 7
+    assert get_stored_pitch(conflicting.uuid).next_scheduled_maintenance == due
+
+    # Only the written maintenance is recorded in the history
+    assert [
+        point["pitch"]["uuid"] for point in db_methods.history_collection.find()
+    ] == [maintained.uuid]
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime
+from typing import List
+from uuid import uuid4
+import pytest
+from pitch_health_monitor.database import async_db_methods, db_methods
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+
+
+def generate_pitches(count: int) -> List[Pitch]:
+    return [
+        Pitch(
+            uuid=uuid4(),
+            name=f"Pitch {index}",
+            location=Location(city="Kaiserslautern", country="Germany"),
+            turf_type=TurfType.natural,
+            current_condition=8,
+            last_checked_at=datetime.utcnow(),
+        )
+        for index in range(count)
+    ]
+
+
+def bulk_update_sync(pitches: List[Pitch], chunk_size: int):
+    return db_methods.bulk_update_pitches_in_db(pitches, chunk_size)
+
+
+def bulk_update_async(pitches: List[Pitch], chunk_size: int):
+    return asyncio.run(async_db_methods.bulk_update_pitches_in_db(pitches, chunk_size))
+
+
+@pytest.mark.parametrize("bulk_update", [bulk_update_sync, bulk_update_async])
+def test_failing_document_is_attributed_to_its_pitch(database, bulk_update):
+    pitches = generate_pitches(5)
+    db_methods.create_pitches_in_db(pitches)
+    for pitch in pitches:
+        pitch.mark_clean()
+
+    # Makes a single update of the unordered bulk write fail
+    db_methods.pitches_collection.create_index("name", unique=True)
+
+    # The unchanged first pitch is left out, so the chunks are [1, 2] and [3, 4]
+    for pitch in pitches[1:]:
+        pitch.current_condition = 5
+    failing_pitch = pitches[3]
+    failing_pitch.name = pitches[0].name
+
+    result = bulk_update(pitches, 2)
+
+    assert list(result.failures) == [failing_pitch.uuid]
+    assert "Duplicate" in result.failures[failing_pitch.uuid]
+    assert result.matched_count == 3
+    assert result.modified_count == 3
+
+    # The failed pitch keeps its changes to be written again, the others were written
+    assert failing_pitch.dirty_fields == {"name", "current_condition"}
+    assert all(
+        not pitch.dirty_fields for pitch in pitches if pitch is not failing_pitch
+    )
+
+    conditions = {
+        document["uuid"]: document["current_condition"]
+        for document in db_methods.pitches_collection.find()
+    }
+    assert conditions == {
+        pitch.uuid: 8 if pitch in (pitches[0], failing_pitch) else 5
+        for pitch in pitches
+    }
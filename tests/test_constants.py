@@ -0,0 +1,39 @@
+import asyncio
+from pitch_health_monitor.models.schemas import TurfType
+from pitch_health_monitor.services.pitch_monitor.constants import (
+    DRYING_TIME,
+    get_drying_time,
+    get_rain_tolerance,
+    override_rule_parameters,
+)
+
+
+def test_overrides_are_merged_and_restored():
+    with override_rule_parameters(drying_time={TurfType.natural: 10}):
+        with override_rule_parameters(rain_tolerance={TurfType.natural: 1}):
+            assert get_drying_time()[TurfType.natural] == 10
+            assert get_drying_time()[TurfType.hybrid] == DRYING_TIME[TurfType.hybrid]
+            assert get_rain_tolerance()[TurfType.natural] == 1
+
+        assert get_rain_tolerance()[TurfType.natural] == 3
+
+    assert get_drying_time()[TurfType.natural] == 36
+    assert DRYING_TIME[TurfType.natural] == 36
+
+
+def test_overrides_do_not_leak_into_other_tasks():
+    async def read_drying_time(started: asyncio.Event, overridden: asyncio.Event):
+        started.set()
+        await overridden.wait()
+        return get_drying_time()[TurfType.natural]
+
+    async def run():
+        started, overridden = asyncio.Event(), asyncio.Event()
+        other_task = asyncio.create_task(read_drying_time(started, overridden))
+        await started.wait()
+
+        with override_rule_parameters(drying_time={TurfType.natural: 10}):
+            overridden.set()
+            return await other_task, get_drying_time()[TurfType.natural]
+
+    assert asyncio.run(run()) == (36, 10)
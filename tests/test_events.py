@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID, uuid4
+import httpx
+import pytest
+from pitch_health_monitor.database import db_methods
+from pitch_health_monitor.main import app
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.pitch_monitor import processor
+from pitch_health_monitor.services.pitch_monitor.events import (
+    PitchChangeBus,
+    process_pitch_changes,
+)
+
+NOW = datetime(2024, 5, 1, 12)
+
+# Natural turf needs 36 hours to dry
+DRYING_HOURS = 36
+
+
+def create_pitch(name: str, condition: int) -> Pitch:
+    pitch = Pitch(
+        uuid=uuid4(),
+        name=name,
+        location=Location(city="Kaiserslautern", country="Germany"),
+        turf_type=TurfType.natural,
+        current_condition=condition,
+        last_checked_at=NOW,
+    )
+    db_methods.create_pitches_in_db([pitch])
+
+    return pitch
+
+
+def get_next_maintenance(pitch_uuid: UUID) -> Optional[datetime]:
+    return db_methods.get_pitch_from_db(pitch_uuid).next_scheduled_maintenance
+
+
+async def wait_until(predicate, timeout_seconds: float = 2) -> None:
+    for _ in range(int(timeout_seconds / 0.01)):
+        if predicate():
+            return
+        await asyncio.sleep(0.01)
+
+    raise AssertionError("Condition not met in time")
+
+
+def test_bus_queues_a_pitch_once_in_publication_order():
+    async def run():
+        bus = PitchChangeBus()
+        first, second, third = uuid4(), uuid4(), uuid4()
+
+        for pitch_uuid in [first, second, first, third]:
+            bus.publish(pitch_uuid)
+
+        assert len(bus) == 3
+        assert await bus.next_batch(2) == [first, second]
+        assert await bus.next_batch(2) == [third]
+
+        # Waits until the next publication
+        next_batch = asyncio.ensure_future(bus.next_batch(2))
+        await asyncio.sleep(0)
+        assert not next_batch.done()
+        bus.publish(second)
+        assert await next_batch == [second]
+
+    asyncio.run(run())
+
+
+def test_api_changes_reevaluate_only_the_changed_pitch(database, monkeypatch, caplog):
+    bus = PitchChangeBus()
+    monkeypatch.setattr(processor, "pitch_change_bus", bus)
+    monkeypatch.setattr(processor, "PROCESSOR_EVENTS", "bus")
+
+    changed = create_pitch("Betzenberg", 10)
+    # Would get a maintenance scheduled if it were re-evaluated
+    untouched = create_pitch("Erbsenberg", 5)
+
+    async def run():
+        reevaluation = asyncio.create_task(process_pitch_changes(bus))
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+
+            async def send(method: str, path: str, body: Any) -> httpx.Response:
+                response = await client.request(method, path, json=body)
+                assert response.status_code == 200
+                return response
+
+            # A worn pitch gets a maintenance scheduled
+            await send("PUT", f"/pitches/{changed.uuid}", {"current_condition": 5})
+            await wait_until(lambda: get_next_maintenance(changed.uuid) is not None)
+            assert get_next_maintenance(changed.uuid) == NOW + timedelta(
+                hours=DRYING_HOURS
+            )
+
+            # A damaged pitch gets its maintenance cancelled
+            await send("PUT", f"/pitches/{changed.uuid}", {"current_condition": 2})
+            await wait_until(lambda: get_next_maintenance(changed.uuid) is None)
+
+            # A created pitch is evaluated right away too
+            response = await send(
+                "POST",
+                "/pitches/",
+                {
+                    "name": "Waldstadion",
+                    "location": {"city": "Kaiserslautern", "country": "Germany"},
+                    "turf_type": "natural",
+                    "current_condition": 4,
+                },
+            )
+            created_uuid = UUID(response.json())
+            await wait_until(lambda: get_next_maintenance(created_uuid) is not None)
+
+        reevaluation.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await reevaluation
+
+    with clock.use_clock(clock.SimulatedClock(NOW)):
+        asyncio.run(run())
+
+    assert get_next_maintenance(untouched.uuid) is None
+    # The weather is still checked when the pitches are due
+    assert db_methods.get_pitch_from_db(changed.uuid).last_checked_at == NOW
+    # Logged at the time of the clock in use
+    assert "[2024-05-01 12:00:00] Re-evaluated 1 changed pitches" in caplog.text
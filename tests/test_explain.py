@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from pitch_health_monitor.database import db_methods
+from pitch_health_monitor.database.common import summarize_explain
+
+INDEX_SCAN_PLAN = {
+    "queryPlanner": {
+        "namespace": "pitch_health.pitches",
+        "winningPlan": {
+            "stage": "PROJECTION_SIMPLE",
+            "inputStage": {
+                "stage": "FETCH",
+                "inputStage": {"stage": "IXSCAN", "indexName": "uuid_1"},
+            },
+        },
+    }
+}
+
+
+class PlanningDatabase:
+    """
+    Database answering every explain command with the same plan, recording the commands.
+    """
+
+    def __init__(self):
+        self.commands: List[Dict[str, Any]] = []
+
+    def command(self, name: str, command: Dict[str, Any], **options: Any):
+        self.commands.append({name: command, **options})
+        return INDEX_SCAN_PLAN
+
+
+def test_queries_are_planned_without_being_run(monkeypatch):
+    database = PlanningDatabase()
+    for attribute, name in [
+        ("pitches_collection", "pitches"),
+        ("leases_collection", "leases"),
+        ("history_collection", "condition_history"),
+        ("hourly_history_collection", "condition_history_hourly"),
+    ]:
+        monkeypatch.setattr(
+            db_methods, attribute, SimpleNamespace(name=name, database=database)
+        )
+
+    plans = db_methods.explain_queries()
+
+    assert {
+        "processor_lease",
+        "pitches_by_uuid",
+        "pitch_check_times",
+        "due_pitches",
+        "pitch_history",
+        "history_rollups",
+    } <= set(plans)
+    assert all(command["verbosity"] == "queryPlanner" for command in database.commands)
+
+    collections = {
+        command["explain"].get("find") or command["explain"].get("aggregate")
+        for command in database.commands
+    }
+    assert collections == {
+        "pitches",
+        "leases",
+        "condition_history",
+        "condition_history_hourly",
+    }
+
+    assert plans["pitches_by_uuid"] == {
+        "stages": ["PROJECTION_SIMPLE", "FETCH", "IXSCAN(uuid_1)"],
+        "uses_collection_scan": False,
+        "namespace": "pitch_health.pitches",
+    }
+
+
+def test_aggregation_plans_are_read_from_their_cursor_stage():
+    explain = {
+        "stages": [
+            {
+                "$cursor": {
+                    "queryPlanner": {
+                        "namespace": "pitch_health.condition_history_hourly",
+                        "winningPlan": {"stage": "COLLSCAN"},
+                    }
+                }
+            },
+            {"$group": {}},
+        ]
+    }
+
+    assert summarize_explain(explain) == {
+        "stages": ["COLLSCAN"],
+        "uses_collection_scan": True,
+        "namespace": "pitch_health.condition_history_hourly",
+    }
@@ -0,0 +1,283 @@
+import asyncio
+import copy
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+from uuid import uuid4
+import pytest
+from pymongo.errors import ServerSelectionTimeoutError
+from pitch_health_monitor.database import async_db_methods, db_methods
+from pitch_health_monitor.database.common import HISTORY_ROLLUP_KEY
+from pitch_health_monitor.services.pitch_monitor.history import (
+    get_check_point,
+    get_point_meta,
+    record_history_points,
+    rollup_history,
+    truncate_to_bucket,
+)
+
+DATE_TRUNC_RESOLUTIONS = {"hour": "hourly", "day": "daily"}
+
+
+class RollupCollection:
+    """
+    Collection running the rollup pipelines of the condition history on mongomock, which supports
+    neither $dateTrunc nor $merge: buckets are truncated beforehand, and merged into the rollups with
+    upserts matching the $merge options.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._collection, name)
+
+    def aggregate(self, pipeline: List[Dict[str, Any]]):
+        # Reads of the rollups run as they are
+        if "$merge" not in pipeline[-1]:
+            return self._collection.aggregate(pipeline)
+
+        match_stage, group_stage, project_stage, merge_stage = copy.deepcopy(pipeline)
+
+        date_trunc = group_stage["$group"]["_id"]["start"]["$dateTrunc"]
+        time_field = date_trunc["date"].lstrip("$")
+        resolution = DATE_TRUNC_RESOLUTIONS[date_trunc["unit"]]
+        group_stage["$group"]["_id"]["start"] = "$bucket_start"
+
+        buckets = self._collection.database.get_collection("rollup_buckets")
+        buckets.drop()
+        for document in self._collection.aggregate([match_stage]):
+            document["bucket_start"] = truncate_to_bucket(
+                document[time_field], resolution
+            )
+            buckets.insert_one(document)
+
+        merge = merge_stage["$merge"]
+        assert merge["on"] == HISTORY_ROLLUP_KEY
+        assert merge["whenMatched"] == "replace"
+        assert merge["whenNotMatched"] == "insert"
+
+        into = self._collection.database.get_collection(merge["into"])
+        for rollup in buckets.aggregate([group_stage, project_stage]):
+            into.replace_one(
+                {field: rollup[field] for field in HISTORY_ROLLUP_KEY},
+                rollup,
+                upsert=True,
+            )
+
+        return iter(())
+
+
+@pytest.fixture
+def history_database(database, monkeypatch) -> None:
+    # The rollups run through the synchronous methods, whose collections can run the pipelines
+    monkeypatch.setattr(async_db_methods, "MONGO_ASYNC", False)
+
+    for name in ["history_collection", "hourly_history_collection"]:
+        monkeypatch.setattr(
+            db_methods, name, RollupCollection(getattr(db_methods, name))
+        )
+
+
+def get_meta(pitch_uuid, city: str = "Kaiserslautern") -> Dict[str, Any]:
+    return get_point_meta(pitch_uuid, city, "Germany", "natural")
+
+
+def get_rollups(collection) -> Dict[tuple, Dict[str, Any]]:
+    return {
+        (rollup["pitch_uuid"], rollup["start"]): rollup
+        for rollup in collection.find({}, {"_id": 0})
+    }
+
+
+def test_rollup_rebuilds_latest_bucket_with_late_points(history_database):
+    first_pitch = uuid4()
+    second_pitch = uuid4()
+    first_meta = get_meta(first_pitch)
+    second_meta = get_meta(second_pitch)
+    ten = datetime(2024, 5, 1, 10)
+    eleven = ten + timedelta(hours=1)
+
+    db_methods.insert_history_points_in_db(
+        [
+            get_check_point(first_meta, ten + timedelta(minutes=5), 8, 0, False),
+            get_check_point(first_meta, ten + timedelta(minutes=40), 6, 1, True),
+            get_check_point(second_meta, ten + timedelta(minutes=20), 9, 0, False),
+            # In the bucket that is not complete yet
+            get_check_point(first_meta, eleven + timedelta(minutes=10), 5, 2, True),
+        ]
+    )
+
+    rolled_up = asyncio.run(rollup_history("hourly", eleven + timedelta(minutes=30)))
+
+    assert rolled_up == (ten, eleven)
+    rollups = get_rollups(db_methods.hourly_history_collection)
+    assert set(rollups) == {(first_pitch, ten), (second_pitch, ten)}
+    assert rollups[(first_pitch, ten)] == {
+        "pitch_uuid": first_pitch,
+        "city": "Kaiserslautern",
+        "country": "Germany",
+        "turf_type": "natural",
+        "start": ten,
+        "point_count": 2,
+        "condition_sum": 14,
+        "condition_min": 6,
+        "condition_max": 8,
+        "rain_count": 1,
+        "maintenance_count": 0,
+    }
+
+    # A point of the bucket already rolled up arrives late
+    db_methods.insert_history_points_in_db(
+        [
+            get_check_point(first_meta, ten + timedelta(minutes=50), 4, 2, True),
+            get_check_point(first_meta, eleven + timedelta(minutes=40), 7, 0, False),
+        ]
+    )
+
+    rolled_up = asyncio.run(
+        rollup_history("hourly", eleven + timedelta(hours=1, minutes=10))
+    )
+
+    # The re-run starts at the latest bucket and replaces its rollup instead of adding to it
+    assert rolled_up == (ten, eleven + timedelta(hours=1))
+    rollups = get_rollups(db_methods.hourly_history_collection)
+    assert set(rollups) == {
+        (first_pitch, ten),
+        (second_pitch, ten),
+        (first_pitch, eleven),
+    }
+    assert rollups[(first_pitch, ten)]["point_count"] == 3
+    assert rollups[(first_pitch, ten)]["condition_min"] == 4
+    assert rollups[(first_pitch, ten)]["rain_count"] == 2
+    assert rollups[(second_pitch, ten)]["point_count"] == 1
+    assert rollups[(first_pitch, eleven)]["point_count"] == 2
+
+    # The next run only rebuilds the latest bucket
+    assert asyncio.run(
+        rollup_history("hourly", eleven + timedelta(hours=1, minutes=20))
+    ) == (eleven, eleven + timedelta(hours=1))
+    assert len(get_rollups(db_methods.hourly_history_collection)) == 3
+    assert (
+        get_rollups(db_methods.hourly_history_collection)[(first_pitch, ten)][
+            "point_count"
+        ]
+        == 3
+    )
+
+
+def test_daily_rollup_adds_hourly_rollups_up(history_database):
+    pitch_uuid = uuid4()
+    day = datetime(2024, 5, 1)
+
+    db_methods.insert_history_points_in_db(
+        [
+            get_check_point(
+                get_meta(pitch_uuid),
+                day + timedelta(hours=hour),
+                condition,
+                0,
+                hour == 9,
+            )
+            for hour, condition in [(8, 8), (9, 6), (9, 7), (15, 3)]
+        ]
+    )
+
+    next_day = day + timedelta(days=1, hours=1)
+    asyncio.run(rollup_history("hourly", next_day))
+    assert asyncio.run(rollup_history("daily", next_day)) == (
+        day,
+        day + timedelta(days=1),
+    )
+
+    rollups = get_rollups(db_methods.daily_history_collection)
+    assert rollups == {
+        (pitch_uuid, day): {
+            "pitch_uuid": pitch_uuid,
+            "city": "Kaiserslautern",
+            "country": "Germany",
+            "turf_type": "natural",
+            "start": day,
+            "point_count": 4,
+            "condition_sum": 24,
+            "condition_min": 3,
+            "condition_max": 8,
+            "rain_count": 2,
+            "maintenance_count": 0,
+        }
+    }
+
+
+def test_rollups_are_filtered_on_the_stored_pitch_fields(history_database):
+    ten = datetime(2024, 5, 1, 10)
+    kaiserslautern_pitch = uuid4()
+
+    db_methods.insert_history_points_in_db(
+        [
+            get_check_point(get_meta(kaiserslautern_pitch), ten, 8, 0, False),
+            get_check_point(get_meta(uuid4(), "Berlin"), ten, 6, 1, True),
+            get_check_point(get_meta(uuid4(), "Berlin"), ten, 4, 2, True),
+        ]
+    )
+    asyncio.run(rollup_history("hourly", ten + timedelta(hours=2)))
+
+    buckets = asyncio.run(
+        async_db_methods.get_history_rollups_from_db(
+            "hourly",
+            ten,
+            ten + timedelta(hours=1),
+            aggregate=True,
+            filters={"city": {"$in": ["Berlin"]}},
+        )
+    )
+
+    # No pitch is looked up: the rollups carry the city of their pitch
+    assert buckets == [
+        {
+            "start": ten,
+            "pitch_count": 2,
+            "point_count": 2,
+            "condition_avg": 5,
+            "condition_min": 4,
+            "condition_max": 6,
+            "rain_count": 2,
+            "maintenance_count": 0,
+        }
+    ]
+    assert (
+        asyncio.run(
+            async_db_methods.get_history_rollups_from_db(
+                "hourly", ten, ten + timedelta(hours=1), [kaiserslautern_pitch]
+            )
+        )[0]["condition_avg"]
+        == 8
+    )
+
+
+def test_empty_history_is_not_rolled_up(history_database):
+    assert asyncio.run(rollup_history("hourly", datetime(2024, 5, 1))) is None
+
+
+def test_insert_reports_lost_points(database):
+    point = get_check_point(get_meta(uuid4()), datetime(2024, 5, 1, 10), 8, 0, False)
+    db_methods.insert_history_points_in_db([{**point, "_id": 1}])
+
+    result = db_methods.insert_history_points_in_db(
+        [{**point, "_id": 1}, {**point, "_id": 2}, {**point, "_id": 3}], chunk_size=2
+    )
+
+    assert result.inserted_count == 2
+    assert len(result.errors) == 1
+    assert "Duplicate" in result.errors[0]
+
+
+def test_unreachable_database_is_reported(database, monkeypatch, caplog):
+    class UnreachableCollection:
+        async def insert_many(self, *args, **kwargs):
+            raise ServerSelectionTimeoutError("No servers found")
+
+    monkeypatch.setattr(async_db_methods, "history_collection", UnreachableCollection())
+
+    point = get_check_point(get_meta(uuid4()), datetime(2024, 5, 1, 10), 8, 0, False)
+    asyncio.run(record_history_points([point, point, point], chunk_size=2))
+
+    assert "3 of 3 points lost: No servers found" in caplog.text
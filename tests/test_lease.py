@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from pitch_health_monitor.database import async_db_methods
+from pitch_health_monitor.database.async_db_methods import (
+    acquire_lease_in_db,
+    release_lease_in_db,
+)
+from pitch_health_monitor.services.pitch_monitor import lease as lease_module
+from pitch_health_monitor.services.pitch_monitor.lease import ProcessorLease
+
+LEASE_NAME = "test-lease"
+TTL = timedelta(seconds=0.3)
+HEARTBEAT_INTERVAL = timedelta(seconds=0.05)
+
+
+async def get_lease_document():
+    return await async_db_methods.leases_collection.find_one({"_id": LEASE_NAME})
+
+
+def test_acquire_while_held_by_another_owner(database):
+    async def scenario():
+        assert await acquire_lease_in_db(LEASE_NAME, "first", TTL)
+        assert not await acquire_lease_in_db(LEASE_NAME, "second", TTL)
+
+        # The holder renews its own lease
+        assert await acquire_lease_in_db(LEASE_NAME, "first", TTL)
+        assert (await get_lease_document())["owner"] == "first"
+
+        # Only the holder can release it
+        assert not await release_lease_in_db(LEASE_NAME, "second")
+        assert await release_lease_in_db(LEASE_NAME, "first")
+        assert await acquire_lease_in_db(LEASE_NAME, "second", TTL)
+
+    asyncio.run(scenario())
+
+
+def test_takeover_after_expiration(database):
+    async def scenario():
+        await async_db_methods.leases_collection.insert_one(
+            {
+                "_id": LEASE_NAME,
+                "owner": "dead",
+                "expires_at": datetime.utcnow() - timedelta(seconds=1),
+            }
+        )
+
+        assert await acquire_lease_in_db(LEASE_NAME, "alive", TTL)
+
+        document = await get_lease_document()
+        assert document["owner"] == "alive"
+        assert document["expires_at"] > datetime.utcnow()
+
+    asyncio.run(scenario())
+
+
+def test_routine_runs_only_in_holder(database):
+    async def scenario():
+        await acquire_lease_in_db(LEASE_NAME, "other", timedelta(minutes=1))
+
+        started = asyncio.Event()
+
+        async def routine():
+            started.set()
+
+        lease = ProcessorLease(
+            LEASE_NAME, ttl=TTL, heartbeat_interval=HEARTBEAT_INTERVAL, owner="self"
+        )
+        task = asyncio.ensure_future(lease.run_while_held(routine))
+
+        await asyncio.sleep(TTL.total_seconds())
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert not started.is_set()
+        assert (await get_lease_document())["owner"] == "other"
+
+    asyncio.run(scenario())
+
+
+def test_routine_cancelled_when_renewal_fails(database, monkeypatch):
+    async def scenario():
+        renewed_at = None
+
+        async def renew_once(name, owner, ttl):
+            nonlocal renewed_at
+
+            if renewed_at is not None:
+                raise ConnectionError("database unreachable")
+
+            renewed_at = datetime.utcnow()
+            return await acquire_lease_in_db(name, owner, ttl)
+
+        monkeypatch.setattr(lease_module, "acquire_lease_in_db", renew_once)
+
+        cancelled = asyncio.Event()
+
+        async def routine():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        lease = ProcessorLease(
+            LEASE_NAME, ttl=TTL, heartbeat_interval=HEARTBEAT_INTERVAL, owner="self"
+        )
+        assert await acquire_lease_in_db(LEASE_NAME, "self", TTL)
+
+        await asyncio.wait_for(lease._run_until_lost(routine), timeout=5)
+
+        # The routine is stopped before the last renewal expires for the other processes
+        assert cancelled.is_set()
+        assert datetime.utcnow() < renewed_at + TTL
+
+    asyncio.run(scenario())
+
+
+def test_routine_stopped_when_lease_taken_over(database):
+    async def scenario():
+        cancelled = asyncio.Event()
+
+        async def routine():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        lease = ProcessorLease(
+            LEASE_NAME, ttl=TTL, heartbeat_interval=HEARTBEAT_INTERVAL, owner="self"
+        )
+        assert await acquire_lease_in_db(LEASE_NAME, "self", TTL)
+
+        run = asyncio.ensure_future(lease._run_until_lost(routine))
+        await asyncio.sleep(HEARTBEAT_INTERVAL.total_seconds() / 2)
+
+        # Another process took the lease over, e.g. after this one was paused past the TTL
+        await async_db_methods.leases_collection.update_one(
+            {"_id": LEASE_NAME},
+            {"$set": {"owner": "other", "expires_at": datetime.utcnow() + TTL}},
+        )
+
+        await asyncio.wait_for(run, timeout=5)
+
+        assert cancelled.is_set()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("routine_fails", [False, True])
+def test_lease_released_on_exit(database, routine_fails: bool):
+    async def scenario():
+        started = asyncio.Event()
+
+        async def routine():
+            started.set()
+
+            if routine_fails:
+                raise RuntimeError("routine failed")
+
+            await asyncio.sleep(60)
+
+        lease = ProcessorLease(
+            LEASE_NAME, ttl=TTL, heartbeat_interval=HEARTBEAT_INTERVAL, owner="self"
+        )
+        task = asyncio.ensure_future(lease.run_while_held(routine))
+
+        await asyncio.wait_for(started.wait(), timeout=5)
+        assert (await get_lease_document())["owner"] == "self"
+
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        # Released right away instead of waiting for the lease to expire
+        assert await get_lease_document() is None
+        assert await acquire_lease_in_db(LEASE_NAME, "other", TTL)
+
+    asyncio.run(scenario())
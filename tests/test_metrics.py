@@ -0,0 +1,176 @@
+import math
+import re
+from typing import Dict, List, Tuple
+import pytest
+from pitch_health_monitor.services.metrics import REGISTRY, MetricsRegistry
+
+# Lines of the Prometheus text exposition format
+COMMENT_LINE = re.compile(r"# (HELP|TYPE) ([a-zA-Z_:][a-zA-Z0-9_:]*) (.*)")
+SAMPLE_LINE = re.compile(r"([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)")
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\\n]|\\[\\"n])*)"(,|$)')
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def parse_exposition(text: str) -> List[Sample]:
+    """
+    Parse the samples of an exposition, checking every line against the text format.
+    """
+
+    assert text.endswith("\n")
+
+    samples = []
+    types: Dict[str, str] = {}
+    for line in text.splitlines():
+        comment = COMMENT_LINE.fullmatch(line)
+        if comment:
+            kind, name, text = comment.groups()
+            if kind == "TYPE":
+                assert text in ("counter", "histogram")
+                types[name] = text
+            continue
+
+        sample = SAMPLE_LINE.fullmatch(line)
+        assert sample, f"Invalid sample line: {line!r}"
+        name, label_set, value = sample.groups()
+
+        labels = {}
+        position = 0
+        while label_set and position < len(label_set):
+            label = LABEL.match(label_set, position)
+            assert label, f"Invalid label set: {label_set!r}"
+            labels[label.group(1)] = unescape(label.group(2))
+            position = label.end()
+
+        # Every sample follows the TYPE line of its metric
+        assert any(
+            name == metric_name or name.startswith(f"{metric_name}_")
+            for metric_name in types
+        )
+        samples.append((name, labels, float(value)))
+
+    return samples
+
+
+def unescape(value: str) -> str:
+    return re.sub(
+        r"\\(.)", lambda match: "\n" if match.group(1) == "n" else match.group(1), value
+    )
+
+
+def test_counter_exposition():
+    registry = MetricsRegistry()
+    counter = registry.counter(
+        "pitches_total", "Pitches by outcome", ["outcome", "mode"]
+    )
+    registry.counter("unused_total", "Never incremented")
+
+    counter.inc(outcome="processed", mode="sweep")
+    counter.inc(2.5, mode="sweep", outcome="processed")
+    counter.inc(outcome="failed", mode="sweep")
+
+    # Labels are rendered in the order they were declared in, whatever the order they are given in
+    assert registry.render() == (
+        "# HELP pitches_total Pitches by outcome\n"
+        "# TYPE pitches_total counter\n"
+        'pitches_total{outcome="processed",mode="sweep"} 3.5\n'
+        'pitches_total{outcome="failed",mode="sweep"} 1.0\n'
+        "# HELP unused_total Never incremented\n"
+        "# TYPE unused_total counter\n"
+    )
+
+
+def test_label_values_and_help_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", 'Path "C:\\"\nsecond line', ["path"])
+    raw_value = 'C:\\pitches\n"quoted"'
+
+    counter.inc(path=raw_value)
+
+    lines = registry.render().splitlines()
+    assert lines[0] == '# HELP requests_total Path "C:\\\\"\\nsecond line'
+    assert lines[2] == 'requests_total{path="C:\\\\pitches\\n\\"quoted\\""} 1.0'
+    assert parse_exposition(registry.render()) == [
+        ("requests_total", {"path": raw_value}, 1)
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram(
+        "lookup_seconds", "Lookups", ["cache"], buckets=(0.1, 1, 5)
+    )
+
+    # A value on a bound counts in its bucket, one above the last bound only in +Inf
+    for value in [0.05, 0.1, 0.5, 7]:
+        histogram.observe(value, cache="miss")
+    histogram.observe(0.01, cache="hit")
+
+    samples = parse_exposition(registry.render())
+
+    miss_buckets = [
+        (labels["le"], value)
+        for name, labels, value in samples
+        if name == "lookup_seconds_bucket" and labels["cache"] == "miss"
+    ]
+    assert miss_buckets == [("0.1", 2), ("1.0", 3), ("5.0", 3), ("+Inf", 4)]
+    assert ("lookup_seconds_sum", {"cache": "miss"}, 7.65) in samples
+    assert ("lookup_seconds_count", {"cache": "miss"}, 4) in samples
+    assert ("lookup_seconds_bucket", {"cache": "hit", "le": "+Inf"}, 1) in samples
+    assert ("lookup_seconds_count", {"cache": "hit"}, 1) in samples
+
+    # The le label comes last, after the labels of the metric
+    assert (
+        'lookup_seconds_bucket{cache="miss",le="+Inf"} 4'
+        in registry.render().splitlines()
+    )
+
+
+def test_histogram_without_labels():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("cycle_seconds", "Cycles", buckets=(1,))
+
+    histogram.observe(math.pi)
+
+    assert registry.render().splitlines()[2:] == [
+        'cycle_seconds_bucket{le="1.0"} 0',
+        'cycle_seconds_bucket{le="+Inf"} 1',
+        f"cycle_seconds_sum {math.pi!r}",
+        "cycle_seconds_count 1",
+    ]
+
+
+def test_application_metrics_render_in_the_text_format():
+    samples = parse_exposition(REGISTRY.render())
+
+    assert all(not math.isnan(value) for _, _, value in samples)
+
+
+@pytest.mark.parametrize(
+    "labels",
+    [{}, {"outcome": "processed", "mode": "sweep"}, {"result": "processed"}],
+)
+def test_observations_must_match_the_label_names(labels: Dict[str, str]):
+    counter = MetricsRegistry().counter("pitches_total", "Pitches", ["outcome"])
+
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc(**labels)
+
+
+@pytest.mark.parametrize(
+    "name, label_names",
+    [
+        ("pitch-count", []),
+        ("1_pitches", []),
+        ("pitches_total", ["outcome-kind"]),
+        ("pitches_total", ["__reserved"]),
+    ],
+)
+def test_invalid_names_are_refused(name: str, label_names: List[str]):
+    with pytest.raises(ValueError, match="Invalid"):
+        MetricsRegistry().counter(name, "Pitches", label_names)
+
+
+def test_histogram_refuses_its_bucket_label():
+    with pytest.raises(ValueError, match="le"):
+        MetricsRegistry().histogram("lookup_seconds", "Lookups", ["le"])
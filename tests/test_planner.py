@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import List
+from uuid import uuid4
+import pytest
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+from pitch_health_monitor.services.pitch_monitor.planner import (
+    plan_maintenance,
+    project_pitch,
+    reschedule_for_forecast_rain,
+)
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.weather import (
+    AsyncWeatherAPI,
+    ForecastWeatherAPI,
+    HourlyForecast,
+)
+
+NOW = datetime(2024, 5, 1, 12)
+
+# Natural turf needs 36 hours to dry
+DRYING_HOURS = 36
+
+
+def build_forecast(rainy_hours: List[int], hours: int = 48) -> HourlyForecast:
+    return HourlyForecast(
+        starts_at=NOW,
+        raining=[hour in rainy_hours for hour in range(hours)],
+        fetched_at=NOW,
+    )
+
+
+def build_pitch(condition: int = 6) -> Pitch:
+    return Pitch(
+        uuid=uuid4(),
+        name="Pitch",
+        location=Location(city="Kaiserslautern", country="Germany"),
+        turf_type=TurfType.natural,
+        current_condition=condition,
+        last_checked_at=NOW,
+        next_scheduled_maintenance=NOW + timedelta(hours=DRYING_HOURS),
+    )
+
+
+def test_forecast_covers_its_hours_only():
+    forecast = build_forecast([1], hours=3)
+
+    assert forecast.ends_at == NOW + timedelta(hours=3)
+    assert forecast.is_raining_at(NOW) is False
+    assert forecast.is_raining_at(NOW + timedelta(hours=1, minutes=59)) is True
+    assert forecast.is_raining_at(NOW + timedelta(hours=2)) is False
+    assert forecast.is_raining_at(NOW - timedelta(minutes=1)) is None
+    assert forecast.is_raining_at(NOW + timedelta(hours=3)) is None
+
+
+def test_maintenance_is_planned_after_the_forecast_rain():
+    pitch = build_pitch()
+
+    # Each rainy check postpones the maintenance until the turf has dried again
+    planned_at = plan_maintenance(pitch, build_forecast([5, 6, 7]), NOW)
+
+    assert planned_at == NOW + timedelta(hours=7 + DRYING_HOURS)
+
+
+def test_rescheduling_moves_the_scheduled_maintenance():
+    pitch = reschedule_for_forecast_rain(build_pitch(), build_forecast([5]))
+
+    assert pitch.next_scheduled_maintenance == NOW + timedelta(hours=5 + DRYING_HOURS)
+    assert pitch.dirty_fields == {"next_scheduled_maintenance"}
+
+
+@pytest.mark.parametrize(
+    "rainy_hours",
+    [
+        # Dry until the maintenance
+        [],
+        # Rain only after the maintenance
+        [DRYING_HOURS + 1, DRYING_HOURS + 2],
+    ],
+)
+def test_maintenance_is_kept_without_rain_before_it(rainy_hours: List[int]):
+    pitch = reschedule_for_forecast_rain(build_pitch(), build_forecast(rainy_hours))
+
+    assert pitch.next_scheduled_maintenance == NOW + timedelta(hours=DRYING_HOURS)
+    assert not pitch.dirty_fields
+
+
+def test_projected_rain_damage_is_left_to_the_checks():
+    # Three rainy hours bring the condition down to 2, which cancels the maintenance
+    pitch = build_pitch(condition=4)
+
+    assert plan_maintenance(pitch, build_forecast([1, 2, 3]), NOW) is None
+
+
+def test_projection_leaves_the_pitch_untouched():
+    pitch = build_pitch()
+
+    projection = project_pitch(pitch, build_forecast([1, 2, 3], hours=5), NOW)
+
+    assert [state.current_condition for state in projection] == [6, 6, 6, 4, 4]
+    assert [state.current_consecutive_rain_hours for state in projection] == [
+        0,
+        1,
+        2,
+        0,
+        0,
+    ]
+    assert pitch.current_condition == 6
+    assert not pitch.dirty_fields
+
+
+class FixedForecastAPI(AsyncWeatherAPI):
+    def __init__(self, forecast: HourlyForecast):
+        self.forecast = forecast
+        self.current_calls = 0
+
+    async def is_raining_now(self, city, country, coordinates=None) -> bool:
+        self.current_calls += 1
+        return False
+
+    async def get_hourly_forecast(self, city, country, hours=24, coordinates=None):
+        return self.forecast
+
+
+def test_forecast_weather_follows_the_clock_in_use():
+    upstream = FixedForecastAPI(build_forecast([5]))
+    weather_api = ForecastWeatherAPI(upstream, hours=48)
+
+    async def is_raining_at(hour: int) -> bool:
+        with clock.use_clock(clock.SimulatedClock(NOW + timedelta(hours=hour))):
+            return await weather_api.is_raining_now("Kaiserslautern", "Germany")
+
+    assert asyncio.run(is_raining_at(4)) is False
+    assert asyncio.run(is_raining_at(5)) is True
+    assert upstream.current_calls == 0
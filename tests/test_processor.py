@@ -0,0 +1,47 @@
+import asyncio
+import pytest
+from pitch_health_monitor.services.pitch_monitor import processor
+
+
+def test_local_pitch_events_are_refused_with_several_leased_workers(monkeypatch):
+    monkeypatch.setattr(processor, "PITCH_EVENTS_SOURCE", "local")
+    monkeypatch.setattr(processor, "PROCESSOR_LEASE_ENABLED", True)
+    monkeypatch.setattr(processor, "WEB_CONCURRENCY", 4)
+
+    with pytest.raises(ValueError, match="change stream"):
+        asyncio.run(processor.run_processor())
+
+
+def test_weather_snapshot_is_saved_periodically_and_on_close(tmp_path, monkeypatch):
+    snapshot_path = tmp_path / "weather.json"
+    monkeypatch.setattr(processor, "WEATHER_CACHE_SNAPSHOT_PATH", str(snapshot_path))
+    monkeypatch.setattr(processor, "WEATHER_CACHE_SNAPSHOT_INTERVAL_SECONDS", 0.01)
+
+    async def run():
+        async with processor.open_weather_api() as weather_api:
+            weather_api.cache.set(("Berlin", "Germany"), True)
+            await asyncio.sleep(0.1)
+
+            # Saved by the periodic routine, while the API is still open
+            assert "Berlin" in snapshot_path.read_text()
+
+            weather_api.cache.set(("Munich", "Germany"), False)
+
+    asyncio.run(run())
+
+    assert "Munich" in snapshot_path.read_text()
+
+
+@pytest.mark.parametrize(
+    "mode, engine", [("sharded", "objects"), ("sweep", "vectorized")]
+)
+def test_forecast_is_refused_by_the_engines_not_planning_ahead(
+    monkeypatch, mode: str, engine: str
+):
+    monkeypatch.setattr(processor, "PITCH_EVENTS_SOURCE", "none")
+    monkeypatch.setattr(processor, "WEATHER_SOURCE", "forecast")
+    monkeypatch.setattr(processor, "PROCESSOR_MODE", mode)
+    monkeypatch.setattr(processor, "PROCESSOR_ENGINE", engine)
+
+    with pytest.raises(ValueError, match="forecast"):
+        asyncio.run(processor.run_processor())
@@ -0,0 +1,177 @@
+import asyncio
+from datetime import datetime
+from typing import List
+from uuid import uuid4
+import pytest
+from pitch_health_monitor.database import read_cache as read_cache_module
+from pitch_health_monitor.database.async_db_methods import (
+    bulk_update_pitches_in_db,
+    create_pitch_in_db,
+    update_pitch_in_db,
+)
+from pitch_health_monitor.database.read_cache import (
+    LIST_MEMBERSHIP_TAG,
+    CachedResponse,
+    MemoryReadCache,
+    get_or_load,
+    invalidate_pitches,
+    pitch_tag,
+)
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+
+PITCH_KEY = "pitch"
+LIST_KEY = "list"
+
+
+@pytest.fixture
+def read_cache(monkeypatch) -> MemoryReadCache:
+    read_cache = MemoryReadCache(ttl_seconds=60, max_entries=100)
+    monkeypatch.setattr(read_cache_module, "read_cache", read_cache)
+
+    return read_cache
+
+
+def generate_pitch() -> Pitch:
+    return Pitch(
+        uuid=uuid4(),
+        name="Fritz-Walter-Stadion",
+        location=Location(city="Kaiserslautern", country="Germany"),
+        turf_type=TurfType.natural,
+        current_condition=8,
+        last_checked_at=datetime.utcnow(),
+    )
+
+
+async def cache_pitch_reads(read_cache: MemoryReadCache, pitch: Pitch) -> None:
+    """
+    Cache a response rendering the pitch and a list containing it.
+    """
+
+    sequence = await read_cache.get_sequence()
+    await read_cache.set(
+        PITCH_KEY, CachedResponse(body=b"pitch"), [pitch_tag(pitch.uuid)], sequence
+    )
+    await read_cache.set(
+        LIST_KEY,
+        CachedResponse(body=b"list"),
+        [LIST_MEMBERSHIP_TAG, pitch_tag(pitch.uuid)],
+        sequence,
+    )
+
+
+async def get_cached_keys(read_cache: MemoryReadCache) -> List[str]:
+    return [key for key in (PITCH_KEY, LIST_KEY) if await read_cache.get(key)]
+
+
+def test_write_during_load_is_not_cached(read_cache):
+    pitch_uuid = uuid4()
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+
+        # A write lands between the read of the database and the caching of its result
+        if loads == 1:
+            await invalidate_pitches([pitch_uuid], False)
+
+        return CachedResponse(body=f"load {loads}".encode()), [pitch_tag(pitch_uuid)]
+
+    async def scenario():
+        first = await get_or_load(PITCH_KEY, load)
+        second = await get_or_load(PITCH_KEY, load)
+        third = await get_or_load(PITCH_KEY, load)
+
+        assert first.body == b"load 1"
+        assert second.body == b"load 2"
+
+        # Only the load that did not race with a write was cached
+        assert third.body == b"load 2"
+        assert loads == 2
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_drops_only_tagged_entries(read_cache):
+    pitch = generate_pitch()
+
+    async def scenario():
+        await cache_pitch_reads(read_cache, pitch)
+        other_sequence = await read_cache.get_sequence()
+        await read_cache.set(
+            "other", CachedResponse(body=b"other"), ["pitch:other"], other_sequence
+        )
+
+        await invalidate_pitches([pitch.uuid], False)
+
+        assert await get_cached_keys(read_cache) == []
+        assert await read_cache.get("other") is not None
+
+    asyncio.run(scenario())
+
+
+def test_membership_write_invalidates_lists(database, read_cache):
+    pitch = generate_pitch()
+    other_pitch = generate_pitch()
+
+    async def scenario():
+        await create_pitch_in_db(pitch)
+        await create_pitch_in_db(other_pitch)
+        await cache_pitch_reads(read_cache, pitch)
+
+        # The lists may now contain the other pitch, or no longer contain it
+        other_pitch.current_condition = 3
+        await update_pitch_in_db(other_pitch.uuid, other_pitch)
+
+        assert await get_cached_keys(read_cache) == [PITCH_KEY]
+
+    asyncio.run(scenario())
+
+
+def test_other_write_keeps_lists(database, read_cache):
+    pitch = generate_pitch()
+    other_pitch = generate_pitch()
+
+    async def scenario():
+        await create_pitch_in_db(pitch)
+        await create_pitch_in_db(other_pitch)
+        await cache_pitch_reads(read_cache, pitch)
+
+        other_pitch.name = "Betzenberg"
+        await update_pitch_in_db(other_pitch.uuid, other_pitch)
+
+        assert await get_cached_keys(read_cache) == [PITCH_KEY, LIST_KEY]
+
+        # Lists render their pitches, so they are invalidated by them whatever the field
+        pitch.name = "Betzenberg"
+        await update_pitch_in_db(pitch.uuid, pitch)
+
+        assert await get_cached_keys(read_cache) == []
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize(
+    "field, value, cached_keys",
+    [
+        ("current_condition", 2, [PITCH_KEY]),
+        ("turf_type", TurfType.hybrid, [PITCH_KEY, LIST_KEY]),
+    ],
+)
+def test_bulk_write_invalidates_lists_on_membership_fields(
+    database, read_cache, field, value, cached_keys
+):
+    pitch = generate_pitch()
+    other_pitches = [generate_pitch() for _ in range(3)]
+
+    async def scenario():
+        for other_pitch in [pitch, *other_pitches]:
+            await create_pitch_in_db(other_pitch)
+        await cache_pitch_reads(read_cache, pitch)
+
+        setattr(other_pitches[1], field, value)
+        await bulk_update_pitches_in_db(other_pitches)
+
+        assert await get_cached_keys(read_cache) == cached_keys
+
+    asyncio.run(scenario())
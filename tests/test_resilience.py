@@ -0,0 +1,312 @@
+import asyncio
+from typing import List, Optional, Union
+import httpx
+import pytest
+from pitch_health_monitor.services.resilience import CircuitBreaker, TokenBucket
+from pitch_health_monitor.services.weather import (
+    AsyncWeatherAPI,
+    Coordinates,
+    ResilientWeatherAPI,
+    WeatherUnavailableError,
+)
+
+real_sleep = asyncio.sleep
+
+
+class FakeClock:
+    """
+    Clock standing still until it is advanced, by hand or by the sleeps of the code under test.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await real_sleep(0)
+
+
+class FakeWeatherAPI(AsyncWeatherAPI):
+    """
+    Weather API answering with the given outcomes in order, repeating the last one.
+    """
+
+    def __init__(self, outcomes: List[Union[bool, Exception]]):
+        self.outcomes = outcomes
+        self.calls = 0
+
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        return outcome
+
+
+def http_error(status_code: int, headers: Optional[dict] = None) -> httpx.HTTPError:
+    request = httpx.Request("GET", "https://weather.test")
+    response = httpx.Response(status_code, headers=headers, request=request)
+
+    return httpx.HTTPStatusError(
+        f"Status {status_code}", request=request, response=response
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(asyncio, "sleep", clock.sleep)
+
+    return clock
+
+
+def get_resilient_api(
+    weather_api: AsyncWeatherAPI, clock: FakeClock, **kwargs
+) -> ResilientWeatherAPI:
+    options = {
+        "rate_per_second": 10,
+        "burst": 100,
+        "max_retries": 3,
+        "backoff_base_seconds": 1,
+        "backoff_max_seconds": 3,
+        "failure_threshold": 100,
+        "reset_timeout_seconds": 60,
+        "fallback_max_age_seconds": 600,
+        **kwargs,
+    }
+
+    return ResilientWeatherAPI(weather_api, clock=clock, **options)
+
+
+def test_token_bucket_lets_bursts_through_then_throttles(clock):
+    bucket = TokenBucket(rate_per_second=2, capacity=3, clock=clock)
+
+    async def scenario():
+        for _ in range(3):
+            await bucket.acquire()
+
+        assert clock.sleeps == []
+        assert bucket.throttled == 0
+
+        await bucket.acquire()
+
+        assert clock.sleeps == [pytest.approx(0.5)]
+        assert bucket.throttled == 1
+
+    asyncio.run(scenario())
+
+
+def test_token_bucket_refills_up_to_capacity(clock):
+    bucket = TokenBucket(rate_per_second=2, capacity=3, clock=clock)
+
+    async def scenario():
+        for _ in range(3):
+            await bucket.acquire()
+
+        # Idle long enough to refill many times the capacity
+        clock.now += 60
+
+        for _ in range(3):
+            await bucket.acquire()
+
+        assert clock.sleeps == []
+
+        await bucket.acquire()
+
+        assert bucket.throttled == 1
+
+    asyncio.run(scenario())
+
+
+def test_token_bucket_pause_holds_every_caller(clock):
+    bucket = TokenBucket(rate_per_second=2, capacity=3, clock=clock)
+
+    async def scenario():
+        bucket.pause(10)
+        await bucket.acquire()
+
+        assert sum(clock.sleeps) == pytest.approx(10.5)
+
+        # The bucket was emptied, so calls resume at the steady rate
+        clock.sleeps.clear()
+        await bucket.acquire()
+
+        assert clock.sleeps == [pytest.approx(0.5)]
+
+    asyncio.run(scenario())
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout_seconds=60, clock=clock)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+
+    # Failures separated by a success are not consecutive
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_lets_a_single_trial_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=60, clock=clock)
+
+    breaker.record_failure()
+    clock.now += 59
+
+    assert not breaker.allow()
+
+    clock.now += 1
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    # A cancelled trial frees the slot for another one
+    breaker.release()
+
+    assert breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_circuit_breaker_reopens_when_trial_fails():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout_seconds=60, clock=clock)
+
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 60
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    # Open for another full period from the failed trial
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 59
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
+
+
+def test_transient_errors_are_retried_with_bounded_backoff(clock):
+    weather_api = FakeWeatherAPI([httpx.ConnectError("unreachable")])
+    resilient_api = get_resilient_api(weather_api, clock)
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(resilient_api.is_raining_now("Kaiserslautern", "Germany"))
+
+    assert weather_api.calls == 4
+    assert resilient_api.retried == 3
+    assert resilient_api.failures == 4
+
+    # Jittered delays within the doubling base, capped at the maximum
+    assert len(clock.sleeps) == 3
+    for sleep_seconds, bound in zip(clock.sleeps, [1, 2, 3]):
+        assert 0 <= sleep_seconds <= bound
+
+
+def test_retry_recovers_from_transient_error(clock):
+    weather_api = FakeWeatherAPI([http_error(503), True])
+    resilient_api = get_resilient_api(weather_api, clock)
+
+    assert asyncio.run(resilient_api.is_raining_now("Kaiserslautern", "Germany"))
+    assert weather_api.calls == 2
+    assert resilient_api.retried == 1
+    assert resilient_api.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_request_errors_are_not_retried(clock):
+    weather_api = FakeWeatherAPI([http_error(404)])
+    resilient_api = get_resilient_api(weather_api, clock, failure_threshold=1)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(resilient_api.is_raining_now("Atlantis", "Nowhere"))
+
+    # The provider answered, so the circuit stays closed
+    assert weather_api.calls == 1
+    assert resilient_api.retried == 0
+    assert resilient_api.circuit_breaker.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limited_response_pauses_every_caller(clock):
+    weather_api = FakeWeatherAPI([http_error(429, {"Retry-After": "20"}), False])
+    resilient_api = get_resilient_api(weather_api, clock)
+
+    assert not asyncio.run(resilient_api.is_raining_now("Kaiserslautern", "Germany"))
+
+    # The retry waits for the pause requested by the provider, not only for its own backoff
+    assert sum(clock.sleeps) >= 20 - 1e-9
+    assert resilient_api.rate_limiter.throttled == 1
+
+
+def test_last_known_weather_is_returned_while_provider_fails(clock):
+    weather_api = FakeWeatherAPI([True, httpx.ConnectError("unreachable")])
+    resilient_api = get_resilient_api(weather_api, clock, max_retries=0)
+
+    async def scenario():
+        assert await resilient_api.is_raining_now("Kaiserslautern", "Germany")
+        assert await resilient_api.is_raining_now("Kaiserslautern", "Germany")
+
+        assert resilient_api.fallbacks == 1
+
+        # No fallback for a location that never answered
+        with pytest.raises(httpx.ConnectError):
+            await resilient_api.is_raining_now("Mainz", "Germany")
+
+        # Nor once the last known weather is too old
+        clock.now += 600
+
+        with pytest.raises(httpx.ConnectError):
+            await resilient_api.is_raining_now("Kaiserslautern", "Germany")
+
+    asyncio.run(scenario())
+
+
+def test_open_circuit_short_circuits_to_last_known_weather(clock):
+    weather_api = FakeWeatherAPI([False, httpx.ConnectError("unreachable")])
+    resilient_api = get_resilient_api(
+        weather_api, clock, max_retries=0, failure_threshold=2
+    )
+
+    async def scenario():
+        assert not await resilient_api.is_raining_now("Kaiserslautern", "Germany")
+
+        for _ in range(2):
+            assert not await resilient_api.is_raining_now("Kaiserslautern", "Germany")
+
+        assert resilient_api.circuit_breaker.state == CircuitBreaker.OPEN
+        calls = weather_api.calls
+
+        # The provider is not called while the circuit is open
+        assert not await resilient_api.is_raining_now("Kaiserslautern", "Germany")
+        assert weather_api.calls == calls
+        assert resilient_api.short_circuited == 1
+        assert resilient_api.fallbacks == 3
+
+        with pytest.raises(WeatherUnavailableError):
+            await resilient_api.is_raining_now("Mainz", "Germany")
+
+    asyncio.run(scenario())
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+from pitch_health_monitor.services.pitch_monitor.scheduler import DueTimeScheduler
+
+NOW = datetime(2024, 5, 1, 12)
+
+
+def test_rescheduled_pitch_skips_its_outdated_entry():
+    scheduler = DueTimeScheduler()
+    pitch_uuid = uuid4()
+    other_uuid = uuid4()
+
+    scheduler.schedule(pitch_uuid, NOW - timedelta(minutes=10))
+    scheduler.schedule(other_uuid, NOW - timedelta(minutes=5))
+    scheduler.schedule(pitch_uuid, NOW + timedelta(minutes=10))
+
+    # The outdated entry is still in the heap, but is dropped when it reaches the top
+    assert len(scheduler._heap) == 3
+    assert len(scheduler) == 2
+    assert scheduler.next_due_at() == NOW - timedelta(minutes=5)
+    assert len(scheduler._heap) == 2
+
+    assert scheduler.pop_due(NOW, 10) == [other_uuid]
+    assert scheduler.next_due_at() == NOW + timedelta(minutes=10)
+    assert scheduler.pop_due(NOW + timedelta(minutes=10), 10) == [pitch_uuid]
+    assert scheduler.next_due_at() is None
+    assert not scheduler._heap
+
+
+def test_pitch_rescheduled_earlier_is_popped_once():
+    scheduler = DueTimeScheduler()
+    pitch_uuid = uuid4()
+
+    scheduler.schedule(pitch_uuid, NOW + timedelta(minutes=10))
+    scheduler.schedule(pitch_uuid, NOW - timedelta(minutes=10))
+
+    assert scheduler.pop_due(NOW, 10) == [pitch_uuid]
+
+    # The later entry is outdated as the pitch is not scheduled anymore
+    assert scheduler.pop_due(NOW + timedelta(minutes=10), 10) == []
+    assert len(scheduler) == 0
+
+
+def test_pop_due_respects_the_limit_and_the_order():
+    scheduler = DueTimeScheduler()
+    pitch_uuids = [uuid4() for _ in range(5)]
+    for minutes, pitch_uuid in enumerate(pitch_uuids):
+        scheduler.schedule(pitch_uuid, NOW - timedelta(minutes=10 - minutes))
+
+    assert scheduler.pop_due(NOW, 3) == pitch_uuids[:3]
+    assert scheduler.pop_due(NOW, 3) == pitch_uuids[3:]
+
+
+def test_replace_all_drops_unscheduled_pitches():
+    scheduler = DueTimeScheduler()
+    dropped_uuid = uuid4()
+    kept_uuid = uuid4()
+    scheduler.schedule(dropped_uuid, NOW - timedelta(minutes=10))
+
+    scheduler.replace_all([(kept_uuid, NOW - timedelta(minutes=5))])
+
+    assert scheduler.pop_due(NOW, 10) == [kept_uuid]
@@ -0,0 +1,84 @@
+from datetime import datetime
+from uuid import uuid4
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+
+
+def generate_pitch() -> Pitch:
+    return Pitch(
+        uuid=uuid4(),
+        name="Fritz-Walter-Stadion",
+        location=Location(city="Kaiserslautern", country="Germany"),
+        turf_type=TurfType.natural,
+        current_condition=8,
+        last_checked_at=datetime.utcnow(),
+    )
+
+
+def test_new_pitch_is_clean():
+    assert generate_pitch().dirty_fields == frozenset()
+
+
+def test_same_value_assignment_is_not_dirty():
+    pitch = generate_pitch()
+
+    pitch.current_condition = 8
+    pitch.turf_type = TurfType.natural
+    pitch.location = Location(city="Kaiserslautern", country="Germany")
+
+    assert pitch.dirty_fields == frozenset()
+    assert not pitch.has_material_changes()
+
+
+def test_dirty_dump_contains_only_changed_fields():
+    pitch = generate_pitch()
+    checked_at = datetime.utcnow()
+
+    pitch.current_condition = 5
+    pitch.last_checked_at = checked_at
+
+    assert pitch.dirty_fields == {"current_condition", "last_checked_at"}
+    assert pitch.dirty_dump() == {
+        "current_condition": 5,
+        "last_checked_at": checked_at,
+    }
+    assert pitch.has_material_changes()
+
+
+def test_only_checked_timestamp_is_not_material():
+    pitch = generate_pitch()
+
+    pitch.last_checked_at = datetime.utcnow()
+
+    assert pitch.dirty_fields == {"last_checked_at"}
+    assert not pitch.has_material_changes()
+
+
+def test_mark_clean_resets_dirty_fields():
+    pitch = generate_pitch()
+
+    pitch.current_condition = 5
+    pitch.mark_clean()
+
+    assert pitch.dirty_fields == frozenset()
+    assert pitch.dirty_dump() == {}
+
+    pitch.current_condition = 6
+
+    assert pitch.dirty_fields == {"current_condition"}
+
+
+def test_nested_mutation_is_not_tracked():
+    pitch = generate_pitch()
+
+    # Known gap: in place changes of a nested model bypass the tracking of the pitch
+    pitch.location.city = "Mainz"
+
+    assert pitch.dirty_fields == frozenset()
+
+    # Assigning a new location is tracked
+    pitch.location = Location(city="Berlin", country="Germany")
+
+    assert pitch.dirty_fields == {"location"}
+    assert pitch.dirty_dump() == {
+        "location": {"city": "Berlin", "country": "Germany", "coordinates": None}
+    }
@@ -0,0 +1,118 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List, Optional
+from uuid import uuid4
+from pitch_health_monitor.database import async_db_methods, db_methods
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.pitch_monitor.sharding import (
+    process_due_pitches_in_shards,
+    process_shard,
+    shard_of,
+)
+from pitch_health_monitor.services.pitch_monitor.weather_grid import (
+    weather_location_key,
+)
+from pitch_health_monitor.services.weather import AsyncWeatherAPI, Coordinates
+
+NOW = datetime(2024, 5, 1, 12)
+
+KAISERSLAUTERN = Location(city="Kaiserslautern", country="Germany")
+
+
+class DryWeatherAPI(AsyncWeatherAPI):
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        return False
+
+
+def generate_pitches(count: int, location: Location = KAISERSLAUTERN) -> List[Pitch]:
+    return [
+        Pitch(
+            uuid=uuid4(),
+            name=f"Pitch {index}",
+            location=location,
+            turf_type=TurfType.natural,
+            current_condition=8,
+            # Distinct check dates, so they can be made unique
+            last_checked_at=NOW - timedelta(hours=2, minutes=index),
+        )
+        for index in range(count)
+    ]
+
+
+def test_shard_of_partitions_the_pitches():
+    pitch_uuids = [uuid4() for _ in range(1000)]
+
+    shards = [shard_of(pitch_uuid, 4) for pitch_uuid in pitch_uuids]
+
+    assert set(shards) == {0, 1, 2, 3}
+    # Random UUIDs spread about evenly
+    assert all(150 < shards.count(shard) < 350 for shard in range(4))
+    # A pitch always lands in the same shard
+    assert shards == [shard_of(pitch_uuid, 4) for pitch_uuid in pitch_uuids]
+
+
+def test_due_pitches_are_processed_by_their_shard(database, monkeypatch):
+    monkeypatch.setattr(async_db_methods, "MONGO_ASYNC", False)
+
+    pitches = generate_pitches(30)
+    db_methods.create_pitches_in_db(pitches)
+
+    async def run():
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            return await process_due_pitches_in_shards(
+                NOW - timedelta(hours=1), DryWeatherAPI(), executor, shard_count=3
+            )
+
+    reports = asyncio.run(run())
+
+    assert sum(report.pitch_count for report in reports) == 30
+    for report in reports:
+        assert not report.failures
+        assert report.pitch_count == sum(
+            shard_of(pitch.uuid, 3) == report.shard for pitch in pitches
+        )
+
+
+def test_shard_failures_are_attributed_to_their_pitch(database):
+    pitches = generate_pitches(3)
+    unknown_weather_pitch = generate_pitches(
+        1, Location(city="Berlin", country="Germany")
+    )[0]
+    unknown_weather_pitch.last_checked_at = NOW - timedelta(hours=3)
+    db_methods.create_pitches_in_db([*pitches, unknown_weather_pitch])
+
+    # Every pitch is checked at the same date, so only the first one written gets through
+    db_methods.pitches_collection.create_index("last_checked_at", unique=True)
+
+    with clock.use_clock(clock.SimulatedClock(NOW)):
+        report = process_shard(
+            0,
+            [pitch.uuid for pitch in [*pitches, unknown_weather_pitch]],
+            NOW - timedelta(hours=1),
+            {weather_location_key(KAISERSLAUTERN): False},
+        )
+
+    # One pitch fails on the rules, two on the write, and the failed ones are counted as processed
+    assert set(report.failures) == {
+        unknown_weather_pitch.uuid,
+        pitches[1].uuid,
+        pitches[2].uuid,
+    }
+    assert "Duplicate" in report.failures[pitches[1].uuid]
+    assert report.pitch_count == 4
+    assert report.pitch_count - len(report.failures) == 1
+
+    # Only the written pitch is checked, the others stay due
+    stored = {
+        pitch.uuid: pitch
+        for pitch in db_methods.get_pitches_by_uuid_from_db(
+            [pitch.uuid for pitch in pitches]
+        )
+    }
+    assert stored[pitches[0].uuid].last_checked_at == NOW
+    assert stored[pitches[1].uuid].last_checked_at == pitches[1].last_checked_at
+    assert stored[pitches[2].uuid].last_checked_at == pitches[2].last_checked_at
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import datetime, timedelta
+import random
+from uuid import uuid4
+from pitch_health_monitor.models.schemas import Location, Pitch, TurfType
+from pitch_health_monitor.services.metrics import PROCESSOR_PITCHES
+from pitch_health_monitor.services.pitch_monitor.processor import RECHECK_INTERVAL
+from pitch_health_monitor.services.pitch_monitor.simulator import (
+    WeatherTimeline,
+    generate_fleet,
+    simulate,
+)
+from pitch_health_monitor.services.weather import location_key
+
+STARTS_AT = datetime(2024, 1, 1)
+
+LOCATION = Location(city="Kaiserslautern", country="Germany")
+
+
+def get_failed_count() -> float:
+    return PROCESSOR_PITCHES._values.get(("failed",), 0)
+
+
+def test_pitches_are_damaged_by_every_rain_spell():
+    pitch = Pitch(
+        uuid=uuid4(),
+        created_at=STARTS_AT,
+        last_checked_at=STARTS_AT - RECHECK_INTERVAL,
+        name="Pitch",
+        location=LOCATION,
+        turf_type=TurfType.natural,
+        current_condition=10,
+    )
+    timeline = WeatherTimeline(
+        starts_at=STARTS_AT,
+        raining={location_key(LOCATION.city, LOCATION.country): [True] * 8},
+    )
+    failed_count = get_failed_count()
+
+    result = asyncio.run(
+        simulate([pitch], timeline, STARTS_AT, 7, cycle_interval=timedelta(hours=1))
+    )
+
+    # Natural turf loses 2 points every 3 consecutive rain hours
+    assert result.pitches[0].conditions == [10, 10, 8, 8, 8, 6, 6]
+    assert get_failed_count() == failed_count
+    assert pitch.last_checked_at == STARTS_AT + timedelta(hours=6)
+    assert not pitch.dirty_fields
+
+    # Maintenance waits for the pitch to dry, and keeps being pushed back while it rains
+    assert pitch.next_scheduled_maintenance == STARTS_AT + timedelta(hours=6 + 36)
+    assert result.summary()["maintenances"] == 0
+
+
+def test_generated_fleet_is_processed_every_cycle():
+    rng = random.Random(0)
+    locations = [
+        Location(city=f"City {index}", country="Simulation") for index in range(3)
+    ]
+    pitches = generate_fleet(20, locations, STARTS_AT, rng)
+    timeline = WeatherTimeline.generate(locations, STARTS_AT, 24 * 5, rng)
+    failed_count = get_failed_count()
+
+    result = asyncio.run(
+        simulate(pitches, timeline, STARTS_AT, 48, cycle_interval=timedelta(hours=2))
+    )
+
+    assert get_failed_count() == failed_count
+    assert all(len(trajectory.conditions) == 48 for trajectory in result.pitches)
+    assert all(
+        pitch.last_checked_at == STARTS_AT + timedelta(hours=94) for pitch in pitches
+    )
+    assert all(not pitch.dirty_fields for pitch in pitches)
+    assert result.summary()["maintenances"] > 0
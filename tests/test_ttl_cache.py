@@ -0,0 +1,84 @@
+from typing import Any, Hashable, List, Tuple
+from pitch_health_monitor.services.ttl_cache import TTLCache
+
+
+class FakeClock:
+    """
+    Clock standing still until it is advanced by hand.
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire_after_their_ttl():
+    clock = FakeClock()
+    evicted: List[Tuple[Hashable, Any]] = []
+    cache = TTLCache(60, 10, clock=clock, on_evict=lambda *entry: evicted.append(entry))
+
+    cache.set("Kaiserslautern", True)
+    cache.set("Berlin", False, expires_at=clock.now + 120)
+
+    clock.now += 59.9
+    assert cache.get("Kaiserslautern") is True
+
+    # An entry is expired from its expiry time on, even if it was just read
+    clock.now += 0.1
+    assert cache.get("Kaiserslautern", "missing") == "missing"
+    assert cache.get("Berlin") is False
+    assert len(cache) == 1
+    assert evicted == [("Kaiserslautern", True)]
+
+    # Expired entries are left out of the iteration before they are read
+    clock.now += 60
+    assert list(cache.items()) == []
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    evicted: List[Tuple[Hashable, Any]] = []
+    cache = TTLCache(
+        60, 3, clock=FakeClock(), on_evict=lambda *entry: evicted.append(entry)
+    )
+
+    for city in ["Kaiserslautern", "Berlin", "Munich"]:
+        cache.set(city, city)
+
+    # Reading or replacing an entry makes it the most recently used
+    cache.get("Kaiserslautern")
+    cache.set("Berlin", "Berlin again")
+    cache.set("Hamburg", "Hamburg")
+    cache.set("Cologne", "Cologne")
+
+    assert evicted == [("Munich", "Munich"), ("Kaiserslautern", "Kaiserslautern")]
+    assert [key for key, _, _ in cache.items()] == ["Berlin", "Hamburg", "Cologne"]
+    assert cache.get("Berlin") == "Berlin again"
+
+
+def test_stats_count_hits_misses_and_evictions():
+    clock = FakeClock()
+    cache = TTLCache(60, 2, clock=clock)
+
+    cache.set("Kaiserslautern", True)
+    cache.set("Berlin", False)
+    cache.get("Kaiserslautern")
+    cache.get("Berlin")
+    cache.get("Munich")
+
+    # A stored False is a hit like any other value
+    assert cache.stats == {"entries": 2, "hits": 2, "misses": 1, "evictions": 0}
+
+    # Kaiserslautern is the least recently used
+    cache.set("Munich", True)
+    assert cache.stats == {"entries": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+    # Expired entries count as misses, only the size limit counts as evictions
+    clock.now += 60
+    cache.get("Berlin")
+    assert cache.stats == {"entries": 1, "hits": 2, "misses": 2, "evictions": 1}
+
+    cache.delete("Munich")
+    cache.clear()
+    assert cache.stats["entries"] == 0
@@ -0,0 +1,198 @@
+import asyncio
+from datetime import datetime, timedelta
+import random
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+import numpy as np
+import pytest
+from pitch_health_monitor.database import async_db_methods, db_methods
+from pitch_health_monitor.models.schemas import Pitch, TurfType
+from pitch_health_monitor.services import clock
+from pitch_health_monitor.services.pitch_monitor.constants import (
+    override_rule_parameters,
+)
+from pitch_health_monitor.services.pitch_monitor.notifications import (
+    PitchEventBroadcaster,
+    PitchEventFilter,
+    get_pitch_change_event,
+)
+from pitch_health_monitor.services.pitch_monitor.rules import apply_rules
+from pitch_health_monitor.services.pitch_monitor.vectorized import (
+    PitchColumns,
+    apply_rules_vectorized,
+    process_due_pitches_vectorized,
+)
+from pitch_health_monitor.services.weather import AsyncWeatherAPI
+
+# Both engines read the clock at slightly different times
+CLOCK_TOLERANCE = timedelta(seconds=5)
+
+
+class RainingWeatherAPI(AsyncWeatherAPI):
+    async def is_raining_now(self, city, country, coordinates=None) -> bool:
+        return True
+
+
+def generate_documents(rng: random.Random, count: int) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+
+    documents = []
+    for index in range(count):
+        # Maintenance dates are kept whole hours away from now, so both engines agree on whether
+        # they are in the future
+        next_maintenance = rng.choice(
+            [None, now + timedelta(hours=rng.choice([-1, 1]) * rng.randint(1, 48))]
+        )
+
+        documents.append(
+            {
+                "uuid": uuid4(),
+                "name": f"Pitch {index}",
+                "location": {"city": f"City {rng.randint(0, 9)}", "country": "Germany"},
+                "turf_type": rng.choice(list(TurfType)).value,
+                "current_condition": rng.randint(1, 10),
+                "last_checked_at": now - timedelta(hours=2),
+                "next_scheduled_maintenance": next_maintenance,
+                "current_consecutive_rain_hours": rng.randint(0, 6),
+            }
+        )
+
+    return documents
+
+
+def assert_same_date(actual: Optional[datetime], expected: Optional[datetime]):
+    if expected is None:
+        assert actual is None
+    else:
+        assert actual is not None
+        assert abs(actual - expected) <= CLOCK_TOLERANCE
+
+
+@pytest.mark.parametrize(
+    "seed, drying_time, rain_tolerance",
+    [(seed, {}, {}) for seed in range(20)]
+    + [
+        (20, {TurfType.natural: 6}, {TurfType.natural: 2}),
+        (21, {TurfType.artificial: 48}, {TurfType.hybrid: 10}),
+    ],
+)
+def test_vectorized_rules_match_per_object_rules(
+    seed: int, drying_time: Dict[TurfType, int], rain_tolerance: Dict[TurfType, int]
+):
+    with override_rule_parameters(drying_time, rain_tolerance):
+        check_vectorized_rules_match_per_object_rules(random.Random(seed))
+
+
+def check_vectorized_rules_match_per_object_rules(rng: random.Random):
+    documents = generate_documents(rng, 500)
+    raining_cities = {f"City {index}" for index in range(10) if rng.random() < 0.5}
+
+    columns = PitchColumns.from_documents(documents)
+    is_raining_now = np.array(
+        [location.city in raining_cities for location in columns.locations]
+    )[columns.location_codes]
+
+    changes = apply_rules_vectorized(columns, is_raining_now, datetime.utcnow())
+    updates = dict(changes.updates(datetime.utcnow()))
+
+    changed_uuids = set()
+    for document in documents:
+        pitch = apply_rules(
+            Pitch.model_validate(document),
+            document["location"]["city"] in raining_cities,
+        )
+
+        if not pitch.has_material_changes():
+            assert pitch.uuid not in updates
+            continue
+
+        changed_uuids.add(pitch.uuid)
+        fields = updates[pitch.uuid]
+
+        assert set(fields) == pitch.dirty_fields
+        if "current_condition" in fields:
+            assert fields["current_condition"] == pitch.current_condition
+        if "current_consecutive_rain_hours" in fields:
+            assert (
+                fields["current_consecutive_rain_hours"]
+                == pitch.current_consecutive_rain_hours
+            )
+        if "next_scheduled_maintenance" in fields:
+            assert_same_date(
+                fields["next_scheduled_maintenance"], pitch.next_scheduled_maintenance
+            )
+
+    assert set(updates) == changed_uuids
+
+
+def test_vectorized_rules_leave_columns_untouched():
+    documents = generate_documents(random.Random(0), 100)
+    columns = PitchColumns.from_documents(documents)
+    conditions = columns.conditions.copy()
+    next_maintenance = columns.next_maintenance.copy()
+
+    apply_rules_vectorized(
+        columns, np.ones(len(columns), dtype=bool), datetime.utcnow()
+    )
+
+    assert np.array_equal(columns.conditions, conditions)
+    assert np.array_equal(columns.next_maintenance, next_maintenance, equal_nan=True)
+
+
+def test_vectorized_rules_handle_no_pitches():
+    columns = PitchColumns.from_documents([])
+
+    changes = apply_rules_vectorized(
+        columns, np.zeros(0, dtype=bool), datetime.utcnow()
+    )
+
+    assert len(changes) == 0
+    assert changes.updates(datetime.utcnow()) == []
+
+
+def test_vectorized_engine_publishes_written_changes(database, monkeypatch):
+    monkeypatch.setattr(async_db_methods, "MONGO_ASYNC", False)
+
+    with clock.use_clock(
+        clock.SimulatedClock(datetime.utcnow().replace(microsecond=0))
+    ):
+        documents = generate_documents(random.Random(0), 200)
+        db_methods.pitches_collection.insert_many(
+            [dict(document) for document in documents]
+        )
+
+        expected_events = [
+            get_pitch_change_event(apply_rules(Pitch.model_validate(document), True))
+            for document in documents
+        ]
+        expected_changes = {
+            event.pitch_uuid: event.changes
+            for event in expected_events
+            if event is not None
+        }
+
+        broadcaster = PitchEventBroadcaster(max_queued_events=len(documents))
+        subscription = broadcaster.subscribe(PitchEventFilter())
+
+        report = asyncio.run(
+            process_due_pitches_vectorized(
+                clock.utcnow() - timedelta(hours=1),
+                RainingWeatherAPI(),
+                events=broadcaster,
+            )
+        )
+
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+
+    assert not report.failures
+    assert expected_changes
+    assert {event.pitch_uuid: event.changes for event in events} == expected_changes
+
+    documents_by_uuid = {document["uuid"]: document for document in documents}
+    for event in events:
+        document = documents_by_uuid[event.pitch_uuid]
+        assert event.name == document["name"]
+        assert event.city == document["location"]["city"]
+        assert event.turf_type == document["turf_type"]
@@ -0,0 +1,170 @@
+import asyncio
+import time
+from typing import List, Optional, Union
+import httpx
+import pytest
+from pitch_health_monitor.services.weather import (
+    AsyncWeatherAPI,
+    CachedWeatherAPI,
+    CoalescingWeatherAPI,
+    Coordinates,
+)
+
+
+class GatedWeatherAPI(AsyncWeatherAPI):
+    """
+    Weather API holding every lookup until the gate opens, then answering with the given outcomes in
+    order, repeating the last one.
+    """
+
+    def __init__(self, outcomes: List[Union[bool, Exception]]):
+        self.outcomes = outcomes
+        self.calls: List[str] = []
+        self.gate = asyncio.Event()
+
+    async def is_raining_now(
+        self, city: str, country: str, coordinates: Optional[Coordinates] = None
+    ) -> bool:
+        outcome = self.outcomes[min(len(self.calls), len(self.outcomes) - 1)]
+        self.calls.append(city)
+        await self.gate.wait()
+
+        if isinstance(outcome, Exception):
+            raise outcome
+
+        return outcome
+
+
+def test_concurrent_lookups_of_a_location_make_one_call():
+    async def run():
+        weather_api = GatedWeatherAPI([True])
+        coalescing_api = CoalescingWeatherAPI(weather_api)
+
+        lookups = [
+            asyncio.ensure_future(
+                coalescing_api.is_raining_now("Kaiserslautern", "Germany")
+            )
+            for _ in range(10)
+        ]
+        lookups.append(
+            asyncio.ensure_future(coalescing_api.is_raining_now("Berlin", "Germany"))
+        )
+        await asyncio.sleep(0)
+        weather_api.gate.set()
+
+        results = await asyncio.gather(*lookups)
+
+        # A later caller gets the shared result without a new call
+        results.append(
+            await coalescing_api.is_raining_now(" kaiserslautern ", "GERMANY")
+        )
+
+        return weather_api.calls, coalescing_api.location_count, results
+
+    calls, location_count, results = asyncio.run(run())
+
+    assert sorted(calls) == ["Berlin", "Kaiserslautern"]
+    assert location_count == 2
+    assert results == [True] * 12
+
+
+def test_failed_lookup_is_shared_then_retried():
+    async def run():
+        weather_api = GatedWeatherAPI([httpx.ConnectError("unreachable"), False])
+        coalescing_api = CoalescingWeatherAPI(weather_api)
+
+        lookups = [
+            asyncio.ensure_future(
+                coalescing_api.is_raining_now("Kaiserslautern", "Germany")
+            )
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        weather_api.gate.set()
+
+        results = await asyncio.gather(*lookups, return_exceptions=True)
+
+        # Every caller waiting on the failed lookup gets its error, without calling again
+        assert len(weather_api.calls) == 1
+        assert all(isinstance(result, httpx.ConnectError) for result in results)
+        assert coalescing_api.location_count == 0
+
+        # The failure is not kept for the rest of the cycle, so the next caller retries
+        assert not await coalescing_api.is_raining_now("Kaiserslautern", "Germany")
+        assert not await coalescing_api.is_raining_now("Kaiserslautern", "Germany")
+
+        return weather_api.calls
+
+    assert len(asyncio.run(run())) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_lookup():
+    async def run():
+        weather_api = GatedWeatherAPI([True])
+        coalescing_api = CoalescingWeatherAPI(weather_api)
+
+        cancelled = asyncio.ensure_future(
+            coalescing_api.is_raining_now("Kaiserslautern", "Germany")
+        )
+        waiting = asyncio.ensure_future(
+            coalescing_api.is_raining_now("Kaiserslautern", "Germany")
+        )
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        weather_api.gate.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        return await waiting, weather_api.calls
+
+    assert asyncio.run(run()) == (True, ["Kaiserslautern"])
+
+
+def test_cache_snapshot_restores_the_valid_entries(tmp_path):
+    snapshot_path = str(tmp_path / "weather.json")
+
+    async def run():
+        weather_api = GatedWeatherAPI([True, False])
+        weather_api.gate.set()
+        cached_api = CachedWeatherAPI(weather_api, snapshot_path=snapshot_path)
+
+        await cached_api.is_raining_now("Kaiserslautern", "Germany")
+        await cached_api.is_raining_now("Berlin", "Germany", (13.4, 52.52))
+        await cached_api.is_raining_now("Kaiserslautern", "Germany")
+        assert cached_api.stats == {
+            "entries": 2,
+            "hits": 1,
+            "misses": 2,
+            "evictions": 0,
+        }
+
+        # Expired entries are not saved
+        cached_api.cache.set(("munich", "germany"), True, expires_at=time.time() - 1)
+        cached_api.save_snapshot()
+
+        # The restarted service answers from the snapshot without any call
+        restored_weather_api = GatedWeatherAPI([RuntimeError("not cached")])
+        restored_api = CachedWeatherAPI(
+            restored_weather_api, snapshot_path=snapshot_path
+        )
+        assert restored_api.load_snapshot() == 2
+        assert list(restored_api.cache.items()) == list(cached_api.cache.items())
+        assert await restored_api.is_raining_now(" kaiserslautern ", "GERMANY")
+        assert not await restored_api.is_raining_now("Berlin", "Germany", (13.4, 52.52))
+        assert restored_weather_api.calls == []
+
+    asyncio.run(run())
+
+
+def test_missing_or_unreadable_cache_snapshot_is_ignored(tmp_path):
+    snapshot_path = tmp_path / "weather.json"
+    cached_api = CachedWeatherAPI(
+        GatedWeatherAPI([True]), snapshot_path=str(snapshot_path)
+    )
+
+    assert cached_api.load_snapshot() == 0
+
+    snapshot_path.write_text("{truncated")
+    assert cached_api.load_snapshot() == 0
+    assert len(cached_api.cache) == 0
@@ -0,0 +1,82 @@
+from typing import Optional, Tuple
+import pytest
+from pitch_health_monitor.models.schemas import GeoPoint, Location
+from pitch_health_monitor.services.pitch_monitor.weather_grid import (
+    _snap_to_cell_center,
+    get_weather_cell,
+    weather_location_key,
+)
+
+
+def build_location(
+    coordinates: Optional[Tuple[float, float]], city: str = "Kaiserslautern"
+) -> Location:
+    return Location(
+        city=city,
+        country="Germany",
+        coordinates=GeoPoint(coordinates=coordinates) if coordinates else None,
+    )
+
+
+@pytest.mark.parametrize(
+    "value, limit, center",
+    [
+        (7.7765, 180, 7.75),
+        (49.4344, 90, 49.45),
+        # Cells are floored, so negative values snap away from zero
+        (-0.04, 180, -0.05),
+        (-43.1729, 90, -43.15),
+        (-73.9857, 180, -73.95),
+    ],
+)
+def test_values_snap_to_the_center_of_their_cell(
+    value: float, limit: float, center: float
+):
+    assert _snap_to_cell_center(value, 0.1, limit) == center
+
+
+@pytest.mark.parametrize(
+    "value, limit, center",
+    [
+        # The cell above the limit is cut back to the limit
+        (180, 180, 180),
+        (90, 90, 90),
+        (-180, 180, -179.95),
+        (-90, 90, -89.95),
+        (179.99, 180, 179.95),
+    ],
+)
+def test_cell_centers_stay_within_the_valid_range(
+    value: float, limit: float, center: float
+):
+    assert _snap_to_cell_center(value, 0.1, limit) == center
+    assert -limit <= _snap_to_cell_center(value, 7, limit) <= limit
+
+
+def test_nearby_pitches_share_a_weather_key():
+    stadium = build_location((7.7765, 49.4344))
+    # A few hundred meters away, with another spelling of the city
+    training_ground = build_location((7.7721, 49.4312), city=" kaiserslautern")
+    # About 15 km away
+    neighbouring_town = build_location((7.5662, 49.4447), city="Kaiserslautern")
+
+    assert weather_location_key(stadium) == weather_location_key(training_ground)
+    assert weather_location_key(stadium) == ("geo", "7.7500,49.4500")
+    assert weather_location_key(stadium) != weather_location_key(neighbouring_town)
+    assert get_weather_cell(stadium) == (7.75, 49.45)
+
+
+def test_pitches_without_coordinates_share_their_city_key():
+    assert weather_location_key(build_location(None)) == weather_location_key(
+        build_location(None, city="KAISERSLAUTERN ")
+    )
+    assert get_weather_cell(build_location(None)) is None
+
+
+def test_disabled_grid_falls_back_to_the_city_key():
+    stadium = build_location((7.7765, 49.4344))
+
+    assert get_weather_cell(stadium, cell_degrees=0) is None
+    assert weather_location_key(stadium, cell_degrees=0) == weather_location_key(
+        build_location(None)
+    )